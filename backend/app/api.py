@@ -1,42 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Body, Query, status
+import json
+import time
+from pathlib import Path
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Body, Query, BackgroundTasks, Request, status
+from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from typing import Optional, List, Dict, Any
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
 # CRITICAL FIX: Restore ALL necessary security functions for login/register/auth
-from .core.security import get_current_user, create_access_token, verify_password, get_password_hash
+from .core.security import invalidate_user, create_access_token, hash_password, verify_and_update_password
 from .core.rbac import require_role, Roles
-from .db.session import get_db
+from .core.quotas import require_quota
+from .db.session import get_db, engine, POOL_STATS
+from .db.pagination import parse_fields, keyset_page, page_response, list_response
 from .db import models
 from .io.schemas import (
-    LoginRequest, LoginResponse, UserCreate, UserOut, ProjectCreate, ProjectOut,
-    SurveyRequest, SurveyResponse, GapRequest, GapResponse, TranslateRequest, TranslateResponse,
+    LoginRequest, LoginResponse, UserCreate, UserOut, UserRoleUpdate, ProjectCreate, ProjectOut,
+    DocumentOut, DraftOut, SourceOut, SearchHitOut, SearchResponse, RelatedHitOut,
+    SurveyRequest, SurveyResponse, DeepSearchRequest, GapRequest, GapResponse, TranslateRequest, TranslateResponse,
     PersonaSummaryRequest, PersonaSummaryResponse, MethodologyRequest, MethodologyResponse,
     ReplicatorRequest, ReplicatorResponse, CrossDomainRequest, CrossDomainResponse,
     BenchmarkRequest, BenchmarkResponse, ContradictionRequest, ContradictionResponse,
-    CitationValidateRequest, CitationValidateResponse, LatexRequest, LatexResponse, JobOut
+    CitationValidateRequest, CitationValidateResponse, LatexRequest, LatexResponse, JobOut,
+    TranscriptionJob, TranscriptionResponse
 )
-from .features.literature_survey import generate_literature_survey
+from .features.literature_survey import generate_literature_survey, stream_literature_survey, load_survey, deep_search
 from .features.research_gap_finder import find_research_gaps
-from .features.translator import translate_paper
-from .features.persona_summarizer import make_persona_summary
+from .features.translator import translate_paper, stream_translation
+from .features.persona_summarizer import make_persona_summary, stream_persona_summary
 from .features.methodology_builder import build_methodology
 from .features.experiment_replicator import suggest_experiment_variants
 from .features.cross_domain_synth import synthesize_cross_domain
 from .features.benchmark_explorer import recommend_benchmarks
 from .features.contradiction_analyzer import analyze_contradictions
-from .features.citation_validator import validate_citations
+from .features.citation_validator import validate_citations, stream_citation_validation
 from .features.latex_generator import generate_latex_package
-from .voice.speech_io import transcribe_audio
+from .voice.speech_io import transcribe_audio, transcribe_path
 from .io.storage import save_upload
+from .io.extraction import ingest_document
+from .retrieval.search_index import search_index, rebuild as rebuild_search_index
+from .retrieval.embeddings import related_in_project, rebuild as rebuild_embeddings
+from .core.disk_cache import CACHE_STATS
+from .core.jobs import job_runner
+from .core.rate_limiter import provider_limits
+from .core.sse import sse_response, STREAM_STATS
+from .config.constants import ROLE_ADMIN, QUOTA_CHEAP, QUOTA_LLM, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter()
 
 # ---------------------- Auth ----------------------
 
 @router.post("/auth/register", response_model=UserOut)
-def register_user(payload: UserCreate, db: Session = Depends(get_db)):
-    exists = db.scalar(select(models.User).where(models.User.email == payload.email))
+async def register_user(payload: UserCreate, db: Session = Depends(get_db)):
+    exists = await run_in_threadpool(db.scalar, select(models.User).where(models.User.email == payload.email))
     if exists:
         raise HTTPException(status_code=400, detail="Email already registered")
     
@@ -47,49 +64,109 @@ def register_user(payload: UserCreate, db: Session = Depends(get_db)):
         email=payload.email,
         name=payload.name,
         role=payload.role,
-        password_hash=get_password_hash(truncated_password)
+        password_hash=await hash_password(truncated_password)
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+
+    def _save():
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+    await run_in_threadpool(_save)
     return UserOut(id=user.id, email=user.email, name=user.name, role=user.role)
 
 @router.post("/auth/login", response_model=LoginResponse)
-def login(payload: LoginRequest, db: Session = Depends(get_db)):
-    user = db.scalar(select(models.User).where(models.User.email == payload.email))
-    if not user or not verify_password(payload.password, user.password_hash):
+async def login(payload: LoginRequest, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(db.scalar, select(models.User).where(models.User.email == payload.email))
+    ok, new_hash = await verify_and_update_password(payload.password, user.password_hash) if user else (False, None)
+    if not ok:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    # Payload must include 'sub' (user ID) and 'role'
-    token = create_access_token({"sub": str(user.id), "role": user.role})
+    # Payload must include 'sub' (user ID) and 'role'; email/name let get_current_user skip the DB
+    token = create_access_token({"sub": str(user.id), "role": user.role, "email": user.email, "name": user.name})
+    out = UserOut(id=user.id, email=user.email, name=user.name, role=user.role)
+    if new_hash:
+        # BCRYPT_ROUNDS changed since this hash was made: upgrade it transparently
+        user.password_hash = new_hash
+        await run_in_threadpool(db.commit)
     
-    return LoginResponse(access_token=token, token_type="bearer", 
-                         user=UserOut(id=user.id, email=user.email, name=user.name, role=user.role))
+    return LoginResponse(access_token=token, token_type="bearer", user=out)
 
 
 @router.get("/auth/me", response_model=UserOut)
-def me(current=Depends(get_current_user)):
+def me(current=Depends(require_quota(QUOTA_CHEAP))):
     return UserOut(id=current.id, email=current.email, name=current.name, role=current.role)
 
+@router.patch("/users/{user_id}/role", response_model=UserOut)
+def change_user_role(user_id: int, payload: UserRoleUpdate, db: Session = Depends(get_db), current=Depends(require_role({ROLE_ADMIN}))):
+    user = db.get(models.User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    user.role = payload.role
+    db.commit()
+    # drop cached principals and stop trusting role claims in tokens issued before now
+    invalidate_user(user.id)
+    return UserOut(id=user.id, email=user.email, name=user.name, role=user.role)
+
 # ---------------------- Projects & Uploads ----------------------
 
 @router.post("/projects", response_model=ProjectOut)
-def create_project(payload: ProjectCreate, db: Session = Depends(get_db), current=Depends(get_current_user)):
+def create_project(payload: ProjectCreate, db: Session = Depends(get_db), current=Depends(require_quota(QUOTA_CHEAP))):
     project = models.Project(user_id=current.id, title=payload.title, domain=payload.domain, aim=payload.aim)
     db.add(project)
     db.commit()
     db.refresh(project)
     return ProjectOut(id=project.id, title=project.title, domain=project.domain, aim=project.aim)
 
+# List endpoints: keyset pages (`cursor` from the X-Next-Cursor header), `fields=` column
+# selection with large text columns left out by default, ETag / If-None-Match.
+PAGE_SIZE = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+FIELDS = Query(None, description="Comma-separated columns to return")
+
+PROJECT_FIELDS = ("id", "title", "domain", "aim", "created_at")
+DOCUMENT_FIELDS = ("id", "project_id", "filename", "mime", "sha256", "size_bytes", "extracted_at", "created_at", "text_content")
+DRAFT_FIELDS = ("id", "project_id", "title", "content_md", "created_at")
+SOURCE_FIELDS = ("id", "project_id", "title", "first_author", "year", "venue", "doi", "url", "provider")
+JOB_FIELDS = ("id", "type", "status", "message", "params", "result", "created_at", "updated_at")
+
+def _owned_project(db: Session, project_id: int, current) -> models.Project:
+    project = db.get(models.Project, project_id)
+    if not project or project.user_id != current.id:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return project
+
 @router.get("/projects", response_model=List[ProjectOut])
-def list_projects(db: Session = Depends(get_db), current=Depends(get_current_user)):
-    # Filter projects by the current authenticated user's ID
-    rows = db.scalars(select(models.Project).where(models.Project.user_id == current.id)).all()
-    return [ProjectOut(id=p.id, title=p.title, domain=p.domain, aim=p.aim) for p in rows]
+def list_projects(request: Request, cursor: Optional[str] = None, limit: int = PAGE_SIZE, fields: Optional[str] = FIELDS,
+                  db: Session = Depends(get_db), current=Depends(require_quota(QUOTA_CHEAP))):
+    # Filter projects by the current authenticated user's ID; `aim` only when asked for
+    cols = parse_fields(fields, ("title", "domain"), PROJECT_FIELDS)
+    return list_response(request, db, models.Project, [models.Project.user_id == current.id], cols, cursor, limit)
+
+@router.get("/projects/{project_id}/documents", response_model=List[DocumentOut])
+def list_documents(project_id: int, request: Request, cursor: Optional[str] = None, limit: int = PAGE_SIZE, fields: Optional[str] = FIELDS,
+                   db: Session = Depends(get_db), current=Depends(require_quota(QUOTA_CHEAP))):
+    _owned_project(db, project_id, current)
+    cols = parse_fields(fields, ("filename", "mime", "size_bytes", "created_at"), DOCUMENT_FIELDS)
+    # extraction is the only update to a document row
+    return list_response(request, db, models.Document, [models.Document.project_id == project_id], cols, cursor, limit,
+                         versions=("extracted_at",))
+
+@router.get("/projects/{project_id}/drafts", response_model=List[DraftOut])
+def list_drafts(project_id: int, request: Request, cursor: Optional[str] = None, limit: int = PAGE_SIZE, fields: Optional[str] = FIELDS,
+                db: Session = Depends(get_db), current=Depends(require_quota(QUOTA_CHEAP))):
+    _owned_project(db, project_id, current)
+    cols = parse_fields(fields, ("title", "created_at"), DRAFT_FIELDS)
+    return list_response(request, db, models.Draft, [models.Draft.project_id == project_id], cols, cursor, limit)
+
+@router.get("/projects/{project_id}/sources", response_model=List[SourceOut])
+def list_sources(project_id: int, request: Request, cursor: Optional[str] = None, limit: int = PAGE_SIZE, fields: Optional[str] = FIELDS,
+                 db: Session = Depends(get_db), current=Depends(require_quota(QUOTA_CHEAP))):
+    _owned_project(db, project_id, current)
+    cols = parse_fields(fields, ("title", "first_author", "year", "venue", "doi", "url", "provider"), SOURCE_FIELDS)
+    return list_response(request, db, models.Source, [models.Source.project_id == project_id], cols, cursor, limit)
 
 # FIX: Added missing route handler for fetching a single project
 @router.get("/projects/{project_id}", response_model=ProjectOut)
-def get_project_by_id(project_id: int, db: Session = Depends(get_db), current=Depends(get_current_user)):
+def get_project_by_id(project_id: int, db: Session = Depends(get_db), current=Depends(require_quota(QUOTA_CHEAP))):
     # Retrieve project by ID
     project = db.get(models.Project, project_id)
     
@@ -102,86 +179,238 @@ def get_project_by_id(project_id: int, db: Session = Depends(get_db), current=De
 
 @router.post("/upload", response_model=Dict[str, Any])
 def upload_document(
+    background_tasks: BackgroundTasks,
     project_id: int = Query(...),
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current=Depends(get_current_user)
+    current=Depends(require_quota(QUOTA_CHEAP))
 ):
-    path = save_upload(file)
-    doc = models.Document(project_id=project_id, user_id=current.id, filename=file.filename, path=path, mime=file.content_type)
+    stored = save_upload(file)
+    doc = models.Document(project_id=project_id, user_id=current.id, filename=file.filename, path=stored.path,
+                          mime=file.content_type, sha256=stored.sha256, size_bytes=stored.size)
     db.add(doc)
     db.commit()
     db.refresh(doc)
+    # extract the text layer after responding; features extract lazily if they get there first
+    background_tasks.add_task(ingest_document, doc.id)
     return {"document_id": doc.id, "filename": doc.filename}
 
+# ---------------------- Local Search ----------------------
+
+@router.get("/search", response_model=SearchResponse)
+def search(q: str = Query(..., min_length=1), project_id: Optional[int] = None, kind: Optional[str] = Query(None, pattern="^(source|document)$"),
+           limit: int = Query(20, ge=1, le=100), current=Depends(require_quota(QUOTA_CHEAP))):
+    # ranked hits over the caller's stored sources and extracted documents
+    t0 = time.perf_counter()
+    hits = search_index.search(q, current.id, project_id=project_id, kind=kind, limit=limit)
+    return SearchResponse(hits=[SearchHitOut(**h._asdict()) for h in hits], took_ms=round((time.perf_counter() - t0) * 1000, 2))
+
+@router.get("/projects/{project_id}/related", response_model=List[RelatedHitOut])
+def related(project_id: int, q: Optional[str] = None, source_id: Optional[int] = None, k: int = Query(10, ge=1, le=50),
+            db: Session = Depends(get_db), current=Depends(require_quota(QUOTA_CHEAP))):
+    # semantic neighbours within the project, of free text or of one of its stored sources
+    _owned_project(db, project_id, current)
+    if not q and source_id is None:
+        raise HTTPException(status_code=400, detail="Pass q or source_id")
+    try:
+        return related_in_project(db, current.id, project_id, text=q, source_id=source_id, k=k)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.post("/search/reindex", response_model=Dict[str, int])
+def search_reindex(db: Session = Depends(get_db), current=Depends(require_role({ROLE_ADMIN}))):
+    return {"indexed": rebuild_search_index(db), "embedded": rebuild_embeddings(db)}
+
 # ---------------------- Feature Endpoints ----------------------
+# LLM-bound endpoints are async; blocking DB work stays in the threadpool
+# (sync dependencies, run_in_threadpool inside the features).
+# Every LLM feature can be submitted as a background job with `?async=true`;
+# the endpoint then answers 202 with the job to poll at /jobs/{id}.
+
+job_runner.register("survey", SurveyRequest, generate_literature_survey)
+job_runner.register("deep_search", DeepSearchRequest, deep_search)
+job_runner.register("gaps", GapRequest, find_research_gaps)
+job_runner.register("translate", TranslateRequest, translate_paper)
+job_runner.register("persona", PersonaSummaryRequest, make_persona_summary)
+job_runner.register("methodology", MethodologyRequest, build_methodology)
+job_runner.register("replicator", ReplicatorRequest, suggest_experiment_variants)
+job_runner.register("cross_domain", CrossDomainRequest, synthesize_cross_domain)
+job_runner.register("contradiction", ContradictionRequest, analyze_contradictions)
+job_runner.register("citation", CitationValidateRequest, validate_citations)
+
+ASYNC_RESPONSES = {202: {"model": JobOut}}
+
+def _job_out(job: models.Job) -> JobOut:
+    result = json.loads(job.result) if job.result else None
+    return JobOut(id=job.id, type=job.type, status=job.status, message=job.message, result=result)
+
+async def _check_project(db, project_id: Optional[int], current) -> None:
+    # features re-check ownership, but by then an unknown project would surface as a 500 (or a failed job)
+    if project_id is not None:
+        await run_in_threadpool(_owned_project, db, project_id, current)
+
+async def _run_or_submit(job_type: str, fn, payload, db, current, run_async: bool):
+    if run_async:
+        job = await job_runner.submit(job_type, current.id, payload)
+        return JSONResponse(status_code=202, content=_job_out(job).model_dump(mode="json"))
+    return await fn(payload, db, current)
 
 # 1) Literature Survey Generator
-@router.post("/survey/generate", response_model=SurveyResponse)
-def survey_generate(payload: SurveyRequest, db: Session = Depends(get_db), current=Depends(require_role(Roles.researcher_like()))):
-    return generate_literature_survey(payload, db, current)
+@router.post("/survey/generate", response_model=SurveyResponse, responses=ASYNC_RESPONSES)
+async def survey_generate(payload: SurveyRequest, db: Session = Depends(get_db), current=Depends(require_role(Roles.researcher_like(), quota=QUOTA_LLM)), run_async: bool = Query(False, alias="async")):
+    await _check_project(db, payload.project_id, current)
+    return await _run_or_submit("survey", generate_literature_survey, payload, db, current, run_async)
+
+@router.post("/survey/deep-search", response_model=JobOut, status_code=202)
+async def survey_deep_search(payload: DeepSearchRequest, db: Session = Depends(get_db), current=Depends(require_role(Roles.researcher_like(), quota=QUOTA_LLM))):
+    await _check_project(db, payload.project_id, current)
+    # always a background job: poll /jobs/{id}, whose result holds the ranked papers found so far
+    job = await job_runner.submit("deep_search", current.id, payload)
+    return JSONResponse(status_code=202, content=_job_out(job).model_dump(mode="json"))
+
+@router.get("/survey/{draft_id}", response_model=SurveyResponse)
+def survey_get(draft_id: int, db: Session = Depends(get_db), current=Depends(require_quota(QUOTA_CHEAP))):
+    # a survey stored by /survey/generate with a project_id, straight from the DB
+    survey = load_survey(db, draft_id, current.id)
+    if not survey:
+        raise HTTPException(status_code=404, detail="Survey not found")
+    return survey
 
 # 2) Research Gap Finder
-@router.post("/survey/gaps", response_model=GapResponse)
-def survey_gaps(payload: GapRequest, db: Session = Depends(get_db), current=Depends(require_role(Roles.researcher_like()))):
-    return find_research_gaps(payload, db, current)
+@router.post("/survey/gaps", response_model=GapResponse, responses=ASYNC_RESPONSES)
+async def survey_gaps(payload: GapRequest, db: Session = Depends(get_db), current=Depends(require_role(Roles.researcher_like(), quota=QUOTA_LLM)), run_async: bool = Query(False, alias="async")):
+    return await _run_or_submit("gaps", find_research_gaps, payload, db, current, run_async)
 
 # 3) Multilingual Research Paper Translator
-@router.post("/translate", response_model=TranslateResponse)
-def translate(payload: TranslateRequest, db: Session = Depends(get_db), current=Depends(get_current_user)):
-    return translate_paper(payload, db, current)
+@router.post("/translate", response_model=TranslateResponse, responses=ASYNC_RESPONSES)
+async def translate(payload: TranslateRequest, db: Session = Depends(get_db), current=Depends(require_quota(QUOTA_LLM)), run_async: bool = Query(False, alias="async")):
+    return await _run_or_submit("translate", translate_paper, payload, db, current, run_async)
 
 # 4) Persona-based Summarizer
-@router.post("/summary/persona", response_model=PersonaSummaryResponse)
-def persona_summary(payload: PersonaSummaryRequest, db: Session = Depends(get_db), current=Depends(get_current_user)):
-    return make_persona_summary(payload, db, current)
+@router.post("/summary/persona", response_model=PersonaSummaryResponse, responses=ASYNC_RESPONSES)
+async def persona_summary(payload: PersonaSummaryRequest, db: Session = Depends(get_db), current=Depends(require_quota(QUOTA_LLM)), run_async: bool = Query(False, alias="async")):
+    return await _run_or_submit("persona", make_persona_summary, payload, db, current, run_async)
 
 # 5) Methodology Builder
-@router.post("/methodology/build", response_model=MethodologyResponse)
-def methodology_build(payload: MethodologyRequest, db: Session = Depends(get_db), current=Depends(require_role(Roles.researcher_like()))):
-    return build_methodology(payload, db, current)
+@router.post("/methodology/build", response_model=MethodologyResponse, responses=ASYNC_RESPONSES)
+async def methodology_build(payload: MethodologyRequest, db: Session = Depends(get_db), current=Depends(require_role(Roles.researcher_like(), quota=QUOTA_LLM)), run_async: bool = Query(False, alias="async")):
+    return await _run_or_submit("methodology", build_methodology, payload, db, current, run_async)
 
 # 6) Experiment Replicator
-@router.post("/methodology/replicate", response_model=ReplicatorResponse)
-def methodology_replicate(payload: ReplicatorRequest, db: Session = Depends(get_db), current=Depends(require_role(Roles.researcher_like()))):
-    return suggest_experiment_variants(payload, db, current)
+@router.post("/methodology/replicate", response_model=ReplicatorResponse, responses=ASYNC_RESPONSES)
+async def methodology_replicate(payload: ReplicatorRequest, db: Session = Depends(get_db), current=Depends(require_role(Roles.researcher_like(), quota=QUOTA_LLM)), run_async: bool = Query(False, alias="async")):
+    return await _run_or_submit("replicator", suggest_experiment_variants, payload, db, current, run_async)
 
 # 7) Cross-Domain Synthesizer
-@router.post("/cross-domain/suggest", response_model=CrossDomainResponse)
-def cross_domain(payload: CrossDomainRequest, db: Session = Depends(get_db), current=Depends(get_current_user)):
-    return synthesize_cross_domain(payload, db, current)
+@router.post("/cross-domain/suggest", response_model=CrossDomainResponse, responses=ASYNC_RESPONSES)
+async def cross_domain(payload: CrossDomainRequest, db: Session = Depends(get_db), current=Depends(require_quota(QUOTA_LLM)), run_async: bool = Query(False, alias="async")):
+    return await _run_or_submit("cross_domain", synthesize_cross_domain, payload, db, current, run_async)
 
 # 8) Benchmark Evolution Explorer
 @router.post("/benchmark/recommend", response_model=BenchmarkResponse)
-def benchmark(payload: BenchmarkRequest, db: Session = Depends(get_db), current=Depends(get_current_user)):
+async def benchmark(payload: BenchmarkRequest, db: Session = Depends(get_db), current=Depends(require_quota(QUOTA_CHEAP))):
     return recommend_benchmarks(payload, db, current)
 
 # 9) Contradiction Analyzer
-@router.post("/contradiction/scan", response_model=ContradictionResponse)
-def contradiction(payload: ContradictionRequest, db: Session = Depends(get_db), current=Depends(get_current_user)):
-    return analyze_contradictions(payload, db, current)
+@router.post("/contradiction/scan", response_model=ContradictionResponse, responses=ASYNC_RESPONSES)
+async def contradiction(payload: ContradictionRequest, db: Session = Depends(get_db), current=Depends(require_quota(QUOTA_LLM)), run_async: bool = Query(False, alias="async")):
+    return await _run_or_submit("contradiction", analyze_contradictions, payload, db, current, run_async)
 
 # 10) Citation & Reference Validator
-@router.post("/citation/validate", response_model=CitationValidateResponse)
-def citation_validate(payload: CitationValidateRequest, db: Session = Depends(get_db), current=Depends(get_current_user)):
-    return validate_citations(payload, db, current)
+@router.post("/citation/validate", response_model=CitationValidateResponse, responses=ASYNC_RESPONSES)
+async def citation_validate(payload: CitationValidateRequest, db: Session = Depends(get_db), current=Depends(require_quota(QUOTA_LLM)), run_async: bool = Query(False, alias="async")):
+    return await _run_or_submit("citation", validate_citations, payload, db, current, run_async)
 
 # 11) LaTeX Typescript Generator
 @router.post("/latex/generate", response_model=LatexResponse)
-def latex(payload: LatexRequest, db: Session = Depends(get_db), current=Depends(require_role(Roles.researcher_like()))):
+def latex(payload: LatexRequest, db: Session = Depends(get_db), current=Depends(require_role(Roles.researcher_like(), quota=QUOTA_CHEAP))):
     return generate_latex_package(payload, db, current)
 
 # 12) Voice/Text (Whisper)
-@router.post("/voice/transcribe", response_model=Dict[str, str])
-def voice_transcribe(file: UploadFile = File(...), current=Depends(get_current_user)):
-    text = transcribe_audio(file)
+async def _transcription_job(params: TranscriptionJob, db, current):
+    try:
+        return TranscriptionResponse(transcript=await transcribe_path(params.path, params.filename, params.content_type))
+    finally:
+        # the recording was saved for this job only
+        Path(params.path).unlink(missing_ok=True)
+
+job_runner.register("transcribe", TranscriptionJob, _transcription_job)
+
+@router.post("/voice/transcribe", response_model=Dict[str, str], responses=ASYNC_RESPONSES)
+async def voice_transcribe(file: UploadFile = File(...), current=Depends(require_quota(QUOTA_LLM)), run_async: bool = Query(False, alias="async")):
+    if run_async:
+        # the job needs the recording after this request ends: keep a private copy in upload storage
+        stored = await run_in_threadpool(save_upload, file, None, True)
+        params = TranscriptionJob(path=stored.path, filename=file.filename or "audio", content_type=file.content_type)
+        job = await job_runner.submit("transcribe", current.id, params)
+        return JSONResponse(status_code=202, content=_job_out(job).model_dump(mode="json"))
+    text = await transcribe_audio(file)
     return {"transcript": text}
 
-# ---------------------- Jobs (simple placeholders) ----------------------
+# ---------------------- Streaming (SSE) variants ----------------------
+# `delta` events carry text as it is generated; `done` reports TTFB and total latency.
+
+@router.post("/survey/generate/stream")
+async def survey_generate_stream(payload: SurveyRequest, db: Session = Depends(get_db), current=Depends(require_role(Roles.researcher_like(), quota=QUOTA_LLM))):
+    await _check_project(db, payload.project_id, current)
+    return sse_response("survey", stream_literature_survey(payload, db, current))
+
+@router.post("/translate/stream")
+async def translate_stream(payload: TranslateRequest, db: Session = Depends(get_db), current=Depends(require_quota(QUOTA_LLM))):
+    return sse_response("translate", stream_translation(payload, db, current))
+
+@router.post("/summary/persona/stream")
+async def persona_summary_stream(payload: PersonaSummaryRequest, db: Session = Depends(get_db), current=Depends(require_quota(QUOTA_LLM))):
+    return sse_response("persona", stream_persona_summary(payload, db, current))
+
+@router.post("/citation/validate/stream")
+async def citation_validate_stream(payload: CitationValidateRequest, db: Session = Depends(get_db), current=Depends(require_quota(QUOTA_LLM))):
+    return sse_response("citation", stream_citation_validation(payload, db, current))
+
+# ---------------------- Jobs ----------------------
+
+@router.get("/jobs", response_model=List[JobOut])
+def list_jobs(request: Request, cursor: Optional[str] = None, limit: int = PAGE_SIZE, fields: Optional[str] = FIELDS,
+              db: Session = Depends(get_db), current=Depends(require_quota(QUOTA_CHEAP))):
+    # newest first; params/result only when asked for
+    cols = parse_fields(fields, ("type", "status", "message", "created_at", "updated_at"), JOB_FIELDS)
+    rows, next_cursor = keyset_page(db, models.Job, [models.Job.user_id == current.id], cols, cursor, limit, newest_first=True)
+    for r in rows:
+        if r.get("result"):
+            r["result"] = json.loads(r["result"])
+    return page_response(request, rows, next_cursor)
 
 @router.get("/jobs/{job_id}", response_model=JobOut)
-def get_job(job_id: int, db: Session = Depends(get_db), current=Depends(get_current_user)):
+def get_job(job_id: int, db: Session = Depends(get_db), current=Depends(require_quota(QUOTA_CHEAP))):
     job = db.get(models.Job, job_id)
     if not job or job.user_id != current.id:
         raise HTTPException(status_code=404, detail="Job not found")
-    return JobOut(id=job.id, type=job.type, status=job.status, message=job.message)
+    return _job_out(job)
+
+@router.post("/jobs/{job_id}/cancel", response_model=JobOut)
+async def cancel_job(job_id: int, db: Session = Depends(get_db), current=Depends(require_quota(QUOTA_CHEAP))):
+    job = await run_in_threadpool(db.get, models.Job, job_id)
+    if not job or job.user_id != current.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not await job_runner.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job is not running ({job.status})")
+    await run_in_threadpool(db.refresh, job)
+    return _job_out(job)
+
+# ---------------------- Metrics ----------------------
+
+@router.get("/metrics/caches", response_model=Dict[str, Any])
+def cache_metrics(current=Depends(require_role({ROLE_ADMIN}))):
+    return {name: stats.as_dict() for name, stats in CACHE_STATS.items()}
+
+@router.get("/metrics/streams", response_model=Dict[str, Any])
+def stream_metrics(current=Depends(require_role({ROLE_ADMIN}))):
+    return {name: stats.as_dict() for name, stats in STREAM_STATS.items()}
+
+@router.get("/metrics/limits", response_model=Dict[str, Any])
+def limit_metrics(current=Depends(require_role({ROLE_ADMIN}))):
+    return provider_limits.snapshot()
+
+@router.get("/metrics/db", response_model=Dict[str, Any])
+def db_metrics(current=Depends(require_role({ROLE_ADMIN}))):
+    return {**POOL_STATS, "pool": engine.pool.status()}
@@ -2,10 +2,137 @@ SOURCE_SEMANTIC_SCHOLAR = "semantic_scholar"
 SOURCE_OPENALEX = "openalex"
 SOURCE_CROSSREF = "crossref"
 SOURCE_UNPAYWALL = "unpaywall"
+SOURCE_OPENAI = "openai"
+SOURCE_GEMINI = "gemini"
 
 # per-job simple caps (MVP)
 MAX_RESULTS_PER_SOURCE = 50
 DEFAULT_SURVEY_RESULTS = 20
+PROVIDER_PAGE_SIZE = 20
+
+# deep retrieval: the largest page each provider's API serves, and the sweep's deadline (seconds);
+# how deep each provider is paged is capped by settings.DEEP_MAX_RESULTS_PER_SOURCE
+DEEP_PAGE_SIZES = {
+    SOURCE_SEMANTIC_SCHOLAR: 100,
+    SOURCE_OPENALEX: 200,
+    SOURCE_CROSSREF: 200,
+}
+DEEP_SEARCH_DEADLINE_SECONDS = 180.0
+
+# keyset-paginated list endpoints
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# local embedding index: hashed feature dimensions, words per document chunk,
+# and how many candidates per requested paper are fetched for re-ranking
+EMBEDDING_DIM = 256
+EMBEDDING_CHUNK_WORDS = 200
+RERANK_CANDIDATE_FACTOR = 2
+
+# cross-provider dedup: MinHash permutations, LSH bands (rows per band = perms / bands),
+# and the estimated title Jaccard at which two DOI-less records are the same paper
+DEDUP_NUM_PERM = 64
+DEDUP_BANDS = 16
+DEDUP_TITLE_THRESHOLD = 0.8
+
+# federated search deadlines (seconds)
+PROVIDER_TIMEOUT_SECONDS = 8.0
+SEARCH_DEADLINE_SECONDS = 12.0
+
+# process-wide provider limits: (requests per second, burst)
+PROVIDER_RATE_LIMITS = {
+    SOURCE_SEMANTIC_SCHOLAR: (1.0, 1),
+    SOURCE_OPENALEX: (10.0, 10),
+    SOURCE_CROSSREF: (10.0, 10),
+    SOURCE_UNPAYWALL: (10.0, 10),
+    SOURCE_OPENAI: (8.0, 16),
+    SOURCE_GEMINI: (4.0, 8),
+}
+DEFAULT_RATE_LIMIT = (5.0, 5)
+# circuit breaker: consecutive failures before opening, cool-down doubling from base up to max (seconds)
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_BASE_COOLDOWN = 5.0
+CIRCUIT_MAX_COOLDOWN = 300.0
+
+# Unpaywall enrichment
+UNPAYWALL_CONCURRENCY = 8
+OA_CACHE_TTL_SECONDS = 7 * 24 * 3600
+OA_NEGATIVE_TTL_SECONDS = 24 * 3600
+OA_CACHE_MAX_ENTRIES = 100_000
+
+# provider search-result cache: served as-is while fresh, served and refreshed in the
+# background while stale, dropped after both windows (seconds); LRU-bounded by entries
+QUERY_CACHE_FRESH_SECONDS = 24 * 3600
+QUERY_CACHE_STALE_SECONDS = 6 * 24 * 3600
+QUERY_CACHE_MAX_ENTRIES = 20_000
+# an empty page may be a provider hiccup: remember it only briefly, without a stale window
+QUERY_CACHE_EMPTY_TTL_SECONDS = 15 * 60
+
+# LLM response cache TTLs per feature (seconds)
+LLM_CACHE_TTLS = {
+    "default": 24 * 3600,
+    "survey": 6 * 3600,
+    "gaps": 24 * 3600,
+    "translate": 30 * 24 * 3600,
+    "persona": 7 * 24 * 3600,
+    "methodology": 24 * 3600,
+    "replicator": 24 * 3600,
+    "cross_domain": 24 * 3600,
+    "contradiction": 7 * 24 * 3600,
+    "citation": 7 * 24 * 3600,
+}
+
+# prompt budgets: per model family (matched by name prefix) the context window in tokens,
+# and the local estimator's characters per word token and tokens per extra UTF-8 byte
+MODEL_TOKEN_PROFILES = {
+    "gpt-4o": (128_000, 6, 0.35),
+    "gpt-4": (8_192, 5, 0.5),
+    "gemini": (1_048_576, 6, 0.35),
+    "default": (32_000, 5, 0.5),
+}
+# tokens of source text each feature puts in a prompt ("translate" is per chunk);
+# never more than this share of the model's context window
+PROMPT_BUDGETS = {
+    "default": 4000,
+    "translate": 2000,
+    "persona": 8000,
+    "citation": 6000,
+    "contradiction": 6000,  # shared by the methodology and results texts
+    "cross_domain": 6000,
+}
+PROMPT_MAX_CONTEXT_SHARE = 0.5
+# blocks larger than this are split on sentences before salience ranking
+PROMPT_BLOCK_TOKENS = 300
+
+# chunked translation
+TRANSLATE_CONCURRENCY = 4
+
+# voice transcription
+TRANSCRIBE_SEGMENT_SECONDS = 300
+# Whisper rejects files over 25 MB; segments are shortened to stay under this
+TRANSCRIBE_MAX_SEGMENT_BYTES = 24 * 1024 * 1024
+TRANSCRIBE_OVERLAP_SECONDS = 5
+TRANSCRIBE_CONCURRENCY = 4
+
+# background jobs
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+# minimum seconds between partial-result writes from a running job
+JOB_PROGRESS_INTERVAL_SECONDS = 1.0
+# a queued/running job whose row is untouched for this long lost its worker and may be
+# claimed by another; each runner touches its own jobs every third of this
+JOB_LEASE_SECONDS = 60
+# max jobs of each type running at once in this process
+JOB_CONCURRENCY = {
+    "default": 4,
+    "survey": 2,
+    "deep_search": 2,
+    "translate": 2,
+    "transcribe": 2,
+}
 
 # roles
 ROLE_ADMIN = "admin"
@@ -17,3 +144,18 @@ ROLE_SCIENTIST = "scientist"
 ROLE_OTHER = "others"
 
 RESEARCHER_LIKE_ROLES = {ROLE_SCIENTIST, ROLE_STUDENT, ROLE_EDUCATOR, ROLE_OTHER}
+
+# request quotas per tier: tier -> (requests, sliding window in seconds)
+QUOTA_CHEAP = "cheap"
+QUOTA_LLM = "llm"
+# each user's own budget, by role ("default" covers roles not listed)
+USER_QUOTAS = {
+    "default": {QUOTA_CHEAP: (300, 60), QUOTA_LLM: (60, 3600)},
+    ROLE_STUDENT: {QUOTA_CHEAP: (300, 60), QUOTA_LLM: (40, 3600)},
+    ROLE_ADMIN: {QUOTA_CHEAP: (1200, 60), QUOTA_LLM: (600, 3600)},
+}
+# pool shared by all users holding the role
+ROLE_QUOTAS = {
+    "default": {QUOTA_CHEAP: (6000, 60), QUOTA_LLM: (1500, 3600)},
+    ROLE_ADMIN: {},
+}
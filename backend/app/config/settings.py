@@ -6,13 +6,57 @@ class Settings(BaseSettings):
     PORT: int = 8000
 
     DATABASE_URL: str
+    # e.g. postgresql+asyncpg://... or sqlite+aiosqlite:///...; enables get_async_db
+    ASYNC_DATABASE_URL: str | None = None
+    # connection pool (ignored for SQLite)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
 
     JWT_SECRET: str
     JWT_EXP_MINUTES: int = 120
+    # password hashing: bcrypt cost factor and the size of its dedicated pool
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    # authenticated principals cached per (user id, token jti)
+    AUTH_CACHE_TTL_SECONDS: float = 60.0
+    AUTH_CACHE_MAX_ENTRIES: int = 10_000
+    # take role/email/name from the signed claims of tokens issued within AUTH_CACHE_TTL_SECONDS
+    # (and after the user's last role change in this process), skipping the database lookup;
+    # a role change or deletion can then take up to that TTL to reach other workers
+    AUTH_TRUST_TOKEN_CLAIMS: bool = False
 
     OPENAI_API_KEY: str
     GEMINI_API_KEY: str | None = None
 
+    # pooled HTTP transport for LLM calls
+    LLM_HTTP_TIMEOUT: float = 60.0
+    LLM_HTTP2: bool = True
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE: int = 20
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+
+    # scholarly search-result cache (stale-while-revalidate)
+    QUERY_CACHE_ENABLED: bool = True
+
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MEMORY_ENTRIES: int = 512
+    LLM_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
+    # request quotas: "memory" (per process) or "sqlite" (shared by workers on one host)
+    QUOTA_ENABLED: bool = True
+    QUOTA_BACKEND: str = "memory"
+
+    # deep retrieval (systematic reviews): papers per provider, and per sweep
+    DEEP_MAX_RESULTS_PER_SOURCE: int = 500
+    DEEP_MAX_RESULTS: int = 1000
+
+    # uploads
+    MAX_UPLOAD_BYTES: int = 100 * 1024 * 1024
+
     CROSSREF_MAILTO: str = "you@example.com"
     UNPAYWALL_EMAIL: str = "you@example.com"
     SEMANTIC_SCHOLAR_API_KEY: str | None = None
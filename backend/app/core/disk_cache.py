@@ -0,0 +1,139 @@
+"""
+Small SQLite-backed key/value cache with per-entry TTL.
+
+Values are stored as JSON. `None` is a legitimate value so callers can
+negative-cache lookups that came back empty; `get` reports presence
+separately from the value. Each cache keeps hit/miss counters in
+`CACHE_STATS` so they can be exposed for monitoring. Entry count and total
+size are kept in a one-row `totals` table by triggers, so bounding the
+cache on a write never scans the whole table, and the totals stay right
+when several processes share the file.
+
+All methods block on SQLite; async callers run them in a thread.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+CACHE_DIR = Path(__file__).resolve().parents[2] / "cache"
+CACHE_DIR.mkdir(exist_ok=True)
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        # hits served past their freshness window while a refresh runs, for caches that have one
+        self.stale_hits = 0
+        self.writes = 0
+        # upstream latency avoided by hits, for caches that record it
+        self.saved_seconds = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "negative_hits": self.negative_hits,
+            "stale_hits": self.stale_hits,
+            "writes": self.writes,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "saved_seconds": round(self.saved_seconds, 3),
+        }
+
+
+# cache name -> stats, read by the /metrics/caches endpoint
+CACHE_STATS: Dict[str, CacheStats] = {}
+
+
+class DiskCache:
+    def __init__(self, name: str, path: Path | None = None, max_entries: int | None = None, max_bytes: int | None = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = CACHE_STATS.setdefault(name, CacheStats())
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path or CACHE_DIR / f"{name}.sqlite3"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, value TEXT, expires_at REAL, accessed_at REAL, size INTEGER DEFAULT 0)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_accessed ON entries (accessed_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_expires ON entries (expires_at)")
+        self._conn.commit()
+        # one transaction, so no write from another process slips in between the seed and the triggers
+        self._conn.executescript("""
+            BEGIN IMMEDIATE;
+            CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 1), entries INTEGER, bytes INTEGER);
+            INSERT OR IGNORE INTO totals SELECT 1, COUNT(*), COALESCE(SUM(size), 0) FROM entries;
+            CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+                UPDATE totals SET entries = entries + 1, bytes = bytes + NEW.size WHERE id = 1; END;
+            CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+                UPDATE totals SET entries = entries - 1, bytes = bytes - OLD.size WHERE id = 1; END;
+            CREATE TRIGGER IF NOT EXISTS entries_au AFTER UPDATE OF size ON entries BEGIN
+                UPDATE totals SET bytes = bytes - OLD.size + NEW.size WHERE id = 1; END;
+            COMMIT;
+        """)
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] < now:
+                self.stats.misses += 1
+                return False, None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        value = json.loads(row[0])
+        self.stats.hits += 1
+        if value is None:
+            self.stats.negative_hits += 1
+        return True, value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        data = json.dumps(value)
+        with self._lock:
+            # an upsert, not INSERT OR REPLACE: REPLACE's implicit delete does not fire the delete trigger
+            self._conn.execute(
+                "INSERT INTO entries (key, value, expires_at, accessed_at, size) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at,"
+                " accessed_at = excluded.accessed_at, size = excluded.size",
+                (key, data, now + ttl, now, len(data)),
+            )
+            self._evict(now)
+            self._conn.commit()
+        self.stats.writes += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        # caller holds the lock
+        self._conn.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+        count, total = self._conn.execute("SELECT entries, bytes FROM totals").fetchone()
+        if self.max_entries and count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,),
+            )
+        if self.max_bytes:
+            total = self._conn.execute("SELECT bytes FROM totals").fetchone()[0]
+            if total > self.max_bytes:
+                # drop least recently used entries until back under the byte budget
+                freed = 0
+                doomed = []
+                for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+                    if total - freed <= self.max_bytes:
+                        break
+                    doomed.append((key,))
+                    freed += size
+                self._conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
@@ -0,0 +1,213 @@
+"""
+In-process async job runner backed by the `jobs` table.
+
+Feature endpoints submit work with `?async=true`; the runner persists every
+state transition (queued -> running -> succeeded/failed/cancelled) and the
+JSON result, and bounds concurrency per job type. Every runner keeps the rows
+of its own jobs fresh (a lease on `updated_at`) and atomically claims queued
+or running jobs whose lease ran out, so with several workers each abandoned
+job is replayed exactly once and live ones are left alone. Long handlers can publish a
+progress message and partial result with `report_progress`, so clients
+polling /jobs/{id} see results before the job finishes.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from sqlalchemy import func, update
+
+from ..db.session import SessionLocal
+from ..db import models
+from ..config.constants import (
+    JOB_CONCURRENCY, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED,
+    JOB_PROGRESS_INTERVAL_SECONDS, JOB_LEASE_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# (payload, db, current_user) -> response model / JSON-able result
+JobHandler = Callable[[Any, Any, Any], Awaitable[Any]]
+
+# id of the job whose handler is running in this task, if any
+_current_job: ContextVar[Optional[int]] = ContextVar("current_job", default=None)
+
+
+def _to_json(result: Any) -> str:
+    if isinstance(result, BaseModel):
+        result = result.model_dump(mode="json")
+    return json.dumps(result)
+
+
+class JobRunner:
+    def __init__(self, limits: Dict[str, int]):
+        self._limits = limits
+        self._handlers: Dict[str, Tuple[Type[BaseModel], JobHandler]] = {}
+        self._sems: Dict[str, asyncio.Semaphore] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._user_cancelled: set[int] = set()
+        self._last_progress: Dict[int, float] = {}
+        self._lease_task: Optional[asyncio.Task] = None
+
+    def register(self, job_type: str, params_model: Type[BaseModel], handler: JobHandler) -> None:
+        self._handlers[job_type] = (params_model, handler)
+
+    def _sem(self, job_type: str) -> asyncio.Semaphore:
+        if job_type not in self._sems:
+            self._sems[job_type] = asyncio.Semaphore(self._limits.get(job_type, self._limits["default"]))
+        return self._sems[job_type]
+
+    # -------------------- persistence (blocking, run in threadpool) --------------------
+
+    def _create(self, job_type: str, user_id: int, params: dict) -> models.Job:
+        with SessionLocal() as db:
+            job = models.Job(user_id=user_id, type=job_type, status=JOB_QUEUED, message="", params=json.dumps(params))
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            return job
+
+    def _update(self, job_id: int, **fields) -> None:
+        with SessionLocal() as db:
+            job = db.get(models.Job, job_id)
+            if job:
+                for k, v in fields.items():
+                    setattr(job, k, v)
+                db.commit()
+
+    def _claim_abandoned(self) -> list:
+        """Re-queues jobs whose lease ran out and returns them; one UPDATE, so two runners never claim the same job."""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=JOB_LEASE_SECONDS)
+        with SessionLocal() as db:
+            rows = db.execute(
+                update(models.Job)
+                .where(models.Job.status.in_([JOB_QUEUED, JOB_RUNNING]), models.Job.updated_at < cutoff)
+                .values(status=JOB_QUEUED, message="Re-queued after restart", updated_at=func.now())
+                .returning(models.Job.id, models.Job.type, models.Job.user_id, models.Job.params)
+            ).all()
+            db.commit()
+            return [tuple(r) for r in rows]
+
+    def _renew(self, job_ids: list) -> None:
+        with SessionLocal() as db:
+            db.execute(
+                update(models.Job)
+                .where(models.Job.id.in_(job_ids), models.Job.status.in_([JOB_QUEUED, JOB_RUNNING]))
+                .values(updated_at=func.now())
+            )
+            db.commit()
+
+    # -------------------- public API --------------------
+
+    async def submit(self, job_type: str, user_id: int, payload: BaseModel) -> models.Job:
+        if job_type not in self._handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        params = payload.model_dump(mode="json")
+        job = await run_in_threadpool(self._create, job_type, user_id, params)
+        self._start(job.id, job_type, user_id, params)
+        return job
+
+    async def cancel(self, job_id: int) -> bool:
+        """Cancels a job running in this process and waits (briefly) until its row says so."""
+        task = self._tasks.get(job_id)
+        if task is None:
+            return False
+        self._user_cancelled.add(job_id)
+        task.cancel()
+        await asyncio.wait({task}, timeout=5.0)
+        return True
+
+    async def progress(self, message: str, result: Callable[[], Any] | None = None, force: bool = False) -> bool:
+        """From inside a handler: store a progress message and partial result on the running job.
+
+        `result` is a thunk, only called (in a worker thread, with the
+        serialization) when a write actually happens; writes are throttled to one per JOB_PROGRESS_INTERVAL_SECONDS unless `force`.
+        Returns False (and does nothing) outside a job or when throttled.
+        """
+        job_id = _current_job.get()
+        if job_id is None:
+            return False
+        now = time.monotonic()
+        if not force and now - self._last_progress.get(job_id, 0.0) < JOB_PROGRESS_INTERVAL_SECONDS:
+            return False
+        self._last_progress[job_id] = now
+        fields = {"message": message}
+        if result is not None:
+            fields["result"] = await run_in_threadpool(lambda: _to_json(result()))
+        await run_in_threadpool(self._update, job_id, **fields)
+        return True
+
+    async def start(self) -> None:
+        """Recovers abandoned jobs now, then keeps leases fresh and keeps recovering in the background."""
+        await self.recover()
+        self._lease_task = asyncio.create_task(self._maintain())
+
+    async def recover(self) -> None:
+        """Claim and re-queue jobs whose worker is gone; fail the ones we cannot replay."""
+        for job_id, job_type, user_id, params in await run_in_threadpool(self._claim_abandoned):
+            if job_type in self._handlers and params:
+                self._start(job_id, job_type, user_id, json.loads(params))
+            else:
+                await run_in_threadpool(self._update, job_id, status=JOB_FAILED, message="Interrupted by restart")
+
+    async def _maintain(self) -> None:
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+            try:
+                if self._tasks:
+                    await run_in_threadpool(self._renew, list(self._tasks))
+                await self.recover()
+            except Exception:
+                logger.exception("job lease renewal failed")
+
+    async def shutdown(self) -> None:
+        # leave DB state as-is so another worker (or the next process) recovers these jobs
+        if self._lease_task is not None:
+            self._lease_task.cancel()
+        tasks = list(self._tasks.values())
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # -------------------- execution --------------------
+
+    def _start(self, job_id: int, job_type: str, user_id: int, params: dict) -> None:
+        task = asyncio.create_task(self._run(job_id, job_type, user_id, params))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def _run(self, job_id: int, job_type: str, user_id: int, params: dict) -> None:
+        params_model, handler = self._handlers[job_type]
+        _current_job.set(job_id)
+        try:
+            async with self._sem(job_type):
+                await run_in_threadpool(self._update, job_id, status=JOB_RUNNING)
+                db = SessionLocal()
+                try:
+                    user = await run_in_threadpool(db.get, models.User, user_id)
+                    result = await handler(params_model(**params), db, user)
+                finally:
+                    await run_in_threadpool(db.close)
+            await run_in_threadpool(self._update, job_id, status=JOB_SUCCEEDED, message="", result=_to_json(result))
+        except asyncio.CancelledError:
+            if job_id in self._user_cancelled:
+                self._user_cancelled.discard(job_id)
+                await run_in_threadpool(self._update, job_id, status=JOB_CANCELLED, message="Cancelled by user")
+            raise
+        except Exception as e:
+            await run_in_threadpool(self._update, job_id, status=JOB_FAILED, message=str(e))
+        finally:
+            self._last_progress.pop(job_id, None)
+
+
+job_runner = JobRunner(JOB_CONCURRENCY)
+
+
+async def report_progress(message: str, result: Callable[[], Any] | None = None, force: bool = False) -> bool:
+    return await job_runner.progress(message, result, force)
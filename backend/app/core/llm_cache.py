@@ -0,0 +1,81 @@
+"""
+Content-addressed cache for LLM responses.
+
+Keys hash (model, system, normalized prompt, temperature), so prompts that
+only differ in whitespace or Unicode composition share an entry. Lookups go
+through an in-process LRU first, then a shared SQLite tier that survives
+restarts and is evicted by total size; the SQLite tier is read and written
+in a worker thread, off the event loop. TTLs are set per feature and hit
+rate / saved latency are tracked per feature in CACHE_STATS ("llm:<feature>").
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+
+from .disk_cache import DiskCache, CacheStats, CACHE_STATS
+from ..config.settings import settings
+from ..config.constants import LLM_CACHE_TTLS
+
+
+def normalize_prompt(text: str) -> str:
+    text = unicodedata.normalize("NFC", text)
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r" ?\n ?", "\n", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def cache_key(model: str, system: str, prompt: str, temperature: float) -> str:
+    raw = json.dumps([model, normalize_prompt(system), normalize_prompt(prompt), round(temperature, 3)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, memory_entries: int, max_bytes: int):
+        self.memory_entries = memory_entries
+        # key -> (text, original latency, expires_at)
+        self._memory: "OrderedDict[str, tuple[str, float, float]]" = OrderedDict()
+        self.disk = DiskCache("llm_responses", max_bytes=max_bytes)
+
+    def _stats(self, feature: str) -> CacheStats:
+        return CACHE_STATS.setdefault(f"llm:{feature}", CacheStats())
+
+    async def get(self, feature: str, key: str) -> Optional[str]:
+        stats = self._stats(feature)
+        entry = self._memory.get(key)
+        if entry and entry[2] > time.time():
+            self._memory.move_to_end(key)
+        else:
+            entry = None
+            found, value = await asyncio.to_thread(self.disk.get, key)
+            if found and value:
+                entry = (value["text"], value["latency"], value["expires_at"])
+                self._remember(key, entry)
+        if entry is None:
+            stats.misses += 1
+            return None
+        stats.hits += 1
+        stats.saved_seconds += entry[1]
+        return entry[0]
+
+    async def put(self, feature: str, key: str, text: str, latency: float) -> None:
+        ttl = LLM_CACHE_TTLS.get(feature, LLM_CACHE_TTLS["default"])
+        expires_at = time.time() + ttl
+        self._remember(key, (text, latency, expires_at))
+        await asyncio.to_thread(self.disk.set, key, {"text": text, "latency": latency, "expires_at": expires_at}, ttl)
+        self._stats(feature).writes += 1
+
+    def _remember(self, key: str, entry: tuple) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+
+llm_cache = LLMCache(settings.LLM_CACHE_MEMORY_ENTRIES, settings.LLM_CACHE_MAX_BYTES)
@@ -7,10 +7,18 @@ No other file changes are needed.
 """
 
 import os
+import re
+import json
+import time
 import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 import httpx
 from dotenv import load_dotenv
 from ..config.settings import settings
+from ..config.constants import SOURCE_OPENAI, SOURCE_GEMINI
+from .llm_cache import llm_cache, cache_key
+from .rate_limiter import provider_limits, CircuitOpenError
 
 
 # Load environment
@@ -41,15 +49,91 @@ except Exception as e:
     print(f"Gemini client initialization failed: {e}")
     gemini_client = None 
 
+# -------------------------------------------------------------------
+# 🔌 Pooled OpenAI transport — opened at app startup, closed at shutdown
+# -------------------------------------------------------------------
+_openai_client: httpx.AsyncClient | None = None
+_openai_loop: asyncio.AbstractEventLoop | None = None
+
+def _new_openai_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=settings.LLM_HTTP_TIMEOUT,
+        http2=settings.LLM_HTTP2,
+        limits=httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+async def start_llm_transport() -> None:
+    global _openai_client, _openai_loop
+    if _openai_client is None:
+        _openai_client = _new_openai_client()
+        _openai_loop = asyncio.get_running_loop()
+
+async def close_llm_transport() -> None:
+    global _openai_client, _openai_loop
+    if _openai_client is not None:
+        await _openai_client.aclose()
+    _openai_client = None
+    _openai_loop = None
+
+@asynccontextmanager
+async def openai_client():
+    """
+    Yields the app-wide pooled client. Callers running on another event loop
+    (scripts, asyncio.run) cannot share its connections and get a short-lived one.
+    """
+    if _openai_client is not None and _openai_loop is asyncio.get_running_loop():
+        yield _openai_client
+    else:
+        async with _new_openai_client() as client:
+            yield client
+
 # -------------------------------------------------------------------
 # 🧠 Unified Async LLM Chat Function
 # -------------------------------------------------------------------
+# failed calls come back as bracketed error text (see _llm_call and the streams)
+_ERROR_OUTPUT = re.compile(r"\[(?:OpenAI API call failed|Gemini API error|No text output from Gemini)")
+
+def is_error_output(text: str) -> bool:
+    """True for llm_chat/llm_stream output that is, or ends in, a failed call's error text."""
+    return not text.strip() or bool(_ERROR_OUTPUT.search(text))
+
+def active_model(model_gpt: str = "gpt-4o", model_gemini: str = "gemini-2.5-pro") -> str:
+    return model_gemini if llm_choice.lower() == "gemini" else model_gpt
+
 async def llm_chat(
     prompt: str,
     system: str = "You are a helpful research assistant.",
     model_gpt: str = "gpt-4o",              # <-- RESTORED
-    model_gemini: str = "gemini-2.5-pro" # <-- RESTORED
+    model_gemini: str = "gemini-2.5-pro", # <-- RESTORED
+    temperature: float = 0.2,
+    feature: str = "default",
+    use_cache: bool = True,
 ) -> str:
+    """
+    Answers from the response cache when the same (model, system, prompt,
+    temperature) was seen before; `use_cache=False` forces a fresh call.
+    Error outputs are never cached.
+    """
+    model = active_model(model_gpt, model_gemini)
+    key = None
+    if use_cache and settings.LLM_CACHE_ENABLED:
+        key = cache_key(model, system, prompt, temperature)
+        cached = await llm_cache.get(feature, key)
+        if cached is not None:
+            return cached
+
+    t0 = time.perf_counter()
+    text, ok = await _llm_call(prompt, system, model, temperature)
+    if key and ok:
+        await llm_cache.put(feature, key, text, time.perf_counter() - t0)
+    return text
+
+async def _llm_call(prompt: str, system: str, model: str, temperature: float) -> tuple[str, bool]:
+    """Returns (text, ok); failures come back as bracketed error text with ok=False."""
 
     # ---------- CASE 1: GEMINI ----------
     if llm_choice.lower() == "gemini":
@@ -62,21 +146,22 @@ async def llm_chat(
             # --- FIX 2 & 3: Correct API call and pass System Instruction (via config) ---
             
             # The system instruction is passed via the config/system_instruction
-            resp = await asyncio.to_thread(
-                gemini_client.models.generate_content, # Correct method
-                model=model_gemini,
-                contents=prompt,
-                config={
-                    "system_instruction": system, # Correct way to set system role
-                    "temperature": 0.2
-                }
-            )
+            async with provider_limits.guard(SOURCE_GEMINI):
+                resp = await asyncio.to_thread(
+                    gemini_client.models.generate_content, # Correct method
+                    model=model,
+                    contents=prompt,
+                    config={
+                        "system_instruction": system, # Correct way to set system role
+                        "temperature": temperature
+                    }
+                )
             
             if resp.text:
-                return resp.text.strip()
-            return "[No text output from Gemini]"
+                return resp.text.strip(), True
+            return "[No text output from Gemini]", False
         except Exception as e:
-            return f"[Gemini API error: {str(e)}]"
+            return f"[Gemini API error: {str(e)}]", False
 
     # ---------- CASE 2: CHATGPT (OpenAI) ----------
     
@@ -85,19 +170,130 @@ async def llm_chat(
         "Content-Type": "application/json"
     }
     payload = {
-        "model": model_gpt,
+        "model": model,
         "messages": [
             {"role": "system", "content": system},
             {"role": "user", "content": prompt}
         ],
-        "temperature": 0.2
+        "temperature": temperature
     }
 
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        async with provider_limits.guard(SOURCE_OPENAI), openai_client() as client:
             r = await client.post(f"{OPENAI_API_BASE}/chat/completions", headers=headers, json=payload)
             r.raise_for_status()
             data = r.json()
-            return data["choices"][0]["message"]["content"]
+            return data["choices"][0]["message"]["content"], True
+    except Exception as e:
+        return f"[OpenAI API call failed: {e}]", False
+
+# -------------------------------------------------------------------
+# 🌊 Streaming counterpart of llm_chat (token deltas as they arrive)
+# -------------------------------------------------------------------
+async def llm_stream(
+    prompt: str,
+    system: str = "You are a helpful research assistant.",
+    model_gpt: str = "gpt-4o",
+    model_gemini: str = "gemini-2.5-pro",
+    temperature: float = 0.2,
+    feature: str = "default",
+    use_cache: bool = True,
+) -> AsyncIterator[str]:
+    """
+    Yields text deltas. Shares the response cache with llm_chat: a cached
+    answer is replayed as a single delta, and a complete, error-free stream
+    is stored for later calls.
+    """
+    model = active_model(model_gpt, model_gemini)
+    key = None
+    if use_cache and settings.LLM_CACHE_ENABLED:
+        key = cache_key(model, system, prompt, temperature)
+        cached = await llm_cache.get(feature, key)
+        if cached is not None:
+            yield cached
+            return
+
+    t0 = time.perf_counter()
+    parts = []
+    ok = True
+    source = _gemini_stream if llm_choice.lower() == "gemini" else _openai_stream
+    async for delta, delta_ok in source(prompt, system, model, temperature):
+        ok = ok and delta_ok
+        parts.append(delta)
+        yield delta
+    if key and ok and parts:
+        await llm_cache.put(feature, key, "".join(parts).strip(), time.perf_counter() - t0)
+
+async def _gemini_stream(prompt: str, system: str, model: str, temperature: float):
+    if not gemini_client:
+        raise RuntimeError(
+            "Gemini client failed to initialize. Check API key."
+        )
+    # the SDK stream is a blocking iterator: drain it in a thread, hand chunks over a queue
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def produce():
+        try:
+            for chunk in gemini_client.models.generate_content_stream(
+                model=model,
+                contents=prompt,
+                config={"system_instruction": system, "temperature": temperature},
+            ):
+                if chunk.text:
+                    loop.call_soon_threadsafe(queue.put_nowait, (chunk.text, True))
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, (f"[Gemini API error: {str(e)}]", False))
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+    try:
+        await provider_limits.acquire(SOURCE_GEMINI)
+    except CircuitOpenError as e:
+        yield f"[Gemini API error: {e}]", False
+        return
+    producer = asyncio.ensure_future(asyncio.to_thread(produce))
+    ok = True
+    try:
+        while (item := await queue.get()) is not None:
+            ok = ok and item[1]
+            yield item
+        await producer
+        if ok:
+            provider_limits.record_success(SOURCE_GEMINI)
+        else:
+            provider_limits.record_failure(SOURCE_GEMINI)
+    finally:
+        # a consumer that stops early must not leave a half-open probe hanging
+        provider_limits.breaker(SOURCE_GEMINI).release_probe()
+
+async def _openai_stream(prompt: str, system: str, model: str, temperature: float):
+    headers = {
+        "Authorization": f"Bearer {OPENAI_KEY}",
+        "Content-Type": "application/json"
+    }
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": temperature,
+        "stream": True
+    }
+    try:
+        async with provider_limits.guard(SOURCE_OPENAI), openai_client() as client:
+            async with client.stream("POST", f"{OPENAI_API_BASE}/chat/completions", headers=headers, json=payload) as r:
+                r.raise_for_status()
+                async for line in r.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get("choices") or [{}]
+                    delta = choices[0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta, True
     except Exception as e:
-        return f"[OpenAI API call failed: {e}]"
+        yield f"[OpenAI API call failed: {e}]", False
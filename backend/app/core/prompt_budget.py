@@ -0,0 +1,363 @@
+"""
+Token-aware prompt budgets.
+
+Features put source text (documents, drafts, methods and results) into their
+prompts. Each feature has a budget in tokens (PROMPT_BUDGETS), capped at a
+share of the active model's context window. Tokens are estimated locally
+from runs of character classes tuned per model family, so no tokenizer is loaded
+and a megabyte takes tens of milliseconds. Text over budget is compressed rather
+than cut: it is split into blocks (paragraphs, long ones on sentences), each
+scored by its section (abstract and conclusions up, references down), its
+place in that section, how central its vocabulary is to the whole text and
+whether it matches an optional focus. Headings are kept first; the best
+blocks that fit come back in document order, each gap marked with OMITTED.
+"""
+
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .llm_utils import active_model
+from ..config.constants import (
+    MODEL_TOKEN_PROFILES,
+    PROMPT_BUDGETS,
+    PROMPT_MAX_CONTEXT_SHARE,
+    PROMPT_BLOCK_TOKENS,
+)
+
+OMITTED = "[…]"
+
+# markdown headings, numbered section titles ("2.1 Methods") and ALL-CAPS titles
+_HEADING = re.compile(r"^(#{1,6}\s|\d+(\.\d+)*\.?\s+[A-Z]|[A-Z][A-Z \-]{3,}$)")
+# Latin sentence ends need following whitespace; CJK ones (。！？) do not
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|(?<=[。！？])\s*")
+_LINE = re.compile(r"[^\n]+")
+
+# estimator character classes; a run of one class is one token except that long letter runs
+# add one per `word_chars` letters, digits go in threes, punctuation in pairs, a single space
+# merges into the next word (as in BPE vocabularies) and non-ASCII text costs a fraction of a
+# token per extra UTF-8 byte
+_SPACE, _LETTER, _DIGIT, _SYMBOL, _NEWLINE, _OTHER = range(6)
+_CLASS = np.full(129, _SYMBOL, np.uint8)  # by code point; 128 stands for any non-ASCII one
+_CLASS[128] = _OTHER
+for _c in range(128):
+    _ch = chr(_c)
+    if _ch.isalpha():
+        _CLASS[_c] = _LETTER
+    elif _ch.isdigit():
+        _CLASS[_c] = _DIGIT
+    elif _ch == "\n":
+        _CLASS[_c] = _NEWLINE
+    elif _ch.isspace():
+        _CLASS[_c] = _SPACE
+_NEVER = 1 << 30
+# tokens per run of length n: ceil((n - offset) / divisor), by class
+_RUN_OFFSET = np.array([1, 0, 0, 0, 0, 0], np.int64)
+_RUN_DIVISORS = {_SPACE: _NEVER, _DIGIT: 3, _SYMBOL: 2, _NEWLINE: _NEVER, _OTHER: _NEVER}
+
+_CONTENT_WORD = re.compile(r"[a-z]{4,}")
+_STOPWORDS = frozenset(
+    "also been being both could does each from have here into just more most much must only other "
+    "over same should some such than that their them then there these they this those through under "
+    "very were what when where which while will with within would your".split()
+)
+_CITATION = re.compile(r"^\s*(\[\d+\]|\d+\.\s+[A-Z][\w'-]+,\s)")
+
+# (section-title pattern, weight); sections not listed weigh 1.0
+_SECTION_WEIGHTS = (
+    (re.compile(r"abstract|summary|highlights", re.I), 3.0),
+    (re.compile(r"conclu", re.I), 2.0),
+    (re.compile(r"introduction|overview", re.I), 1.5),
+    (re.compile(r"result|finding|discussion|evaluation", re.I), 1.3),
+    (re.compile(r"method|approach|experiment", re.I), 1.2),
+    (re.compile(r"reference|bibliograph|acknowledg|appendix|supplement", re.I), 0.1),
+)
+_FRONT_MATTER_WEIGHT = 1.5  # before the first heading: title, authors, often the abstract
+
+
+@lru_cache(maxsize=64)
+def _profile(model: str) -> Tuple[int, int, float]:
+    name = model.lower()
+    for prefix in sorted(MODEL_TOKEN_PROFILES, key=len, reverse=True):
+        if prefix != "default" and name.startswith(prefix):
+            return MODEL_TOKEN_PROFILES[prefix]
+    return MODEL_TOKEN_PROFILES["default"]
+
+
+@lru_cache(maxsize=8)
+def _run_divisors(word_chars: int) -> np.ndarray:
+    return np.array([{**_RUN_DIVISORS, _LETTER: word_chars}[k] for k in range(6)], np.int64)
+
+
+def _classes(text: str) -> Tuple[Optional[np.ndarray], np.ndarray, np.ndarray]:
+    """(code points or None for ASCII text, every character's class, start of each same-class run)."""
+    cp = None
+    if text.isascii():
+        cls = _CLASS[np.frombuffer(text.encode("ascii"), np.uint8)]
+    else:
+        cp = np.frombuffer(text.encode("utf-32-le"), np.uint32)
+        cls = _CLASS[np.minimum(cp, 128)]
+    starts = np.concatenate(([0], np.flatnonzero(cls[1:] != cls[:-1]) + 1))
+    return cp, cls, starts
+
+
+def _extra_bytes(cp: np.ndarray) -> np.ndarray:
+    # UTF-8 bytes beyond the first of each character
+    return (cp >= 0x80).astype(np.int64) + (cp >= 0x800) + (cp >= 0x10000)
+
+
+def _run_tokens(text: str, model: str) -> np.ndarray:
+    """Tokens of each run of same-class characters in `text`."""
+    _, word_chars, byte_tokens = _profile(model)
+    cp, cls, starts = _classes(text)
+    lengths = np.diff(starts, append=len(cls))
+    kind = cls[starts]
+    divisor = _run_divisors(word_chars)[kind]
+    tokens = (lengths - _RUN_OFFSET[kind] + divisor - 1) // divisor
+    if cp is not None:
+        other = np.ceil(np.add.reduceat(_extra_bytes(cp), starts) * byte_tokens).astype(np.int64)
+        tokens = np.where(kind == _OTHER, other, tokens)
+    return tokens
+
+
+class _TokenCounts:
+    """Token estimates for every span of one text: a prefix sum over its characters."""
+
+    def __init__(self, text: str, model: str):
+        self.text = text
+        self.cum = np.zeros(len(text) + 1, np.int64)
+        self._letters = np.zeros(len(text) + 1, np.int32)
+        if not text:
+            return
+        _, word_chars, byte_tokens = _profile(model)
+        cp, cls, starts = _classes(text)
+        lengths = np.diff(starts, append=len(cls))
+        run = np.repeat(np.arange(len(starts)), lengths)
+        # a run's tokens are spread over its characters (the count after its first k), so a
+        # span starting or ending inside a long unspaced run (CJK, a URL, base64) is still counted
+        k = np.arange(1, len(cls) + 1) - starts[run]
+        divisor = _run_divisors(word_chars)[cls]
+        within = (k - _RUN_OFFSET[cls] + divisor - 1) // divisor
+        if cp is not None:
+            extra = np.cumsum(_extra_bytes(cp))
+            run_extra = extra - (extra[starts] - _extra_bytes(cp[starts]))[run]
+            within = np.where(cls == _OTHER, np.ceil(run_extra * byte_tokens).astype(np.int64), within)
+        totals = within[starts + lengths - 1]
+        before = np.concatenate(([0], np.cumsum(totals)[:-1]))
+        self.cum[1:] = before[run] + within
+        np.cumsum((cls == _LETTER) | (cls == _OTHER), out=self._letters[1:])
+
+    @property
+    def total(self) -> int:
+        return int(self.cum[-1])
+
+    def __call__(self, start: int, end: int) -> int:
+        return int(self.cum[end] - self.cum[start])
+
+    def letters(self, start: int, end: int) -> int:
+        return int(self._letters[end] - self._letters[start])
+
+    def cut(self, start: int, end: int, budget: int) -> int:
+        """Furthest end within `budget` tokens from `start`, backed off to a space if one is near."""
+        p = min(end, int(np.searchsorted(self.cum, self.cum[start] + budget, side="right")) - 1)
+        space = self.text.rfind(" ", start, p)
+        if p < end and space > start + (p - start) // 2:
+            p = space
+        # a single character over budget still moves the cut forward
+        return p if p > start else min(end, start + 1)
+
+
+def estimate_tokens(text: str, model: Optional[str] = None) -> int:
+    """Approximate token count of `text` for `model` (the active model by default)."""
+    if not text:
+        return 0
+    return int(_run_tokens(text, model or active_model()).sum())
+
+
+def budget_for(feature: str, model: Optional[str] = None) -> int:
+    """Source-text tokens `feature` may put in one prompt for `model`."""
+    context = _profile(model or active_model())[0]
+    return min(PROMPT_BUDGETS.get(feature, PROMPT_BUDGETS["default"]), int(context * PROMPT_MAX_CONTEXT_SHARE))
+
+
+def is_heading(line: str) -> bool:
+    line = line.strip()
+    return bool(line) and len(line) <= 120 and not line.endswith(".") and _HEADING.match(line) is not None
+
+
+def _pack(counts: _TokenCounts, start: int, end: int, budget: int) -> Iterator[Tuple[int, int]]:
+    """Spans of text[start:end] within budget, split on sentence ends (a hard cut as last resort)."""
+    if counts(start, end) <= budget:
+        yield start, end
+        return
+    text = counts.text
+    cur = a = start
+    for b, nxt in [(m.start(), m.end()) for m in _SENTENCE_END.finditer(text, start, end)] + [(end, end)]:
+        if counts(a, b) > budget:
+            if cur < a:
+                yield cur, a
+            while counts(a, b) > budget:
+                c = counts.cut(a, b, budget)
+                yield a, c
+                a = c + len(text[c:b]) - len(text[c:b].lstrip())
+            cur = a
+        elif counts(cur, b) > budget:
+            yield cur, a
+            cur = a
+        a = nxt
+    if cur < end and text[cur:end].strip():
+        yield cur, end
+
+
+def split_to_budget(block: str, budget: int, model: Optional[str] = None) -> List[str]:
+    """Splits text over budget on sentence boundaries (a hard cut as last resort)."""
+    counts = _TokenCounts(block, model or active_model())
+    pieces = (block[s:e].strip() for s, e in _pack(counts, 0, len(block), budget))
+    return [p for p in pieces if p]
+
+
+def truncate_tokens(text: str, budget: int, model: Optional[str] = None) -> str:
+    """Longest prefix within `budget` tokens, ending at a word boundary where there is one."""
+    counts = _TokenCounts(text, model or active_model())
+    if counts.total <= budget:
+        return text
+    return text[:counts.cut(0, len(text), budget)].rstrip()
+
+
+# -------------------- salience compression --------------------
+
+def _blocks(counts: _TokenCounts, block_budget: int) -> List[Tuple[int, int, bool]]:
+    """(start, end, is_heading) in document order; heading lines are blocks of their own."""
+    text, out = counts.text, []
+    para, para_end, prev_end = None, 0, 0
+    # blank lines end paragraphs; single-newline text (as PDF extraction gives) still breaks at headings
+    for m in _LINE.finditer(text):
+        line = m.group()
+        heading = is_heading(line)
+        if para is not None and (heading or not line.strip() or text.count("\n", prev_end, m.start()) > 1):
+            out.extend((s, e, False) for s, e in _pack(counts, para, para_end, block_budget))
+            para = None
+        if heading:
+            out.append((m.start(), m.end(), True))
+        elif line.strip():
+            if para is None:
+                para = m.start()
+            para_end = m.end()
+        prev_end = m.end()
+    if para is not None:
+        out.extend((s, e, False) for s, e in _pack(counts, para, para_end, block_budget))
+    return out
+
+
+def _section_weight(title: Optional[str]) -> float:
+    if title is None:
+        return _FRONT_MATTER_WEIGHT
+    for pattern, weight in _SECTION_WEIGHTS:
+        if pattern.search(title):
+            return weight
+    return 1.0
+
+
+def _content_words(text: str) -> List[str]:
+    return [w for w in _CONTENT_WORD.findall(text.lower()) if w not in _STOPWORDS]
+
+
+def _scores(blocks: Sequence[Tuple[str, bool]], sparse: Sequence[bool], focus: Optional[str]) -> List[float]:
+    words = [_content_words(b) for b, _ in blocks]
+    doc_counts = Counter(w for ws in words for w in ws)
+    focus_stems = {w[:6] for w in _content_words(focus or "")}
+
+    scores, title, weight, index, focus_hit = [], None, _FRONT_MATTER_WEIGHT, 0, False
+    for (block, heading), ws, few_letters in zip(blocks, words, sparse):
+        if heading:
+            title, weight, index = block, _section_weight(block), 0
+            focus_hit = bool(focus_stems & {w[:6] for w in ws})
+            # headings go first unless the section itself is discounted (references)
+            scores.append(math.inf if weight >= 1.0 else weight)
+            continue
+        if title is None and block.lstrip().lower().startswith("abstract"):
+            title, weight, index = "abstract", _section_weight("abstract"), 0
+        distinct = set(ws)
+        # blocks built from the document's recurring terms carry its main thread
+        centrality = sum(math.log1p(doc_counts[w]) for w in distinct) / (len(distinct) + 8)
+        s = weight * (1.0 + 1.0 / (1 + index)) * (0.5 + centrality)
+        if focus_stems:
+            hits = len(focus_stems & {w[:6] for w in distinct})
+            s *= 1.0 + 0.5 * hits + (0.5 if focus_hit else 0.0)
+        if few_letters or _CITATION.match(block):
+            s *= 0.3  # tables, numbers, reference entries
+        scores.append(s)
+        index += 1
+    return scores
+
+
+def _assemble(blocks: Sequence[Tuple[str, bool]], kept: Sequence[int]) -> str:
+    parts, last = [], -1
+    for i in kept:
+        if i != last + 1:
+            parts.append(OMITTED)
+        parts.append(blocks[i][0])
+        last = i
+    if last != len(blocks) - 1:
+        parts.append(OMITTED)
+    return "\n\n".join(parts)
+
+
+def fit_to_budget(
+    text: str,
+    feature: str = "default",
+    model: Optional[str] = None,
+    focus: Optional[str] = None,
+    budget: Optional[int] = None,
+) -> str:
+    """`text` unchanged if it fits the feature's budget, else its most salient blocks that do."""
+    model = model or active_model()
+    budget = budget_for(feature, model) if budget is None else budget
+    counts = _TokenCounts(text, model)
+    if counts.total <= budget:
+        return text
+    spans = [(s, e, h) for s, e, h in _blocks(counts, min(PROMPT_BLOCK_TOKENS, budget)) if text[s:e].strip()]
+    blocks = [(text[s:e].strip(), h) for s, e, h in spans]
+    tokens = [counts(s, e) for s, e, _ in spans]
+    sparse = [counts.letters(s, e) < 0.5 * (e - s) for s, e, _ in spans]
+    scores = _scores(blocks, sparse, focus)
+
+    kept, used = [], 0
+    # each kept block may also cost a separator and an omission marker
+    for i in sorted(range(len(blocks)), key=lambda i: -scores[i]):
+        cost = tokens[i] + 3
+        if used + cost <= budget:
+            kept.append(i)
+            used += cost
+    kept.sort()
+    out = _assemble(blocks, kept)
+    while kept and estimate_tokens(out, model) > budget:
+        kept.remove(min(kept, key=lambda i: scores[i]))
+        out = _assemble(blocks, kept)
+    return out
+
+
+def fit_all(
+    texts: Sequence[str],
+    feature: str,
+    model: Optional[str] = None,
+    focus: Optional[str] = None,
+) -> List[str]:
+    """Fits several texts into one feature budget: short ones whole, the rest in equal shares."""
+    model = model or active_model()
+    left = budget_for(feature, model)
+    sizes = [estimate_tokens(t, model) for t in texts]
+    shares = list(sizes)
+    pending = sorted(range(len(texts)), key=sizes.__getitem__)
+    while pending:
+        share = left // len(pending)
+        if sizes[pending[0]] > share:
+            for i in pending:
+                shares[i] = share
+            break
+        left -= sizes[pending.pop(0)]
+    return [fit_to_budget(t, feature, model, focus, budget=s) for t, s in zip(texts, shares)]
@@ -0,0 +1,200 @@
+"""
+Per-user and per-role request quotas.
+
+Each authenticated call is charged to a tier (cheap reads/writes vs.
+LLM-backed features) against two sliding windows: the user's own budget and
+a pool shared by everyone with the same role, both from `config/constants.py`.
+Counters live in memory, or in a SQLite file when several workers must share
+them (`QUOTA_BACKEND=sqlite`). Rejections are 429s with Retry-After and
+X-RateLimit-* headers; allowed calls get the X-RateLimit-* headers from
+RateLimitHeadersMiddleware, so they also reach responses that endpoints
+build themselves (202 job submissions, SSE streams, list pages).
+"""
+
+import math
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request
+
+from .disk_cache import CACHE_DIR
+from .security import get_current_user
+from ..config.settings import settings
+from ..config.constants import USER_QUOTAS, ROLE_QUOTAS
+
+# tier -> (requests, window seconds)
+QuotaTable = Dict[str, Dict[str, Tuple[int, int]]]
+
+
+# -------------------- counter backends --------------------
+
+class MemoryCounters:
+    def __init__(self):
+        self._counts: Dict[Tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            yield self
+
+    def get(self, key: str, window: int) -> int:
+        return self._counts.get((key, window), 0)
+
+    def incr(self, key: str, window: int) -> None:
+        self._counts[(key, window)] = self._counts.get((key, window), 0) + 1
+        self._counts.pop((key, window - 2), None)
+
+
+class SQLiteCounters:
+    """Counters shared by every worker process on the host."""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS counters ("
+            " key TEXT, window INTEGER, count INTEGER, PRIMARY KEY (key, window))"
+        )
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            # take the write lock up front so check-then-increment is atomic across processes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def get(self, key: str, window: int) -> int:
+        row = self._conn.execute("SELECT count FROM counters WHERE key = ? AND window = ?", (key, window)).fetchone()
+        return row[0] if row else 0
+
+    def incr(self, key: str, window: int) -> None:
+        self._conn.execute(
+            "INSERT INTO counters (key, window, count) VALUES (?, ?, 1)"
+            " ON CONFLICT (key, window) DO UPDATE SET count = count + 1",
+            (key, window),
+        )
+        self._conn.execute("DELETE FROM counters WHERE key = ? AND window < ?", (key, window - 1))
+
+
+# -------------------- sliding-window limiter --------------------
+
+@dataclass
+class QuotaDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int          # seconds until the current window rolls over
+    retry_after: int = 0
+
+
+class QuotaLimiter:
+    def __init__(self, counters, user_quotas: QuotaTable, role_quotas: QuotaTable):
+        self.counters = counters
+        self.user_quotas = user_quotas
+        self.role_quotas = role_quotas
+
+    @staticmethod
+    def _rule(table: QuotaTable, role: str, tier: str) -> Optional[Tuple[int, int]]:
+        return table.get(role, table.get("default", {})).get(tier)
+
+    def _scopes(self, user, tier: str):
+        for key, rule in (
+            (f"user:{user.id}:{tier}", self._rule(self.user_quotas, user.role, tier)),
+            (f"role:{user.role}:{tier}", self._rule(self.role_quotas, user.role, tier)),
+        ):
+            if rule:
+                yield key, rule
+
+    def check(self, user, tier: str, now: float | None = None) -> QuotaDecision:
+        """Charges one request to the user's and the role's window, unless either is exhausted."""
+        now = time.time() if now is None else now
+        tightest = QuotaDecision(True, 0, math.inf, 0)
+        charges = []
+        with self.counters.transaction() as c:
+            for key, (limit, window) in self._scopes(user, tier):
+                idx = int(now // window)
+                elapsed = now - idx * window
+                prev, curr = c.get(key, idx - 1), c.get(key, idx)
+                # sliding-window estimate: the previous window counts in proportion to its overlap
+                used = prev * (1 - elapsed / window) + curr
+                reset = math.ceil(window - elapsed)
+                if used + 1 > limit:
+                    if curr + 1 > limit or prev == 0:
+                        wait = window - elapsed
+                    else:
+                        wait = window * (1 - (limit - 1 - curr) / prev) - elapsed
+                    return QuotaDecision(False, limit, 0, reset, max(1, math.ceil(wait)))
+                remaining = int(limit - used - 1)
+                if remaining < tightest.remaining:
+                    tightest = QuotaDecision(True, limit, remaining, reset)
+                charges.append((key, idx))
+            for key, idx in charges:
+                c.incr(key, idx)
+        return tightest
+
+
+def _counters():
+    if settings.QUOTA_BACKEND == "sqlite":
+        return SQLiteCounters(CACHE_DIR / "quotas.sqlite3")
+    return MemoryCounters()
+
+
+quota_limiter = QuotaLimiter(_counters(), USER_QUOTAS, ROLE_QUOTAS)
+
+
+# -------------------- FastAPI integration --------------------
+
+def enforce_quota(user, tier: str, request: Request | None = None) -> None:
+    if not settings.QUOTA_ENABLED:
+        return
+    d = quota_limiter.check(user, tier)
+    headers = {
+        "X-RateLimit-Limit": str(d.limit),
+        "X-RateLimit-Remaining": str(d.remaining),
+        "X-RateLimit-Reset": str(d.reset),
+    }
+    if not d.allowed:
+        headers["Retry-After"] = str(d.retry_after)
+        raise HTTPException(status_code=429, detail=f"Quota exceeded for {tier} requests", headers=headers)
+    if request is not None and d.limit:
+        request.state.rate_limit_headers = headers
+
+
+def require_quota(tier: str):
+    """Like get_current_user, but charges the call to the user's `tier` quota."""
+    def dep(request: Request, user=Depends(get_current_user)):
+        enforce_quota(user, tier, request)
+        return user
+    return dep
+
+
+class RateLimitHeadersMiddleware:
+    """Adds the X-RateLimit-* headers that enforce_quota left on the request to whatever response goes out."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        async def send_with_headers(message):
+            headers = scope.get("state", {}).get("rate_limit_headers")
+            if message["type"] == "http.response.start" and headers:
+                present = {k.lower() for k, _ in message.get("headers", [])}
+                extra = [(k.lower().encode(), v.encode()) for k, v in headers.items() if k.lower().encode() not in present]
+                message["headers"] = list(message.get("headers", [])) + extra
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
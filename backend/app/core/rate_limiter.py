@@ -1,6 +1,232 @@
+"""
+Process-wide rate limiting and circuit breaking for external providers.
+
+Each provider (scholarly APIs, OpenAI, Gemini) gets a token bucket and a
+half-open circuit breaker that live for the life of the process, so one
+request's failures protect the next. A 429/503 with Retry-After opens the
+breaker for exactly that long; other failures open it after a threshold
+with exponential cool-down. `JobCircuit` remains the per-request view used
+by the survey pipeline.
+
+A caller with a deadline passes `max_wait`: if its turn in the bucket is
+further off than that it fails fast with RateLimitWaitError instead of
+queueing, and a waiter that gives up (fails fast or is cancelled) returns
+its token, so abandoned calls leave no debt for the next caller.
+"""
+
+import time
+import asyncio
 from collections import defaultdict
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import httpx
+
+from ..config.constants import (
+    PROVIDER_RATE_LIMITS, DEFAULT_RATE_LIMIT,
+    CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_BASE_COOLDOWN, CIRCUIT_MAX_COOLDOWN,
+)
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class RateLimitWaitError(RuntimeError):
+    """The provider's bucket would make the caller wait past its deadline."""
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.waited_seconds = 0.0
+
+    def reserve(self) -> float:
+        """Takes a token (possibly going into debt) and returns how long to wait for it."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self) -> None:
+        """Returns a reserved token that will not be used."""
+        self.tokens = min(self.burst, self.tokens + 1)
+
+    async def acquire(self, max_wait: Optional[float] = None) -> None:
+        wait = self.reserve()
+        if max_wait is not None and wait > max_wait:
+            self.refund()
+            raise RateLimitWaitError(f"rate limit wait {wait:.1f}s exceeds {max(max_wait, 0.0):.1f}s")
+        if wait > 0:
+            self.waited_seconds += wait
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.refund()
+                raise
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, threshold: int, base_cooldown: float, max_cooldown: float):
+        self.threshold = threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.open_until = 0.0
+        self.probe_in_flight = False
+
+    def is_open(self) -> bool:
+        return self.state == self.OPEN and time.monotonic() < self.open_until
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if time.monotonic() < self.open_until:
+                return False
+            self.state = self.HALF_OPEN
+        # half-open: let a single probe through
+        if self.probe_in_flight:
+            return False
+        self.probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.probe_in_flight = False
+
+    def record_failure(self, retry_after: Optional[float] = None) -> None:
+        self.failures += 1
+        self.probe_in_flight = False
+        if retry_after is None and self.state != self.HALF_OPEN and self.failures < self.threshold:
+            return
+        cooldown = retry_after if retry_after is not None else min(self.max_cooldown, self.base_cooldown * 2 ** self.trips)
+        self.trips += 1
+        self.state = self.OPEN
+        self.open_until = time.monotonic() + cooldown
+
+    def release_probe(self) -> None:
+        self.probe_in_flight = False
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Retry-After (seconds or HTTP date) from a 429/503 response, if the error carries one."""
+    if not isinstance(exc, httpx.HTTPStatusError) or exc.response.status_code not in (429, 503):
+        return None
+    value = exc.response.headers.get("Retry-After")
+    if not value:
+        return CIRCUIT_BASE_COOLDOWN
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return CIRCUIT_BASE_COOLDOWN
+
+
+class ProviderLimiter:
+    def __init__(self, limits: Dict[str, tuple]):
+        self._limits = limits
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.counters: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def bucket(self, name: str) -> TokenBucket:
+        if name not in self._buckets:
+            self._buckets[name] = TokenBucket(*self._limits.get(name, DEFAULT_RATE_LIMIT))
+        return self._buckets[name]
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        if name not in self._breakers:
+            self._breakers[name] = CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_BASE_COOLDOWN, CIRCUIT_MAX_COOLDOWN)
+        return self._breakers[name]
+
+    def set_limit(self, name: str, rate: float, burst: int) -> None:
+        self._limits = {**self._limits, name: (rate, burst)}
+        self._buckets.pop(name, None)
+
+    def is_open(self, name: str) -> bool:
+        return self.breaker(name).is_open()
+
+    async def acquire(self, name: str, max_wait: Optional[float] = None) -> None:
+        if not self.breaker(name).allow():
+            self.counters[name]["rejected"] += 1
+            raise CircuitOpenError(f"{name} circuit is open")
+        try:
+            await self.bucket(name).acquire(max_wait)
+        except RateLimitWaitError:
+            self.counters[name]["wait_exceeded"] += 1
+            self.breaker(name).release_probe()
+            raise
+        except asyncio.CancelledError:
+            self.breaker(name).release_probe()
+            raise
+        self.counters[name]["calls"] += 1
+
+    def record_success(self, name: str) -> None:
+        self.breaker(name).record_success()
+
+    def record_failure(self, name: str, exc: BaseException | None = None) -> None:
+        retry_after = retry_after_seconds(exc) if exc is not None else None
+        if retry_after is not None:
+            self.counters[name]["throttled"] += 1
+        self.counters[name]["failures"] += 1
+        self.breaker(name).record_failure(retry_after)
+
+    @asynccontextmanager
+    async def guard(self, name: str, max_wait: Optional[float] = None):
+        """Rate-limits the enclosed call and reports its outcome to the provider's breaker."""
+        await self.acquire(name, max_wait)
+        done = False
+        try:
+            yield
+            done = True
+            self.record_success(name)
+        except Exception as e:
+            done = True
+            self.record_failure(name, e)
+            raise
+        finally:
+            if not done:
+                # cancelled mid-call: free a half-open probe slot without judging the provider
+                self.breaker(name).release_probe()
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        out = {}
+        for name in sorted(set(self._buckets) | set(self._breakers)):
+            b, br = self.bucket(name), self.breaker(name)
+            out[name] = {
+                "rate_per_sec": b.rate,
+                "burst": b.burst,
+                "tokens": round(max(b.tokens, 0.0), 2),
+                "waited_seconds": round(b.waited_seconds, 2),
+                "circuit": br.state,
+                "consecutive_failures": br.failures,
+                "reopens_in": round(max(0.0, br.open_until - now), 1) if br.state == br.OPEN else 0.0,
+                **self.counters[name],
+            }
+        return out
+
+
+provider_limits = ProviderLimiter(PROVIDER_RATE_LIMITS)
+
 
 class JobCircuit:
+    """Per-request view: sources switched off for this job, plus any tripped process-wide breaker."""
+
     def __init__(self):
         self.off = set()
         self.counts = defaultdict(int)
@@ -9,7 +235,7 @@ class JobCircuit:
         self.off.add(source)
 
     def is_off(self, source: str) -> bool:
-        return source in self.off
+        return source in self.off or provider_limits.is_open(source)
 
     def inc(self, source: str):
         self.counts[source] += 1
@@ -1,5 +1,6 @@
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 from .security import get_current_user
+from .quotas import enforce_quota
 from ..config.constants import RESEARCHER_LIKE_ROLES, ROLE_REVIEWER
 
 class Roles:
@@ -7,9 +8,11 @@ class Roles:
     def researcher_like():
         return RESEARCHER_LIKE_ROLES
 
-def require_role(allowed: set):
-    def dep(user=Depends(get_current_user)):
+def require_role(allowed: set, quota: str | None = None):
+    def dep(request: Request, user=Depends(get_current_user)):
         if user.role not in allowed:
             raise HTTPException(status_code=403, detail="Forbidden for your role")
+        if quota:
+            enforce_quota(user, quota, request)
         return user
     return dep
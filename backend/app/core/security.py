@@ -1,19 +1,29 @@
+import asyncio
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from passlib.context import CryptContext
-from sqlalchemy import select
-from sqlalchemy.orm import Session
 
 from ..config.settings import settings
-from ..db.session import get_db
+from ..db.session import SessionLocal
 from ..db import models
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing; hashes made with another cost factor are flagged for rehash on login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 bearer = HTTPBearer()
 
+# bcrypt is deliberately CPU-heavy (and releases the GIL): it gets its own bounded pool
+# so a login burst cannot starve the threadpool shared by sync endpoints and dependencies
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
 # -------------------- Password Utilities --------------------
 
 def get_password_hash(password: str) -> str:
@@ -22,12 +32,20 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
+async def hash_password(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_hash_executor, pwd_context.hash, password)
+
+async def verify_and_update_password(plain: str, hashed: str) -> tuple[bool, str | None]:
+    """Returns (valid, new_hash); new_hash is set when the stored hash should be replaced."""
+    return await asyncio.get_running_loop().run_in_executor(_hash_executor, pwd_context.verify_and_update, plain, hashed)
+
 # -------------------- JWT Handling --------------------
 
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.JWT_EXP_MINUTES)
-    to_encode.update({"exp": expire})
+    # jti keys the principal cache; iat lets invalidation reject older role claims
+    to_encode.update({"exp": expire, "iat": datetime.now(timezone.utc), "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, settings.JWT_SECRET, algorithm="HS256")
 
 def decode_token(token: str) -> dict:
@@ -39,18 +57,99 @@ def decode_token(token: str) -> dict:
             detail="Invalid or expired token"
         )
 
+# -------------------- Principal Cache --------------------
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller, as seen by endpoints (a detached snapshot of the user row)."""
+    id: int
+    email: str
+    name: str
+    role: str
+
+
+class PrincipalCache:
+    """
+    Short-TTL cache of principals keyed by (user id, token jti). Invalidation
+    is per process; the TTL bounds staleness across workers.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, tuple[float, Principal]]" = OrderedDict()
+        self._invalidated_at: dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, uid: int, jti: str) -> Principal | None:
+        with self._lock:
+            hit = self._entries.get((uid, jti))
+            if hit is None or hit[0] < time.monotonic():
+                return None
+            self._entries.move_to_end((uid, jti))
+            return hit[1]
+
+    def put(self, jti: str, principal: Principal) -> None:
+        with self._lock:
+            self._entries[(principal.id, jti)] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end((principal.id, jti))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def claims_trusted(self, uid: int, issued_at: float | None) -> bool:
+        """
+        Signed claims are only trusted if the token was issued after the user's
+        last change here and no longer ago than the TTL: invalidation is not
+        shared between workers or kept across restarts, so the TTL bounds how
+        stale a trusted claim can be, as it does for cached principals.
+        """
+        if issued_at is None or time.time() - issued_at > self.ttl:
+            return False
+        return issued_at > self._invalidated_at.get(uid, 0.0)
+
+    def invalidate_user(self, uid: int) -> None:
+        with self._lock:
+            self._invalidated_at[uid] = time.time()
+            for key in [k for k in self._entries if k[0] == uid]:
+                del self._entries[key]
+
+
+principal_cache = PrincipalCache(settings.AUTH_CACHE_TTL_SECONDS, settings.AUTH_CACHE_MAX_ENTRIES)
+
+
+def invalidate_user(uid: int) -> None:
+    """Call after changing a user's role (or anything else carried in the principal)."""
+    principal_cache.invalidate_user(uid)
+
+
+def _load_principal(uid: int) -> Principal | None:
+    with SessionLocal() as db:
+        user = db.get(models.User, uid)
+        return Principal(user.id, user.email, user.name, user.role) if user else None
+
 # -------------------- User Authentication --------------------
 
-def get_current_user(
-    creds: HTTPAuthorizationCredentials = Depends(bearer),
-    db: Session = Depends(get_db)
-):
+def get_current_user(creds: HTTPAuthorizationCredentials = Depends(bearer)) -> Principal:
     """
-    Verifies JWT token and returns the authenticated user from the database.
+    Verifies the JWT and returns the caller. Repeat requests with the same
+    token are served from the principal cache; with AUTH_TRUST_TOKEN_CLAIMS
+    a fresh token's signed claims are used without touching the database.
     """
     payload = decode_token(creds.credentials)
     uid = int(payload.get("sub", 0))
-    user = db.get(models.User, uid)
-    if not user:
+    jti = payload.get("jti") or hashlib.sha256(creds.credentials.encode()).hexdigest()
+    principal = principal_cache.get(uid, jti)
+    if principal:
+        return principal
+    if (
+        settings.AUTH_TRUST_TOKEN_CLAIMS
+        and all(payload.get(k) is not None for k in ("role", "email", "name"))
+        and principal_cache.claims_trusted(uid, payload.get("iat"))
+    ):
+        principal = Principal(uid, payload["email"], payload["name"], payload["role"])
+    else:
+        principal = _load_principal(uid)
+    if not principal:
         raise HTTPException(status_code=401, detail="Invalid user or token")
-    return user
+    principal_cache.put(jti, principal)
+    return principal
@@ -0,0 +1,74 @@
+"""
+Server-Sent-Events helpers for streaming feature endpoints.
+
+Text deltas go out as `delta` events, dicts as `meta` events, and the stream
+ends with a `done` event carrying time-to-first-byte and total latency. The
+same timings are aggregated per endpoint in STREAM_STATS.
+"""
+
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Dict
+
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+
+class StreamStats:
+    def __init__(self):
+        self.count = 0
+        self.ttfb_ms_total = 0.0
+        self.total_ms_total = 0.0
+
+    def record(self, ttfb_ms: float, total_ms: float) -> None:
+        self.count += 1
+        self.ttfb_ms_total += ttfb_ms
+        self.total_ms_total += total_ms
+
+    def as_dict(self) -> Dict[str, Any]:
+        n = self.count or 1
+        return {
+            "streams": self.count,
+            "avg_ttfb_ms": round(self.ttfb_ms_total / n, 1),
+            "avg_total_ms": round(self.total_ms_total / n, 1),
+        }
+
+
+# endpoint name -> timings, read by the /metrics/streams endpoint
+STREAM_STATS: Dict[str, StreamStats] = {}
+
+
+def sse_event(data: Any, event: str | None = None) -> str:
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(data)}\n\n"
+
+
+def sse_response(name: str, items: AsyncIterator[Any]) -> StreamingResponse:
+    t0 = time.perf_counter()
+
+    async def gen():
+        ttfb_ms = None
+        try:
+            async for item in items:
+                if ttfb_ms is None:
+                    ttfb_ms = (time.perf_counter() - t0) * 1000
+                if isinstance(item, str):
+                    yield sse_event({"text": item}, event="delta")
+                else:
+                    yield sse_event(item, event="meta")
+        except Exception as e:
+            yield sse_event({"detail": str(e)}, event="error")
+            return
+        total_ms = (time.perf_counter() - t0) * 1000
+        ttfb_ms = total_ms if ttfb_ms is None else ttfb_ms
+        STREAM_STATS.setdefault(name, StreamStats()).record(ttfb_ms, total_ms)
+        logger.info("stream %s ttfb=%.0fms total=%.0fms", name, ttfb_ms, total_ms)
+        yield sse_event({"ttfb_ms": round(ttfb_ms, 1), "total_ms": round(total_ms, 1)}, event="done")
+
+    return StreamingResponse(
+        gen(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,7 +1,9 @@
 import re
+import unicodedata
 
 def normalize_query(q: str) -> str:
-    return re.sub(r"\s+", " ", q).strip()
+    # queries differing only in case, spacing or Unicode composition are the same search
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", q)).strip().casefold()
 
 def first_author(authors: list[str]) -> str:
     return authors[0] if authors else "Unknown"
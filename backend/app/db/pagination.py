@@ -0,0 +1,115 @@
+"""
+Keyset pagination with column projection for list endpoints.
+
+Pages are ordered by primary key and continue from an opaque cursor (the
+last id seen), so page N costs the same as page 1 on the composite
+(owner, id) indexes. Only the requested columns are selected; the body stays
+a JSON array, with the next cursor in `X-Next-Cursor`. Each page carries an
+ETag, and a matching If-None-Match gets an empty 304. For tables whose rows
+only change in known columns (`versions`), `list_response` derives the ETag
+from a keys-only query, so a 304 costs neither the full select nor the
+serialization.
+"""
+
+import base64
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+
+from ..config.constants import DEFAULT_PAGE_SIZE
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"id": last_id}).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_fields(fields: Optional[str], default: Sequence[str], allowed: Sequence[str]) -> List[str]:
+    """Columns to select: `default` unless `fields=` names others; `id` is always included."""
+    if not fields:
+        names = list(default)
+    else:
+        names = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = sorted(set(names) - set(allowed))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return ["id"] + [n for n in dict.fromkeys(names) if n != "id"]
+
+
+def _page_stmt(model, where: Sequence[Any], fields: Sequence[str], cursor: Optional[str], limit: int, newest_first: bool):
+    stmt = select(*(getattr(model, f) for f in fields)).where(*where)
+    if cursor:
+        last_id = decode_cursor(cursor)
+        stmt = stmt.where(model.id < last_id if newest_first else model.id > last_id)
+    return stmt.order_by(model.id.desc() if newest_first else model.id).limit(limit + 1)
+
+
+def keyset_page(
+    db,
+    model,
+    where: Sequence[Any],
+    fields: Sequence[str],
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    newest_first: bool = False,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    rows = [dict(r) for r in db.execute(_page_stmt(model, where, fields, cursor, limit, newest_first)).mappings()]
+    next_cursor = encode_cursor(rows[limit - 1]["id"]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def _etag(data: bytes) -> str:
+    return f'W/"{hashlib.sha256(data).hexdigest()[:32]}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    return etag in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]
+
+
+def page_response(request: Request, rows: List[Dict[str, Any]], next_cursor: Optional[str], etag: Optional[str] = None) -> Response:
+    """The page as JSON; `etag` defaults to a hash of the body."""
+    body = None if etag else json.dumps(jsonable_encoder(rows), separators=(",", ":")).encode()
+    etag = etag or _etag(body)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    if body is None:
+        body = json.dumps(jsonable_encoder(rows), separators=(",", ":")).encode()
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def list_response(
+    request: Request,
+    db,
+    model,
+    where: Sequence[Any],
+    fields: Sequence[str],
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    versions: Sequence[str] = (),
+) -> Response:
+    """A keyset page for rows that are insert-only apart from the `versions` columns.
+
+    The ETag hashes the requested fields with the page's ids and versions, read by
+    a keys-only query; the full select runs only when the client's copy is stale.
+    """
+    keys = db.execute(_page_stmt(model, where, ["id", *versions], cursor, limit, False)).all()
+    next_cursor = encode_cursor(keys[limit - 1][0]) if len(keys) > limit else None
+    etag = _etag(json.dumps([list(fields), [list(k) for k in keys[:limit]]], default=str).encode())
+    if _not_modified(request, etag):
+        return page_response(request, [], next_cursor, etag)
+    rows, next_cursor = keyset_page(db, model, where, fields, cursor, limit)
+    return page_response(request, rows, next_cursor, etag)
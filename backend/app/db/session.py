@@ -1,22 +1,94 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
-from fastapi import Depends
-from typing import Generator
+import anyio
+from typing import Any, AsyncGenerator, Dict
 from ..config.settings import settings
 
+
+def _pool_options(url: str) -> Dict[str, Any]:
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if not url.startswith("sqlite"):
+        # SQLite picks its own pool class; sizing only applies to server databases
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    return options
+
+
 # Create database engine
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+engine = create_engine(settings.DATABASE_URL, **_pool_options(settings.DATABASE_URL))
 
 # Session factory
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+# sessions opened by requests and pool checkouts, read by the /metrics/db endpoint
+POOL_STATS: Dict[str, int] = {"sessions": 0, "checkouts": 0}
+
+
+@event.listens_for(engine, "checkout")
+def _count_checkout(*_):
+    POOL_STATS["checkouts"] += 1
+
+
+class LazySession:
+    """
+    Stands in for a Session and only creates it on first use, so requests
+    that never touch the database cost neither a session nor a connection.
+    """
+
+    def __init__(self):
+        self._session: Session | None = None
+
+    def __getattr__(self, name: str):
+        if self._session is None:
+            self._session = SessionLocal()
+            POOL_STATS["sessions"] += 1
+        return getattr(self._session, name)
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+
+
+# Closing (returning the connection to the pool) gets its own threads: if it queued behind
+# endpoints on the shared threadpool, those could be waiting for the very connections being returned.
+_close_limiter = anyio.CapacityLimiter(4)
+
+
 # Dependency
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[Session, None]:
     """
-    Yields a database session for FastAPI dependencies.
+    Yields a lazily created database session for FastAPI dependencies.
+    Being async, it adds no threadpool hops to requests that never use it.
     """
-    db = SessionLocal()
+    db = LazySession()
     try:
         yield db
     finally:
-        db.close()
+        if db.started:
+            await anyio.to_thread.run_sync(db.close, limiter=_close_limiter)
+
+
+# Optional async engine (asyncpg / aiosqlite) for async endpoints; needs the async-db extra
+async_engine = None
+AsyncSessionLocal = None
+if settings.ASYNC_DATABASE_URL:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(settings.ASYNC_DATABASE_URL, **_pool_options(settings.ASYNC_DATABASE_URL))
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+async def get_async_db() -> AsyncGenerator[Any, None]:
+    """Yields an AsyncSession; only available when ASYNC_DATABASE_URL is set."""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("ASYNC_DATABASE_URL is not configured")
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,9 +1,12 @@
-import asyncio
+from fastapi.concurrency import run_in_threadpool
 from ..io.schemas import CitationValidateRequest, CitationValidateResponse
-from ..core.llm_utils import llm_chat
+from ..core.llm_utils import llm_chat, llm_stream
+from ..core.prompt_budget import fit_to_budget
 
-async def _validate(md: str, style: str):
-    prompt = f"""Draft markdown:\n{md[:15000]}\nStyle: {style}
+CITATION_SYSTEM = "You are strict about citation hygiene and styles."
+
+def _validate_prompt(md: str, style: str) -> str:
+    return f"""Draft markdown:\n{fit_to_budget(md, "citation")}\nStyle: {style}
 Tasks:
 1) Highlight sentences likely requiring citations (wrap with <<CITE?>> ... >>).
 2) Normalize any existing in-text citations to numeric [#] style.
@@ -11,9 +14,18 @@ Tasks:
 
 Return the annotated markdown followed by a References section.
 """
-    out = await llm_chat(prompt, system="You are strict about citation hygiene and styles.")
+
+async def _validate(md: str, style: str):
+    # fitting a long draft to the budget is CPU-bound; keep it off the event loop
+    prompt = await run_in_threadpool(_validate_prompt, md, style)
+    out = await llm_chat(prompt, system=CITATION_SYSTEM, feature="citation")
     # MVP: treat everything as a single blob; references extracted inline
     return CitationValidateResponse(annotated_markdown=out, references=[])
 
-def validate_citations(payload: CitationValidateRequest, db, current):
-    return asyncio.run(_validate(payload.draft_markdown, payload.style))
+async def validate_citations(payload: CitationValidateRequest, db, current):
+    return await _validate(payload.draft_markdown, payload.style)
+
+async def stream_citation_validation(payload: CitationValidateRequest, db, current):
+    prompt = await run_in_threadpool(_validate_prompt, payload.draft_markdown, payload.style)
+    async for delta in llm_stream(prompt, system=CITATION_SYSTEM, feature="citation"):
+        yield delta
@@ -1,9 +1,13 @@
-import asyncio
+from fastapi.concurrency import run_in_threadpool
 from ..io.schemas import ContradictionRequest, ContradictionResponse
 from ..core.llm_utils import llm_chat
+from ..core.prompt_budget import fit_all
 
 async def _analyze(method_text: str, results_text: str, domain: str):
-    prompt = f"""Methodology:\n{method_text[:8000]}\n\nResults:\n{results_text[:8000]}
+    # one budget for both texts: a short one is kept whole and leaves its share to the other;
+    # fitting is CPU-bound, so it runs off the event loop
+    method_text, results_text = await run_in_threadpool(fit_all, [method_text, results_text], "contradiction")
+    prompt = f"""Methodology:\n{method_text}\n\nResults:\n{results_text}
 Domain: {domain}
 Identify conflicting claims or contradictions. For each, include:
 - claim
@@ -11,8 +15,8 @@ Identify conflicting claims or contradictions. For each, include:
 - what to check (data, setup, eval)
 Return as a JSON-like bullet list (MVP text is fine).
 """
-    out = await llm_chat(prompt, system="You find inconsistencies between methods and results.")
+    out = await llm_chat(prompt, system="You find inconsistencies between methods and results.", feature="contradiction")
     return ContradictionResponse(conflicts=[{"text": out}])
 
-def analyze_contradictions(payload: ContradictionRequest, db, current):
-    return asyncio.run(_analyze(payload.methodology_text, payload.results_text, payload.domain))
+async def analyze_contradictions(payload: ContradictionRequest, db, current):
+    return await _analyze(payload.methodology_text, payload.results_text, payload.domain)
@@ -1,16 +1,19 @@
-import asyncio
+from fastapi.concurrency import run_in_threadpool
 from ..io.schemas import CrossDomainRequest, CrossDomainResponse
 from ..core.llm_utils import llm_chat
+from ..core.prompt_budget import fit_to_budget
 
 async def _synth(text: str, domains):
-    prompt = f"""Draft text:\n{text[:12000]}\n\nTarget domains: {domains}
+    # fitting a long draft to the budget is CPU-bound; keep it off the event loop
+    draft = await run_in_threadpool(fit_to_budget, text, "cross_domain", focus=" ".join(domains))
+    prompt = f"""Draft text:\n{draft}\n\nTarget domains: {domains}
 Map core constructs to each domain with concrete applications (both directions).
 Return:
 - mappings: list of {{domain, applications[], risks[]}}
 - narrative: 2-3 paragraphs
 """
-    out = await llm_chat(prompt, system="You are skilled at interdisciplinary synthesis with concrete applications.")
+    out = await llm_chat(prompt, system="You are skilled at interdisciplinary synthesis with concrete applications.", feature="cross_domain")
     return CrossDomainResponse(mappings=[{"domain": d, "applications": [], "risks": []} for d in domains], narrative=out)
 
-def synthesize_cross_domain(payload: CrossDomainRequest, db, current):
-    return asyncio.run(_synth(payload.draft_text, payload.target_domains))
+async def synthesize_cross_domain(payload: CrossDomainRequest, db, current):
+    return await _synth(payload.draft_text, payload.target_domains)
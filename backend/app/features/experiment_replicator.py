@@ -1,4 +1,3 @@
-import asyncio
 from ..io.schemas import ReplicatorRequest, ReplicatorResponse
 from ..core.llm_utils import llm_chat
 
@@ -13,9 +12,9 @@ Return:
 - overlay_json: nodesToAdd:[...], edgesToAdd:[...], annotations:[{ '{nodeId, note}' }]
 - notes: human-readable explanation
 """
-    content = await llm_chat(prompt, system="You propose careful experimental enhancements grounded in cited sources.")
+    content = await llm_chat(prompt, system="You propose careful experimental enhancements grounded in cited sources.", feature="replicator")
     overlay = {"nodesToAdd":[], "edgesToAdd":[], "annotations":[{"nodeId":"model","note":"Consider regularization from Paper [X]."}]}
     return ReplicatorResponse(overlay_json=overlay, notes=content)
 
-def suggest_experiment_variants(payload: ReplicatorRequest, db, current):
-    return asyncio.run(_replicate(payload.methodology_json, payload.candidate_papers))
+async def suggest_experiment_variants(payload: ReplicatorRequest, db, current):
+    return await _replicate(payload.methodology_json, payload.candidate_papers)
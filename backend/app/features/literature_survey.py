@@ -1,62 +1,65 @@
-import asyncio
-from typing import List
-from ..io.schemas import SurveyRequest, SurveyResponse, PaperBrief
+import logging
+import re
+from typing import Dict, List, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, insert, select
+from ..db import models
+from ..io.schemas import SurveyRequest, SurveyResponse, PaperBrief, DeepSearchRequest, DeepSearchResponse
 from ..retrieval.semantic_scholar_client import search_semantic_scholar
 from ..retrieval.openalex_client import search_openalex
 from ..retrieval.crossref_client import search_crossref
-from ..retrieval.unpaywall_client import enrich_unpaywall
+from ..retrieval.federated import Provider, federated_search, federated_stream
+from ..retrieval.oa_enrichment import enrich_papers
+from ..retrieval.dedup import normalize_doi
+from ..retrieval.search_index import search_index, source_entry
+from ..retrieval.embeddings import rerank, index_sources
 from ..core.rate_limiter import JobCircuit
-from ..config.constants import SOURCE_SEMANTIC_SCHOLAR, SOURCE_OPENALEX, SOURCE_CROSSREF, DEFAULT_SURVEY_RESULTS
-from ..core.llm_utils import llm_chat
+from ..core.jobs import report_progress
+from ..config.settings import settings
+from ..config.constants import (
+    SOURCE_SEMANTIC_SCHOLAR, SOURCE_OPENALEX, SOURCE_CROSSREF, DEFAULT_SURVEY_RESULTS, PROVIDER_PAGE_SIZE,
+    RERANK_CANDIDATE_FACTOR, DEEP_PAGE_SIZES, DEEP_SEARCH_DEADLINE_SECONDS,
+)
+from ..core.llm_utils import llm_chat, llm_stream, is_error_output
+
+logger = logging.getLogger(__name__)
+
+# offset/page are only sent for pages after the first, so a first page is the same call as before
+
+async def _s2(query: str, limit: int, year_from: int | None, year_to: int | None, offset: int = 0):
+    paging = {"offset": offset} if offset else {}
+    return await search_semantic_scholar(query, limit=limit, **paging)
+
+async def _openalex(query: str, limit: int, year_from: int | None, year_to: int | None, offset: int = 0):
+    # OpenAlex pages are 1-based and the same size throughout a sweep
+    paging = {"page": offset // limit + 1} if offset else {}
+    return await search_openalex(query, per_page=limit, year_from=year_from, year_to=year_to, **paging)
+
+async def _crossref(query: str, limit: int, year_from: int | None, year_to: int | None, offset: int = 0):
+    paging = {"offset": offset} if offset else {}
+    return await search_crossref(query, rows=limit, **paging)
+
+PROVIDERS = [
+    Provider(SOURCE_SEMANTIC_SCHOLAR, _s2, page_size=DEEP_PAGE_SIZES[SOURCE_SEMANTIC_SCHOLAR]),
+    Provider(SOURCE_OPENALEX, _openalex, page_size=DEEP_PAGE_SIZES[SOURCE_OPENALEX]),
+    Provider(SOURCE_CROSSREF, _crossref, page_size=DEEP_PAGE_SIZES[SOURCE_CROSSREF]),
+]
 
 async def _search_all(query: str, n_results: int, year_from: int | None, year_to: int | None) -> List[PaperBrief]:
-    jc = JobCircuit()
-    results: List[PaperBrief] = []
-
-    # 1) Semantic Scholar
-    if not jc.is_off(SOURCE_SEMANTIC_SCHOLAR) and len(results) < n_results:
-        try:
-            s2 = await search_semantic_scholar(query, limit=min(n_results, 20))
-            results.extend([PaperBrief(**p) for p in s2])
-        except Exception:
-            jc.mark_off(SOURCE_SEMANTIC_SCHOLAR)
-
-    # 2) OpenAlex
-    if not jc.is_off(SOURCE_OPENALEX) and len(results) < n_results:
-        try:
-            oa = await search_openalex(query, per_page=min(n_results - len(results), 20), year_from=year_from, year_to=year_to)
-            results.extend([PaperBrief(**p) for p in oa])
-        except Exception:
-            jc.mark_off(SOURCE_OPENALEX)
-
-    # 3) Crossref
-    if not jc.is_off(SOURCE_CROSSREF) and len(results) < n_results:
-        try:
-            cr = await search_crossref(query, rows=min(n_results - len(results), 20))
-            results.extend([PaperBrief(**p) for p in cr])
-        except Exception:
-            jc.mark_off(SOURCE_CROSSREF)
-
-    # trim
-    unique = []
-    seen = set()
-    for r in results:
-        key = (r.doi or r.url or r.title)
-        if key not in seen:
-            seen.add(key)
-            unique.append(r)
-        if len(unique) >= n_results:
-            break
-
-    # OA enrichment
-    enriched = []
-    for r in unique:
-        if r.doi:
-            e = await enrich_unpaywall(r.doi) or {}
-            if e.get("oa_pdf"):
-                r.url = r.url or e["oa_pdf"]
-        enriched.append(r)
-    return enriched
+    # all providers are queried concurrently, one page each (deep_search pages deeper);
+    # failing ones are switched off on the circuit
+    candidates = n_results * RERANK_CANDIDATE_FACTOR
+    unique = await federated_search(
+        query, candidates, PROVIDERS,
+        year_from=year_from, year_to=year_to,
+        limit=min(candidates, PROVIDER_PAGE_SIZE),
+        circuit=JobCircuit(),
+    )
+
+    # keep the candidates closest to the query (embedding is CPU-bound, so off the event loop),
+    # then OA-enrich only those (concurrent, cached per DOI)
+    ranked = await run_in_threadpool(rerank, query, unique)
+    return await enrich_papers(ranked[:n_results])
 
 def _build_citation_list(papers: List[PaperBrief]) -> str:
     lines = []
@@ -64,7 +67,7 @@ def _build_citation_list(papers: List[PaperBrief]) -> str:
         lines.append(f"[{idx}] {p.first_author} et al., “{p.title}”, {p.venue} {p.year}. {p.url or (p.doi and 'https://doi.org/'+p.doi) or ''}".strip())
     return "\n".join(lines)
 
-async def _draft_survey(topic: str, papers: List[PaperBrief]) -> str:
+def _survey_prompt(topic: str, papers: List[PaperBrief]) -> str:
     biblio = _build_citation_list(papers)
     cite_map = "\n".join([f"[{i+1}] {p.title}" for i,p in enumerate(papers)])
     prompt = f"""Topic: {topic}
@@ -74,12 +77,189 @@ Papers:
 
 Write a concise literature survey (research style) with in-text numeric citations.
 """
-    return await llm_chat(prompt, system="You are a rigorous academic writer. Always cite with [#].")
-
-def generate_literature_survey(payload: SurveyRequest, db, current):
-    # run async retrieval & optional draft
-    async def run():
-        papers = await _search_all(payload.topic + " " + " ".join(payload.keywords), payload.n_results or DEFAULT_SURVEY_RESULTS, payload.year_from, payload.year_to)
-        draft = await _draft_survey(payload.topic, papers)
-        return SurveyResponse(papers=papers, draft=draft)
-    return asyncio.run(run())
+    return prompt
+
+SURVEY_SYSTEM = "You are a rigorous academic writer. Always cite with [#]."
+
+async def _draft_survey(topic: str, papers: List[PaperBrief]) -> str:
+    return await llm_chat(_survey_prompt(topic, papers), system=SURVEY_SYSTEM, feature="survey")
+
+# -------------------- Persistence --------------------
+# A survey is stored as sources (deduped per project by DOI, else title), a draft,
+# and citation rows: one per reference-list entry plus one per in-text [n] marker.
+
+_MARKER = re.compile(r"\[(\d+(?:\s*[,\u2013-]\s*\d+)*)\]")
+
+def _marker_numbers(group: str) -> List[int]:
+    nums = []
+    for part in group.split(","):
+        bounds = re.split(r"[\u2013-]", part)
+        lo, hi = int(bounds[0]), int(bounds[-1])
+        nums.extend(range(lo, hi + 1) if 0 <= hi - lo < 50 else [lo])
+    return nums
+
+def _in_text_citations(draft: str, n_papers: int) -> List[tuple]:
+    """(paper number, marker, surrounding sentence) for every [n] / [n, m] / [n-m] in the draft."""
+    out = []
+    for m in _MARKER.finditer(draft):
+        lo = max(draft.rfind(". ", 0, m.start()) + 1, draft.rfind("\n", 0, m.start()) + 1)
+        ends = [i for i in (draft.find(". ", m.end()), draft.find("\n", m.end())) if i != -1]
+        context = draft[lo:min(ends) + 1 if ends else len(draft)].strip()[:300]
+        for n in _marker_numbers(m.group(1)):
+            if 1 <= n <= n_papers:
+                out.append((n, m.group(0), context))
+    return out
+
+def _source_ids(db, project_id: int, papers: List[PaperBrief]) -> List[int]:
+    """Source id for each paper, bulk-inserting the ones the project does not have yet."""
+    keys = [("doi", doi) if doi else ("title", p.title) for doi, p in ((normalize_doi(p.doi), p) for p in papers)]
+    dois = [k for t, k in keys if t == "doi"]
+    titles = [k for t, k in keys if t == "title"]
+    known: Dict[tuple, int] = {}
+    if dois:
+        rows = db.execute(select(models.Source.doi, models.Source.id)
+                          .where(models.Source.project_id == project_id, models.Source.doi.in_(dois)))
+        known.update((("doi", d), i) for d, i in rows)
+    if titles:
+        rows = db.execute(select(models.Source.title, models.Source.id)
+                          .where(models.Source.project_id == project_id, models.Source.doi == "", models.Source.title.in_(titles)))
+        known.update((("title", t), i) for t, i in rows)
+
+    new = {}
+    for key, p in zip(keys, papers):
+        if key not in known and key not in new:
+            new[key] = {
+                "project_id": project_id, "title": p.title, "first_author": p.first_author or "",
+                "year": p.year or "", "venue": p.venue or "", "doi": key[1] if key[0] == "doi" else "",
+                "url": p.url or "", "provider": p.provider,
+            }
+    if new:
+        ids = db.scalars(insert(models.Source).returning(models.Source.id, sort_by_parameter_order=True), list(new.values()))
+        known.update(zip(new, ids))
+    return [known[k] for k in keys]
+
+def _index_sources(db, source_ids: List[int], user_id: int) -> None:
+    stored = db.scalars(select(models.Source).where(models.Source.id.in_(set(source_ids)))).all()
+    try:
+        search_index.add_many(source_entry(src, user_id) for src in stored)
+        index_sources(stored, user_id)
+    except Exception:
+        # the indexes are derived data; /search/reindex can rebuild them
+        logger.exception("indexing failed for %d sources", len(stored))
+
+def _persist_survey(db, project_id: int, user_id: int, topic: str, papers: List[PaperBrief], draft: str) -> int:
+    """Blocking; returns the new draft id."""
+    source_ids = _source_ids(db, project_id, papers)
+    row = models.Draft(project_id=project_id, user_id=user_id, title=f"Literature survey: {topic}"[:255], content_md=draft)
+    db.add(row)
+    db.flush()
+    bibliography = _build_citation_list(papers).split("\n")
+    citations = [
+        {"draft_id": row.id, "source_id": sid, "marker": f"[{n}]", "context": bibliography[n - 1]}
+        for n, sid in enumerate(source_ids, 1)
+    ] + [
+        {"draft_id": row.id, "source_id": source_ids[n - 1], "marker": marker[:20], "context": context}
+        for n, marker, context in _in_text_citations(draft, len(papers))
+    ]
+    if citations:
+        db.execute(insert(models.Citation), citations)
+    db.commit()
+    draft_id = row.id
+    _index_sources(db, source_ids, user_id)
+    return draft_id
+
+def _persist_sources(db, project_id: int, user_id: int, papers: List[PaperBrief]) -> int:
+    """Blocking; stores the papers as project sources, returns how many were new."""
+    before = db.scalar(select(func.count()).select_from(models.Source).where(models.Source.project_id == project_id))
+    source_ids = _source_ids(db, project_id, papers)
+    db.commit()
+    _index_sources(db, source_ids, user_id)
+    return db.scalar(select(func.count()).select_from(models.Source).where(models.Source.project_id == project_id)) - before
+
+def _owned_project_id(db, project_id: Optional[int], user_id: int) -> Optional[int]:
+    if project_id is None:
+        return None
+    project = db.get(models.Project, project_id)
+    if not project or project.user_id != user_id:
+        raise ValueError("Project not found")
+    return project_id
+
+def load_survey(db, draft_id: int, user_id: int) -> Optional[SurveyResponse]:
+    """Blocking; a stored survey with its papers in reference-list order, or None."""
+    draft = db.get(models.Draft, draft_id)
+    if not draft or draft.user_id != user_id:
+        return None
+    rows = db.execute(
+        select(models.Citation.marker, models.Source)
+        .join(models.Source, models.Citation.source_id == models.Source.id)
+        .where(models.Citation.draft_id == draft_id)
+        .order_by(models.Citation.id)
+    ).all()
+    by_number = {}
+    for marker, src in rows:
+        if marker.strip("[]").isdigit():
+            by_number.setdefault(int(marker.strip("[]")), src)
+    papers = [
+        PaperBrief(title=s.title, first_author=s.first_author, year=s.year or None, venue=s.venue or None,
+                   doi=s.doi or None, url=s.url or None, provider=s.provider)
+        for _, s in sorted(by_number.items())
+    ]
+    return SurveyResponse(papers=papers, draft=draft.content_md, draft_id=draft.id)
+
+async def _store_survey(db, project_id: Optional[int], user_id: int, topic: str, papers: List[PaperBrief], draft: str) -> Optional[int]:
+    """Persists the survey and returns its draft id; a failed draft stores only the papers."""
+    if project_id is None:
+        return None
+    if is_error_output(draft):
+        if papers:
+            await run_in_threadpool(_persist_sources, db, project_id, user_id, papers)
+        return None
+    return await run_in_threadpool(_persist_survey, db, project_id, user_id, topic, papers, draft)
+
+# -------------------- Public API --------------------
+
+async def generate_literature_survey(payload: SurveyRequest, db, current):
+    project_id = await run_in_threadpool(_owned_project_id, db, payload.project_id, current.id)
+    # async retrieval & optional draft
+    papers = await _search_all(payload.topic + " " + " ".join(payload.keywords), payload.n_results or DEFAULT_SURVEY_RESULTS, payload.year_from, payload.year_to)
+    draft = await _draft_survey(payload.topic, papers)
+    draft_id = await _store_survey(db, project_id, current.id, payload.topic, papers, draft)
+    return SurveyResponse(papers=papers, draft=draft, draft_id=draft_id)
+
+async def deep_search(payload: DeepSearchRequest, db, current):
+    # systematic-review retrieval: pages every provider concurrently, no draft;
+    # run as a job, the ranked papers found so far are published as it goes
+    project_id = await run_in_threadpool(_owned_project_id, db, payload.project_id, current.id)
+    query = payload.topic + " " + " ".join(payload.keywords)
+    found: List[PaperBrief] = []
+    async for batch in federated_stream(
+        query, min(payload.max_results, settings.DEEP_MAX_RESULTS), PROVIDERS,
+        year_from=payload.year_from, year_to=payload.year_to,
+        per_source=settings.DEEP_MAX_RESULTS_PER_SOURCE,
+        deadline=DEEP_SEARCH_DEADLINE_SECONDS, circuit=JobCircuit(),
+    ):
+        found.extend(batch)
+        # embedding and scoring is CPU-bound: the snapshot is ranked off the event loop
+        snapshot = list(found)
+        await report_progress(
+            f"{len(found)} papers found",
+            lambda: DeepSearchResponse(papers=rerank(query, snapshot), complete=False),
+        )
+    papers = await run_in_threadpool(rerank, query, found)
+    stored = 0
+    if project_id is not None and papers:
+        stored = await run_in_threadpool(_persist_sources, db, project_id, current.id, papers)
+    return DeepSearchResponse(papers=papers, complete=True, stored=stored)
+
+async def stream_literature_survey(payload: SurveyRequest, db, current):
+    # papers first (as a meta event), then the draft as it is generated, then the stored draft id
+    project_id = await run_in_threadpool(_owned_project_id, db, payload.project_id, current.id)
+    papers = await _search_all(payload.topic + " " + " ".join(payload.keywords), payload.n_results or DEFAULT_SURVEY_RESULTS, payload.year_from, payload.year_to)
+    yield {"papers": [p.model_dump() for p in papers]}
+    parts = []
+    async for delta in llm_stream(_survey_prompt(payload.topic, papers), system=SURVEY_SYSTEM, feature="survey"):
+        parts.append(delta)
+        yield delta
+    draft_id = await _store_survey(db, project_id, current.id, payload.topic, papers, "".join(parts).strip())
+    if draft_id is not None:
+        yield {"draft_id": draft_id}
@@ -1,7 +1,9 @@
-import asyncio
+from fastapi.concurrency import run_in_threadpool
 from ..io.schemas import PersonaSummaryRequest, PersonaSummaryResponse
 from ..db import models
-from ..core.llm_utils import llm_chat
+from ..io.extraction import ensure_document_text
+from ..core.llm_utils import llm_chat, llm_stream
+from ..core.prompt_budget import fit_to_budget
 
 def _get_text(db, payload, current) -> str:
     if payload.raw_text:
@@ -10,24 +12,33 @@ def _get_text(db, payload, current) -> str:
         doc = db.get(models.Document, payload.document_id)
         if not doc or doc.user_id != current.id:
             raise ValueError("Document not found")
-        try:
-            with open(doc.path, "r", encoding="utf-8", errors="ignore") as f:
-                return f.read()
-        except Exception:
-            return "[Binary doc. Add parser later.]"
+        return ensure_document_text(db, doc)
     return ""
 
-async def _summarize(text: str, persona: str, focus: str, length: str) -> str:
-    prompt = f"""Persona: {persona}
+PERSONA_SYSTEM = "You tailor research summaries for specific personas."
+
+def _summary_prompt(text: str, persona: str, focus: str, length: str) -> str:
+    return f"""Persona: {persona}
 Focus: {focus}
 Length: {length}
 
 Summarize the following research content. Use clear headers and bullet points. Avoid speculation:
-{text[:15000]}
+{fit_to_budget(text, "persona", focus=focus)}
 """
-    return await llm_chat(prompt, system="You tailor research summaries for specific personas.")
 
-def make_persona_summary(payload: PersonaSummaryRequest, db, current):
-    text = _get_text(db, payload, current)
-    out = asyncio.run(_summarize(text, payload.persona, payload.focus, payload.length))
+async def _summarize(text: str, persona: str, focus: str, length: str) -> str:
+    # fitting a long document to the budget is CPU-bound; keep it off the event loop
+    prompt = await run_in_threadpool(_summary_prompt, text, persona, focus, length)
+    return await llm_chat(prompt, system=PERSONA_SYSTEM, feature="persona")
+
+async def make_persona_summary(payload: PersonaSummaryRequest, db, current):
+    # DB lookup + (first-use) extraction are blocking; keep them off the event loop
+    text = await run_in_threadpool(_get_text, db, payload, current)
+    out = await _summarize(text, payload.persona, payload.focus, payload.length)
     return PersonaSummaryResponse(summary=out)
+
+async def stream_persona_summary(payload: PersonaSummaryRequest, db, current):
+    text = await run_in_threadpool(_get_text, db, payload, current)
+    prompt = await run_in_threadpool(_summary_prompt, text, payload.persona, payload.focus, payload.length)
+    async for delta in llm_stream(prompt, system=PERSONA_SYSTEM, feature="persona"):
+        yield delta
@@ -1,4 +1,3 @@
-import asyncio
 from typing import List, Dict, Any
 from ..io.schemas import GapRequest, GapResponse, PaperBrief
 from ..llm.openai_client import openai_chat
@@ -18,12 +17,12 @@ Limitations: - limitation (with sources)
 Opportunities: - idea (with rationale and sources)
 
 """
-    content = await llm_chat(prompt, system="You are a research analyst. Be specific and cite sources by short title/author.")
+    content = await llm_chat(prompt, system="You are a research analyst. Be specific and cite sources by short title/author.", feature="gaps")
     # For MVP, return the LLM text as strings inside dicts
     return GapResponse(
         limitations=[{"text": content}],
         opportunities=[{"text": "See above blocks for opportunities extracted from content.", "detail": content}]
     )
 
-def find_research_gaps(payload: GapRequest, db, current):
-    return asyncio.run(_mine_gaps(payload.aim, payload.selected_papers))
+async def find_research_gaps(payload: GapRequest, db, current):
+    return await _mine_gaps(payload.aim, payload.selected_papers)
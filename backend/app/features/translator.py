@@ -1,24 +1,90 @@
+import re
 import asyncio
+from uuid import uuid4
+from pathlib import Path
+from fastapi.concurrency import run_in_threadpool
 from ..io.schemas import TranslateRequest, TranslateResponse
 from ..db import models
-from ..core.llm_utils import llm_chat
+from ..io.extraction import ensure_document_text
+from ..core.llm_utils import llm_chat, llm_stream
+from ..core.prompt_budget import budget_for, estimate_tokens, is_heading, split_to_budget
+from ..config.constants import TRANSLATE_CONCURRENCY
 
+OUT_DIR = Path(__file__).resolve().parents[2] / "exports"
+OUT_DIR.mkdir(exist_ok=True)
 
-def _load_doc_text(path: str) -> str:
-    try:
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            return f.read()
-    except Exception:
-        return f"[Binary document at {path}. Add a PDF parser later.]"
+TRANSLATE_SYSTEM = "You are a professional translator for research papers."
+
+def _split_chunks(text: str, budget: int | None = None) -> list[str]:
+    """Packs paragraphs into chunks of at most `budget` tokens, preferring to break before headings."""
+    budget = budget or budget_for("translate")
+    chunks, cur, cur_tokens = [], [], 0
+    for block in re.split(r"\n\s*\n", text):
+        block = block.strip()
+        if not block:
+            continue
+        for piece in split_to_budget(block, budget):
+            n = estimate_tokens(piece)
+            new_section = is_heading(piece.split("\n", 1)[0]) and cur_tokens > budget // 2
+            if cur and (cur_tokens + n > budget or new_section):
+                chunks.append("\n\n".join(cur))
+                cur, cur_tokens = [], 0
+            cur.append(piece)
+            cur_tokens += n
+    if cur:
+        chunks.append("\n\n".join(cur))
+    return chunks
+
+def _select_chunks(text: str, full: bool) -> list[str]:
+    chunks = _split_chunks(text)
+    # full=False is a preview: only the opening chunk
+    return chunks if full else chunks[:1]
+
+def _translate_prompt(text: str, target_lang: str) -> str:
+    return f"Translate the following into {target_lang}. Preserve structure and section headers when found:\n\n{text}"
+
+async def _translate_chunk(chunk: str, target_lang: str, sem: asyncio.Semaphore) -> str:
+    # the LLM response cache is content-addressed, so unchanged chunks are not re-translated
+    async with sem:
+        return await llm_chat(_translate_prompt(chunk, target_lang), system=TRANSLATE_SYSTEM, feature="translate")
 
-async def _translate(text: str, target_lang: str) -> str:
-    prompt = f"Translate the following into {target_lang}. Preserve structure and section headers when found:\n\n{text[:15000]}"
-    return await llm_chat(prompt, system="You are a professional translator for research papers.")
+async def _translate(text: str, target_lang: str, full: bool = True) -> str:
+    sem = asyncio.Semaphore(TRANSLATE_CONCURRENCY)
+    chunks = await run_in_threadpool(_select_chunks, text, full)
+    parts = await asyncio.gather(*(_translate_chunk(c, target_lang, sem) for c in chunks))
+    return "\n\n".join(p.strip() for p in parts)
 
-def translate_paper(payload: TranslateRequest, db, current):
-    doc = db.get(models.Document, payload.document_id)
+def _export(translated: str) -> str:
+    name = f"{uuid4().hex}.md"
+    (OUT_DIR / name).write_text(translated, encoding="utf-8")
+    return f"/exports/{name}"
+
+async def _load_owned_doc_text(db, document_id: int, current) -> str:
+    # DB lookup + (first-use) extraction are blocking; keep them off the event loop
+    doc = await run_in_threadpool(db.get, models.Document, document_id)
     if not doc or doc.user_id != current.id:
         raise ValueError("Document not found")
-    raw = _load_doc_text(doc.path)
-    translated = asyncio.run(_translate(raw, payload.target_lang))
-    return TranslateResponse(translated_text=translated, download_url=None)
+    return await run_in_threadpool(ensure_document_text, db, doc)
+
+async def translate_paper(payload: TranslateRequest, db, current):
+    raw = await _load_owned_doc_text(db, payload.document_id, current)
+    translated = await _translate(raw, payload.target_lang, payload.full)
+    download_url = await run_in_threadpool(_export, translated)
+    return TranslateResponse(translated_text=translated, download_url=download_url)
+
+async def stream_translation(payload: TranslateRequest, db, current):
+    raw = await _load_owned_doc_text(db, payload.document_id, current)
+    chunks = await run_in_threadpool(_select_chunks, raw, payload.full)
+    if not chunks:
+        return
+    # the opening chunk streams token by token while the rest translate concurrently
+    sem = asyncio.Semaphore(TRANSLATE_CONCURRENCY)
+    rest = [asyncio.create_task(_translate_chunk(c, payload.target_lang, sem)) for c in chunks[1:]]
+    try:
+        async for delta in llm_stream(_translate_prompt(chunks[0], payload.target_lang), system=TRANSLATE_SYSTEM, feature="translate"):
+            yield delta
+        for t in rest:
+            yield "\n\n" + (await t).strip()
+    finally:
+        for t in rest:
+            t.cancel()
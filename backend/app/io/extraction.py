@@ -0,0 +1,121 @@
+"""
+Document ingestion: page-by-page text extraction for uploads.
+
+PDFs are parsed with pypdf (pure Python), DOCX by reading the OOXML body,
+anything else as UTF-8 text. The normalized text and the character offset
+where each page starts are stored on the Document row, so features read the
+cached text layer instead of re-parsing the file. Extracted text is also
+added to the local full-text and embedding indexes.
+"""
+
+import json
+import logging
+import re
+import unicodedata
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Tuple
+from xml.etree import ElementTree
+
+from pypdf import PdfReader
+from sqlalchemy import select
+
+from ..db import models
+from ..db.session import SessionLocal
+from ..retrieval.search_index import search_index, document_entry
+from ..retrieval.embeddings import index_document
+
+logger = logging.getLogger(__name__)
+
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+PAGE_SEPARATOR = "\n\n"
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFC", text).replace("\x00", "")
+    text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)   # re-join words hyphenated across lines
+    text = re.sub(r"[ \t\u00a0]+", " ", text)
+    text = re.sub(r" ?\n ?", "\n", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def _pdf_pages(path: str) -> List[str]:
+    return [page.extract_text() or "" for page in PdfReader(path).pages]
+
+
+def _docx_pages(path: str) -> List[str]:
+    with zipfile.ZipFile(path) as z:
+        root = ElementTree.fromstring(z.read("word/document.xml"))
+    paragraphs = ["".join(t.text or "" for t in p.iter(f"{_W_NS}t")) for p in root.iter(f"{_W_NS}p")]
+    # DOCX has no fixed pagination; the whole body is one page
+    return ["\n".join(paragraphs)]
+
+
+def _text_pages(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return [f.read()]
+
+
+def extract_pages(path: str, mime: str | None = None) -> List[str]:
+    suffix = Path(path).suffix.lower()
+    if suffix == ".pdf" or mime == "application/pdf":
+        return _pdf_pages(path)
+    if suffix == ".docx":
+        return _docx_pages(path)
+    return _text_pages(path)
+
+
+def extract_text(path: str, mime: str | None = None) -> Tuple[str, List[int]]:
+    """Returns the normalized text and the offset at which each page starts."""
+    parts, offsets, pos = [], [], 0
+    for page in extract_pages(path, mime):
+        page = normalize_text(page)
+        offsets.append(pos)
+        parts.append(page)
+        pos += len(page) + len(PAGE_SEPARATOR)
+    return PAGE_SEPARATOR.join(parts), offsets
+
+
+def ensure_document_text(db, doc: models.Document) -> str:
+    """Returns the cached text layer, extracting and persisting it on first use (blocking)."""
+    if doc.text_content is not None:
+        return doc.text_content
+    twin = None
+    if doc.sha256:
+        # identical bytes were uploaded before: reuse that text layer
+        twin = db.execute(
+            select(models.Document.text_content, models.Document.page_offsets)
+            .where(models.Document.sha256 == doc.sha256, models.Document.text_content.is_not(None))
+            .limit(1)
+        ).first()
+    if twin:
+        text, offsets_json = twin
+    else:
+        try:
+            text, offsets = extract_text(doc.path, doc.mime)
+        except Exception:
+            # keep an empty layer rather than re-failing on every request
+            logger.exception("text extraction failed for document %s", doc.id)
+            text, offsets = "", []
+        offsets_json = json.dumps(offsets)
+    doc.text_content = text
+    doc.page_offsets = offsets_json
+    doc.extracted_at = datetime.now(timezone.utc)
+    db.commit()
+    try:
+        search_index.add(document_entry(doc))
+        index_document(doc)
+    except Exception:
+        # the indexes are derived data; /search/reindex can rebuild them
+        logger.exception("indexing failed for document %s", doc.id)
+    return text
+
+
+def ingest_document(document_id: int) -> None:
+    """Background task run after /upload."""
+    with SessionLocal() as db:
+        doc = db.get(models.Document, document_id)
+        if doc:
+            ensure_document_text(db, doc)
@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional, Dict, Any
 
@@ -14,6 +15,9 @@ class UserOut(BaseModel):
     name: str
     role: str
 
+class UserRoleUpdate(BaseModel):
+    role: str
+
 class LoginRequest(BaseModel):
     email: EmailStr
     password: str
@@ -33,7 +37,37 @@ class ProjectOut(BaseModel):
     id: int
     title: str
     domain: str
-    aim: str
+    aim: Optional[str] = None
+
+# List endpoints select columns on demand (`fields=`), so most fields are optional
+class DocumentOut(BaseModel):
+    id: int
+    project_id: Optional[int] = None
+    filename: Optional[str] = None
+    mime: Optional[str] = None
+    sha256: Optional[str] = None
+    size_bytes: Optional[int] = None
+    extracted_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    text_content: Optional[str] = None
+
+class DraftOut(BaseModel):
+    id: int
+    project_id: Optional[int] = None
+    title: Optional[str] = None
+    content_md: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+class SourceOut(BaseModel):
+    id: int
+    project_id: Optional[int] = None
+    title: Optional[str] = None
+    first_author: Optional[str] = None
+    year: Optional[str] = None
+    venue: Optional[str] = None
+    doi: Optional[str] = None
+    url: Optional[str] = None
+    provider: Optional[str] = None
 
 # Features
 class SurveyRequest(BaseModel):
@@ -56,6 +90,20 @@ class PaperBrief(BaseModel):
 class SurveyResponse(BaseModel):
     papers: List[PaperBrief]
     draft: Optional[str] = None  # filled when Generate Draft is requested (front-end trigger)
+    draft_id: Optional[int] = None  # set when the survey was stored under a project
+
+class DeepSearchRequest(BaseModel):
+    topic: str
+    keywords: List[str] = []
+    max_results: int = 200  # capped by settings.DEEP_MAX_RESULTS
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
+    project_id: Optional[int] = None  # store the papers as the project's sources
+
+class DeepSearchResponse(BaseModel):
+    papers: List[PaperBrief]  # ranked by relevance to the query
+    complete: bool  # False while the sweep is still paging providers
+    stored: int = 0  # sources added to the project
 
 class GapRequest(BaseModel):
     aim: str
@@ -142,9 +190,38 @@ class LatexRequest(BaseModel):
 class LatexResponse(BaseModel):
     zip_url: str
 
+class TranscriptionJob(BaseModel):
+    path: str
+    filename: str
+    content_type: Optional[str] = None
+
+class TranscriptionResponse(BaseModel):
+    transcript: str
+
 # Jobs
 class JobOut(BaseModel):
     id: int
     type: str
     status: str
     message: str
+    result: Optional[Any] = None
+
+# Local full-text search
+class SearchHitOut(BaseModel):
+    kind: str  # "source" | "document"
+    id: int
+    project_id: int
+    title: str
+    snippet: str
+    score: float
+
+class SearchResponse(BaseModel):
+    hits: List[SearchHitOut]
+    took_ms: float
+
+class RelatedHitOut(BaseModel):
+    kind: str  # "source" | "document"
+    id: int
+    project_id: int
+    title: str
+    score: float  # cosine similarity
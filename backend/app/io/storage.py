@@ -1,15 +1,44 @@
 import os
+import hashlib
 from pathlib import Path
-from fastapi import UploadFile
+from typing import NamedTuple
+from fastapi import UploadFile, HTTPException
 from uuid import uuid4
+from ..config.settings import settings
 
 DATA_DIR = Path(__file__).resolve().parents[2] / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
-def save_upload(file: UploadFile) -> str:
-    ext = Path(file.filename).suffix
-    name = f"{uuid4().hex}{ext}"
-    path = DATA_DIR / name
-    with path.open("wb") as f:
-        f.write(file.file.read())
-    return str(path)
+CHUNK_SIZE = 1024 * 1024
+
+class StoredUpload(NamedTuple):
+    path: str
+    sha256: str
+    size: int
+
+def save_upload(file: UploadFile, max_bytes: int | None = None, private: bool = False) -> StoredUpload:
+    """
+    Streams the upload to disk in fixed-size chunks while hashing it. Files are
+    content-addressed (data/<sha256><ext>), so re-uploading the same file costs no disk.
+    A `private` upload gets its own name instead, so its owner may delete it.
+    """
+    max_bytes = max_bytes or settings.MAX_UPLOAD_BYTES
+    ext = Path(file.filename or "").suffix.lower()
+    digest = hashlib.sha256()
+    size = 0
+    tmp = DATA_DIR / f".{uuid4().hex}.part"
+    try:
+        with tmp.open("wb") as f:
+            while chunk := file.file.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                f.write(chunk)
+        sha = digest.hexdigest()
+        path = DATA_DIR / f"{uuid4().hex if private else sha}{ext}"
+        if not path.exists():
+            os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return StoredUpload(path=str(path), sha256=sha, size=size)
@@ -1,14 +1,36 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .api import router as api_router
 from fastapi.staticfiles import StaticFiles
+from .core.llm_utils import start_llm_transport, close_llm_transport
+from .core.jobs import job_runner
+from .core.quotas import RateLimitHeadersMiddleware
+from .db.session import engine, async_engine
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # app-scoped resources: pooled LLM transport, background job runner, DB pools
+    await start_llm_transport()
+    await job_runner.start()
+    try:
+        yield
+    finally:
+        await job_runner.shutdown()
+        await close_llm_transport()
+        if async_engine is not None:
+            await async_engine.dispose()
+        engine.dispose()
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Research Assistant Backend", version="0.1.0")
+    app = FastAPI(title="Research Assistant Backend", version="0.1.0", lifespan=lifespan)
 
     # -------------------------------------------------------------
     # 🔓 CORS CONFIGURATION
     # -------------------------------------------------------------
+    # quota headers on every response, including the ones endpoints build themselves
+    app.add_middleware(RateLimitHeadersMiddleware)
+
     app.add_middleware(
         CORSMiddleware,
         allow_origins=[
@@ -18,7 +40,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],   # allow GET, POST, PUT, DELETE, etc.
         allow_headers=["*"],   # allow all custom headers
-        expose_headers=["Content-Disposition"],  # important for file downloads
+        expose_headers=["Content-Disposition", "ETag", "X-Next-Cursor", "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset", "Retry-After"],  # file downloads, list pagination, quotas
     )
         # --- Serve generated files ---
     app.mount("/exports", StaticFiles(directory="exports"), name="exports")
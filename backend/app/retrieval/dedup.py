@@ -0,0 +1,175 @@
+"""
+Cross-provider paper de-duplication.
+
+The same work comes back from several providers with cosmetic differences:
+DOI case or a resolver prefix, title punctuation, diacritics, casing. Papers
+are matched by normalized DOI first; DOI-less (or not-yet-matched) records
+are matched by MinHash signatures of their canonical title's character
+shingles, with LSH banding so each paper is only compared with the few that
+share a band - near-linear over thousands of candidates. Matches merge into
+one PaperBrief that keeps the first record's values and fills gaps from the
+others.
+"""
+
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from ..io.schemas import PaperBrief
+from ..config.constants import DEDUP_NUM_PERM, DEDUP_BANDS, DEDUP_TITLE_THRESHOLD
+
+_DOI_PREFIX = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.I)
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+_PRIME = (1 << 61) - 1
+_rng = np.random.default_rng(20240611)
+_PERM_A = _rng.integers(1, 1 << 31, DEDUP_NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 31, DEDUP_NUM_PERM, dtype=np.uint64)
+_ROWS = DEDUP_NUM_PERM // DEDUP_BANDS
+
+
+def normalize_doi(doi: Optional[str]) -> Optional[str]:
+    """Bare lowercase DOI ("10.x/y"), or None when the value is not a DOI."""
+    if not doi:
+        return None
+    d = _DOI_PREFIX.sub("", doi.strip()).strip().rstrip(".,;").lower()
+    return d if d.startswith("10.") and "/" in d else None
+
+
+def canonical_title(title: Optional[str]) -> str:
+    """Casefolded, diacritics and punctuation stripped, whitespace collapsed."""
+    t = unicodedata.normalize("NFKD", title or "")
+    t = "".join(c for c in t if not unicodedata.combining(c)).casefold()
+    return _NON_ALNUM.sub(" ", t).strip()
+
+
+def _shingles(canon: str, k: int = 3) -> np.ndarray:
+    s = f" {canon} "
+    grams = {s[i:i + k] for i in range(max(1, len(s) - k + 1))}
+    return np.fromiter((zlib.crc32(g.encode()) for g in grams), np.uint64, len(grams))
+
+
+def minhash(canon: str) -> np.ndarray:
+    """DEDUP_NUM_PERM-slot MinHash signature of a canonical title's character 3-grams."""
+    x = _shingles(canon)
+    return ((_PERM_A[:, None] * x[None, :] + _PERM_B[:, None]) % _PRIME).min(axis=1)
+
+
+def _author_tokens(name: Optional[str]) -> Set[str]:
+    return {t for t in canonical_title(name).split() if len(t) > 1}
+
+
+def _year(p: PaperBrief) -> Optional[int]:
+    m = re.match(r"\d{4}", str(p.year or ""))
+    return int(m.group()) if m else None
+
+
+class _Record:
+    __slots__ = ("paper", "doi", "canon", "sig", "authors", "year", "providers")
+
+    def __init__(self, paper: PaperBrief):
+        self.paper = paper
+        self.doi = normalize_doi(paper.doi)
+        self.canon = canonical_title(paper.title)
+        self.sig = minhash(self.canon)
+        self.authors = _author_tokens(paper.first_author)
+        self.year = _year(paper)
+        self.providers = [paper.provider]
+
+
+def _compatible(a: _Record, b: _Record) -> bool:
+    # different DOIs are different works, however alike the titles
+    if a.doi and b.doi and a.doi != b.doi:
+        return False
+    if a.year and b.year and abs(a.year - b.year) > 1:
+        return False
+    if a.authors and b.authors and not (a.authors & b.authors):
+        return False
+    if not a.canon or not b.canon:
+        return False
+    if a.canon == b.canon:
+        return True
+    return float(np.mean(a.sig == b.sig)) >= DEDUP_TITLE_THRESHOLD
+
+
+def _merge(into: _Record, other: _Record) -> None:
+    p, q = into.paper, other.paper
+    if not into.doi and other.doi:
+        into.doi = other.doi
+    p.doi = into.doi or p.doi
+    p.first_author = p.first_author or q.first_author
+    p.year = p.year or q.year
+    p.venue = p.venue or q.venue
+    p.url = p.url or q.url
+    # an all-caps title (some Crossref records) loses to a properly cased one
+    if p.title.isupper() and not q.title.isupper():
+        p.title = q.title
+    for name in other.providers:
+        if name not in into.providers:
+            into.providers.append(name)
+    p.provider = ",".join(into.providers)[:50]
+    into.authors |= other.authors
+    into.year = into.year or other.year
+
+
+class Deduplicator:
+    """Incremental: feed papers as providers answer, read the merged list at any time."""
+
+    def __init__(self):
+        self._records: List[_Record] = []
+        self._by_doi: Dict[str, int] = {}
+        self._bands: Dict[tuple, List[int]] = defaultdict(list)
+        self.merged = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _band_keys(self, sig: np.ndarray):
+        for b in range(DEDUP_BANDS):
+            yield b, sig[b * _ROWS:(b + 1) * _ROWS].tobytes()
+
+    def _find(self, rec: _Record) -> Optional[int]:
+        if rec.doi and rec.doi in self._by_doi:
+            return self._by_doi[rec.doi]
+        seen = set()
+        for key in self._band_keys(rec.sig):
+            for idx in self._bands.get(key, ()):
+                if idx not in seen:
+                    seen.add(idx)
+                    if _compatible(self._records[idx], rec):
+                        return idx
+        return None
+
+    def add(self, paper: PaperBrief) -> bool:
+        """True if the paper is new; False if it was merged into an earlier one."""
+        rec = _Record(paper)
+        idx = self._find(rec)
+        if idx is not None:
+            _merge(self._records[idx], rec)
+            target = self._records[idx]
+            if target.doi:
+                self._by_doi.setdefault(target.doi, idx)
+            self.merged += 1
+            return False
+        idx = len(self._records)
+        self._records.append(rec)
+        rec.paper.doi = rec.doi or rec.paper.doi
+        if rec.doi:
+            self._by_doi[rec.doi] = idx
+        for key in self._band_keys(rec.sig):
+            self._bands[key].append(idx)
+        return True
+
+    def papers(self) -> List[PaperBrief]:
+        return [r.paper for r in self._records]
+
+
+def dedupe(papers: Iterable[PaperBrief]) -> List[PaperBrief]:
+    d = Deduplicator()
+    for p in papers:
+        d.add(p)
+    return d.papers()
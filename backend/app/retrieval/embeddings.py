@@ -0,0 +1,426 @@
+"""
+Local embedding index for semantic retrieval over project sources and documents.
+
+Texts are embedded on the CPU by a signed hashing vectorizer (word unigrams
+and bigrams, sublinear tf, L2-normalised), so there is no model to download
+and nothing leaves the host. Vectors are int8-quantised with one float32
+scale per row and kept in memory-mapped files under cache/embeddings/;
+queries are scored by chunked NumPy brute force over the caller's rows.
+Sources are embedded by title and venue (the model has no abstract column),
+documents as overlapping word windows of their extracted text.
+
+The index re-ranks federated search results and answers "related papers in
+my project" queries; `rebuild` backfills it from the database.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select
+
+from ..core.disk_cache import CACHE_DIR
+from ..config.constants import EMBEDDING_DIM, EMBEDDING_CHUNK_WORDS
+from ..db import models
+
+KIND_SOURCE = "source"
+KIND_DOCUMENT = "document"
+_KIND_CODE = {KIND_SOURCE: 0, KIND_DOCUMENT: 1}
+_KIND_NAME = {v: k for k, v in _KIND_CODE.items()}
+
+META_DTYPE = np.dtype([
+    ("kind", "u1"), ("live", "u1"), ("chunk", "<u2"), ("scale", "<f4"),
+    ("ref_id", "<i8"), ("project_id", "<i8"), ("user_id", "<i8"),
+])
+
+# rows scored per matrix-vector product: the float32 copy of a block stays in cache
+_SCORE_BLOCK = 16_384
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or that the this to with via using based".split()
+)
+
+
+# -------------------- embedding --------------------
+
+def _stem(word: str) -> str:
+    # plural folding only; enough for titles to meet queries halfway
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-3] + "y" if word.endswith("ies") else word[:-1]
+    return word
+
+
+def _features(text: str) -> List[str]:
+    words = [_stem(w) for w in _TOKEN.findall(text.lower()) if w not in _STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def embed(texts: Sequence[str], dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """Unit-length float32 vectors, one row per text (all zeros for texts with no words)."""
+    out = np.zeros((len(texts), dim), np.float32)
+    for i, text in enumerate(texts):
+        counts = Counter(zlib.crc32(f.encode()) for f in _features(text))
+        if not counts:
+            continue
+        h = np.fromiter(counts.keys(), np.uint32, len(counts))
+        tf = np.fromiter(counts.values(), np.float32, len(counts))
+        # the top hash bit picks the sign so collisions cancel out instead of piling up
+        sign = np.where(h & 0x80000000, -1.0, 1.0).astype(np.float32)
+        np.add.at(out[i], h % dim, sign * (1.0 + np.log(tf)))
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    return out / np.maximum(norms, 1e-12)
+
+
+def quantize(vecs: np.ndarray):
+    """Symmetric per-row int8 quantisation: vecs ≈ codes * scale[:, None]."""
+    scale = np.abs(vecs).max(axis=1) / 127.0
+    scale[scale == 0] = 1.0
+    codes = np.rint(vecs / scale[:, None]).astype(np.int8)
+    return codes, scale.astype(np.float32)
+
+
+def chunk_words(text: str, size: int = EMBEDDING_CHUNK_WORDS) -> List[str]:
+    """Windows of `size` words overlapping by a quarter, so a passage is never split across every window."""
+    words = text.split()
+    if not words:
+        return []
+    step = max(1, size - size // 4)
+    return [" ".join(words[i:i + size]) for i in range(0, max(len(words) - size // 4, 1), step)]
+
+
+# -------------------- vector store --------------------
+
+class VectorKey(NamedTuple):
+    kind: str
+    ref_id: int
+    project_id: int
+    user_id: int
+
+
+class VectorHit(NamedTuple):
+    kind: str
+    id: int
+    project_id: int
+    score: float
+
+
+@contextmanager
+def _exclusive(path: Path, stale_after: float = 30.0):
+    """Cross-process writer lock via an O_EXCL lock file (works on Windows too)."""
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - path.stat().st_mtime > stale_after:
+                    path.unlink()  # left behind by a crashed writer
+                    continue
+            except FileNotFoundError:
+                continue
+            time.sleep(0.005)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        path.unlink(missing_ok=True)
+
+
+class VectorIndex:
+    """Append-only int8 vectors plus row metadata in two memory-mapped files.
+
+    Re-adding a source or document tombstones its earlier rows; `clear` (used
+    by `rebuild`) is the only compaction. Every worker maps the same files and
+    re-maps when the header shows another process has appended, or has cleared
+    the index (a new generation, or the vector file is no longer the mapped one).
+    """
+
+    def __init__(self, root: Path | None = None, dim: int = EMBEDDING_DIM):
+        self.root = Path(root or CACHE_DIR / "embeddings")
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._count = 0
+        self._capacity = 0
+        self._generation = 0
+        self._mapped_file = None
+        self._codes: Optional[np.memmap] = None
+        self._meta: Optional[np.memmap] = None
+        with self._lock:
+            self._refresh()
+
+    # ---- files ----
+
+    @property
+    def _header_path(self) -> Path:
+        return self.root / "header.json"
+
+    def _read_header(self) -> tuple[int, int]:
+        """(row count, generation); `clear` starts a new generation."""
+        try:
+            header = json.loads(self._header_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return 0, 0
+        generation = header.get("generation", 0)
+        return (header["count"] if header.get("dim") == self.dim else 0), generation
+
+    def _write_header(self) -> None:
+        tmp = self.root / "header.json.tmp"
+        tmp.write_text(json.dumps({"dim": self.dim, "count": self._count, "generation": self._generation}))
+        os.replace(tmp, self._header_path)
+
+    def _file_id(self) -> Optional[tuple]:
+        try:
+            st = (self.root / "vectors.i8").stat()
+        except FileNotFoundError:
+            return None
+        return st.st_dev, st.st_ino
+
+    def _map(self, capacity: int) -> None:
+        self._codes = self._meta = None
+        if capacity:
+            for name, row_bytes in (("vectors.i8", self.dim), ("meta.bin", META_DTYPE.itemsize)):
+                path = self.root / name
+                with open(path, "ab") as f:
+                    if f.tell() < capacity * row_bytes:
+                        f.truncate(capacity * row_bytes)
+            self._codes = np.memmap(self.root / "vectors.i8", np.int8, "r+", shape=(capacity, self.dim))
+            self._meta = np.memmap(self.root / "meta.bin", META_DTYPE, "r+", shape=(capacity,))
+        self._capacity = capacity
+        self._mapped_file = self._file_id() if capacity else None
+
+    def _refresh(self) -> None:
+        self._count, generation = self._read_header()
+        if generation != self._generation or (self._codes is not None and self._file_id() != self._mapped_file):
+            # cleared by another process: the mapped files were unlinked, so map the new ones
+            self._generation = generation
+            self._map(self._count)
+        elif self._count > self._capacity:
+            self._map(self._count)
+
+    def _reserve(self, n: int) -> None:
+        if n > self._capacity:
+            self._map(max(n, 2 * self._capacity, 1024))
+
+    # ---- writes ----
+
+    def add(self, keys: Sequence[VectorKey], vecs: np.ndarray, replace: bool = True) -> int:
+        """Appends one row per key; with `replace`, earlier rows for the same refs are tombstoned."""
+        if not len(keys):
+            return 0
+        codes, scale = quantize(np.asarray(vecs, np.float32))
+        chunks = Counter()
+        with self._lock, _exclusive(self.root / "write.lock"):
+            self._refresh()
+            if replace:
+                self._tombstone({(k.kind, k.ref_id) for k in keys})
+            start, end = self._count, self._count + len(keys)
+            self._reserve(end)
+            self._codes[start:end] = codes
+            meta = np.zeros(len(keys), META_DTYPE)
+            for i, k in enumerate(keys):
+                meta[i] = (_KIND_CODE[k.kind], 1, chunks[(k.kind, k.ref_id)], scale[i], k.ref_id, k.project_id, k.user_id)
+                chunks[(k.kind, k.ref_id)] += 1
+            self._meta[start:end] = meta
+            self._codes.flush()
+            self._meta.flush()
+            self._count = end
+            self._write_header()
+        return len(keys)
+
+    def _tombstone(self, refs) -> None:
+        if not self._count or not refs:
+            return
+        meta = self._meta[:self._count]
+        wanted = np.fromiter((r * 2 + _KIND_CODE[k] for k, r in refs), np.int64, len(refs))
+        hit = np.isin(meta["ref_id"] * 2 + meta["kind"], wanted) & (meta["live"] == 1)
+        if hit.any():
+            meta["live"][hit] = 0
+
+    def remove(self, kind: str, ref_id: int) -> None:
+        with self._lock, _exclusive(self.root / "write.lock"):
+            self._refresh()
+            self._tombstone({(kind, ref_id)})
+            if self._meta is not None:
+                self._meta.flush()
+
+    def clear(self) -> None:
+        with self._lock, _exclusive(self.root / "write.lock"):
+            generation = self._read_header()[1]
+            self._map(0)
+            for name in ("vectors.i8", "meta.bin"):
+                (self.root / name).unlink(missing_ok=True)
+            self._count = 0
+            self._generation = generation + 1
+            self._write_header()
+
+    # ---- reads ----
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            if not self._count:
+                return 0
+            return int(np.count_nonzero(self._meta[:self._count]["live"]))
+
+    def vectors_for(self, kind: str, ref_id: int) -> np.ndarray:
+        """Dequantised live rows stored for one source or document."""
+        with self._lock:
+            self._refresh()
+            n, codes, meta = self._count, self._codes, self._meta
+        if not n:
+            return np.zeros((0, self.dim), np.float32)
+        m = meta[:n]
+        rows = np.flatnonzero((m["ref_id"] == ref_id) & (m["kind"] == _KIND_CODE[kind]) & (m["live"] == 1))
+        return codes[rows].astype(np.float32) * m["scale"][rows][:, None]
+
+    def search(
+        self,
+        query: np.ndarray,
+        user_id: int | None,
+        project_id: int | None = None,
+        kind: str | None = None,
+        k: int = 10,
+        exclude: Iterable[tuple] = (),
+    ) -> List[VectorHit]:
+        """Top-k sources/documents by cosine to `query`; a document scores as its best chunk.
+
+        Rows with no positive similarity are not returned.
+        """
+        with self._lock:
+            self._refresh()
+            n, codes, meta = self._count, self._codes, self._meta
+        if not n:
+            return []
+        m = meta[:n]
+        mask = m["live"] == 1
+        if user_id is not None:
+            mask &= m["user_id"] == user_id
+        if project_id is not None:
+            mask &= m["project_id"] == project_id
+        if kind:
+            mask &= m["kind"] == _KIND_CODE[kind]
+        rows = np.flatnonzero(mask)
+        if not rows.size:
+            return []
+
+        q = np.asarray(query, np.float32).ravel()
+        scores = np.empty(rows.size, np.float32)
+        for i in range(0, rows.size, _SCORE_BLOCK):
+            idx = rows[i:i + _SCORE_BLOCK]
+            # contiguous runs (the common case for one user's rows) are sliced, not gathered
+            block = codes[idx[0]:idx[-1] + 1] if idx[-1] - idx[0] + 1 == idx.size else codes[idx]
+            scores[i:i + idx.size] = block.astype(np.float32) @ q
+        scores *= m["scale"][rows]
+
+        skip = set(exclude)
+        # over-fetch so that several chunks of one document still leave k distinct hits
+        take = min(rows.size, 4 * k + len(skip))
+        top = np.argpartition(-scores, take - 1)[:take] if take < rows.size else np.arange(rows.size)
+        best: Dict[tuple, VectorHit] = {}
+        for j in top[np.argsort(-scores[top])]:
+            if scores[j] <= 0:
+                break
+            r = m[rows[j]]
+            key = (_KIND_NAME[int(r["kind"])], int(r["ref_id"]))
+            if key in skip or key in best:
+                continue
+            best[key] = VectorHit(key[0], key[1], int(r["project_id"]), round(float(scores[j]), 4))
+            if len(best) == k:
+                break
+        return list(best.values())
+
+
+vector_index = VectorIndex()
+
+
+# -------------------- re-ranking --------------------
+
+def rerank(query: str, papers: List, text=lambda p: f"{p.title} {p.venue or ''}") -> List:
+    """Papers ordered by similarity to `query`; ties keep the providers' order."""
+    if len(papers) < 2:
+        return list(papers)
+    q = embed([query])[0]
+    scores = embed([text(p) for p in papers]) @ q
+    order = sorted(range(len(papers)), key=lambda i: -scores[i])
+    return [papers[i] for i in order]
+
+
+# -------------------- entries from models --------------------
+
+def source_text(src: models.Source) -> str:
+    return f"{src.title} {src.venue or ''}"
+
+
+def index_sources(sources: Iterable[models.Source], user_id: int, replace: bool = True) -> int:
+    sources = list(sources)
+    keys = [VectorKey(KIND_SOURCE, s.id, s.project_id, user_id) for s in sources]
+    return vector_index.add(keys, embed([source_text(s) for s in sources]), replace=replace)
+
+
+def index_document(doc: models.Document, replace: bool = True) -> int:
+    chunks = chunk_words(doc.text_content or "")
+    keys = [VectorKey(KIND_DOCUMENT, doc.id, doc.project_id, doc.user_id)] * len(chunks)
+    return vector_index.add(keys, embed(chunks), replace=replace)
+
+
+def rebuild(db, batch: int = 1000) -> int:
+    """Re-embeds every source and extracted document (blocking)."""
+    vector_index.clear()
+    total = 0
+    sources = db.execute(
+        select(models.Source, models.Project.user_id).join(models.Project, models.Source.project_id == models.Project.id)
+    ).yield_per(batch)
+    for chunk in sources.partitions(batch):
+        keys = [VectorKey(KIND_SOURCE, s.id, s.project_id, uid) for s, uid in chunk]
+        total += vector_index.add(keys, embed([source_text(s) for s, _ in chunk]), replace=False)
+    docs = db.scalars(select(models.Document).where(models.Document.text_content.is_not(None))).yield_per(batch)
+    for d in docs:
+        total += index_document(d, replace=False)
+    return total
+
+
+def related_in_project(
+    db,
+    user_id: int,
+    project_id: int,
+    text: str | None = None,
+    source_id: int | None = None,
+    k: int = 10,
+) -> List[dict]:
+    """Blocking; the project's sources and documents closest to `text` or to a stored source."""
+    exclude = ()
+    if source_id is not None:
+        src = db.get(models.Source, source_id)
+        if not src or src.project_id != project_id:
+            raise ValueError("Source not found")
+        vecs = vector_index.vectors_for(KIND_SOURCE, source_id)
+        query = vecs.mean(axis=0) if len(vecs) else embed([source_text(src)])[0]
+        exclude = ((KIND_SOURCE, source_id),)
+    else:
+        query = embed([text or ""])[0]
+    hits = vector_index.search(query, user_id, project_id=project_id, k=k, exclude=exclude)
+
+    titles = {}
+    src_ids = [h.id for h in hits if h.kind == KIND_SOURCE]
+    doc_ids = [h.id for h in hits if h.kind == KIND_DOCUMENT]
+    if src_ids:
+        titles.update(((KIND_SOURCE, i), t) for i, t in db.execute(
+            select(models.Source.id, models.Source.title).where(models.Source.id.in_(src_ids))))
+    if doc_ids:
+        titles.update(((KIND_DOCUMENT, i), t) for i, t in db.execute(
+            select(models.Document.id, models.Document.filename).where(models.Document.id.in_(doc_ids))))
+    # rows deleted since they were indexed have no title and are dropped
+    return [
+        {"kind": h.kind, "id": h.id, "project_id": h.project_id, "title": titles[(h.kind, h.id)], "score": h.score}
+        for h in hits if (h.kind, h.id) in titles
+    ]
@@ -0,0 +1,155 @@
+"""
+Concurrent federated search across the scholarly providers.
+
+Every enabled provider is queried at once and, when asked for more than one
+page, paged through concurrently with the others up to a per-source cap.
+Pages are de-duplicated across providers (see `dedup`) as they arrive, and
+the search stops as soon as `n_results` unique papers are in hand, every
+provider is exhausted, or the global deadline passes. Each page goes through
+the process-wide provider limiter; providers that fail, time out or have an
+open breaker are switched off on the supplied `JobCircuit`. Pages are read
+through the persistent query cache, so a repeated search costs no provider
+calls at all.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, List
+
+from ..io.schemas import PaperBrief
+from .dedup import Deduplicator
+from .query_cache import cached_search
+from ..core.rate_limiter import JobCircuit, provider_limits
+from ..config.constants import PROVIDER_TIMEOUT_SECONDS, SEARCH_DEADLINE_SECONDS, PROVIDER_PAGE_SIZE
+
+# (query, limit, year_from, year_to[, offset]) -> list of raw paper dicts;
+# `offset` is only passed for pages after the first
+SearchFn = Callable[..., Awaitable[List[dict]]]
+
+
+@dataclass
+class Provider:
+    name: str
+    search: SearchFn
+    timeout: float = PROVIDER_TIMEOUT_SECONDS
+    # largest page the provider's API serves
+    page_size: int = PROVIDER_PAGE_SIZE
+
+
+async def _query(provider: Provider, query: str, limit: int, year_from, year_to, offset: int = 0,
+                 stop_at: float | None = None) -> List[PaperBrief]:
+    kwargs = {"offset": offset} if offset else {}
+
+    async def fetch() -> List[dict]:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        # the bucket wait counts against the provider timeout, and a wait past the
+        # search deadline fails fast (RateLimitWaitError) rather than queueing
+        max_wait = provider.timeout if stop_at is None else min(provider.timeout, stop_at - start)
+        async with provider_limits.guard(provider.name, max_wait=max_wait):
+            remaining = provider.timeout - (loop.time() - start)
+            return await asyncio.wait_for(provider.search(query, limit, year_from, year_to, **kwargs), remaining)
+
+    raw = await cached_search(provider.name, query, year_from, year_to, offset, limit, fetch)
+    return [PaperBrief(**p) for p in raw or []]
+
+
+async def _pages(provider: Provider, query: str, page: int, per_source: int, year_from, year_to,
+                 out: asyncio.Queue, jc: JobCircuit, stop_at: float | None = None) -> None:
+    """Pages through one provider until it runs dry or reaches `per_source`; puts each page on `out`.
+
+    Any failure, including a rate-limit wait past `stop_at`, switches the provider off for the job.
+    """
+    offset = 0
+    try:
+        while offset < per_source:
+            # the page size stays fixed so page-numbered APIs line up; the cap trims the last page
+            papers = await _query(provider, query, page, year_from, year_to, offset, stop_at)
+            await out.put((provider.name, papers[:per_source - offset]))
+            offset += len(papers)
+            if len(papers) < page:
+                break
+    except Exception:
+        jc.mark_off(provider.name)
+    finally:
+        await out.put((provider.name, None))
+
+
+async def federated_stream(
+    query: str,
+    n_results: int,
+    providers: List[Provider],
+    year_from: int | None = None,
+    year_to: int | None = None,
+    limit: int | None = None,
+    per_source: int | None = None,
+    deadline: float = SEARCH_DEADLINE_SECONDS,
+    circuit: JobCircuit | None = None,
+) -> AsyncIterator[List[PaperBrief]]:
+    """Yields each batch of newly found unique papers as provider pages arrive.
+
+    `limit` is the page size, clipped to each provider's own `page_size`;
+    `per_source` caps how deep each provider is paged (default: `limit`).
+    Papers already yielded may still be updated in place when a later
+    duplicate fills in their missing metadata.
+    """
+    jc = circuit or JobCircuit()
+    out: asyncio.Queue = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+    stop_at = loop.time() + deadline
+    tasks = []
+    for p in providers:
+        if jc.is_off(p.name):
+            continue
+        page = min(limit or p.page_size, p.page_size)
+        tasks.append(asyncio.create_task(
+            _pages(p, query, page, per_source or limit or page, year_from, year_to, out, jc, stop_at)
+        ))
+
+    unique = Deduplicator()
+    running = len(tasks)
+    try:
+        while running and len(unique) < n_results:
+            remaining = stop_at - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                name, papers = await asyncio.wait_for(out.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if papers is None:
+                running -= 1
+                continue
+            batch = []
+            for r in papers:
+                if unique.add(r):
+                    batch.append(r)
+                    if len(unique) >= n_results:
+                        break
+            if batch:
+                yield batch
+    finally:
+        # providers still paging past the deadline (or no longer needed)
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def federated_search(
+    query: str,
+    n_results: int,
+    providers: List[Provider],
+    year_from: int | None = None,
+    year_to: int | None = None,
+    limit: int | None = None,
+    per_source: int | None = None,
+    deadline: float = SEARCH_DEADLINE_SECONDS,
+    circuit: JobCircuit | None = None,
+) -> List[PaperBrief]:
+    unique: List[PaperBrief] = []
+    async for batch in federated_stream(
+        query, n_results, providers, year_from, year_to,
+        limit=limit or n_results, per_source=per_source, deadline=deadline, circuit=circuit,
+    ):
+        unique.extend(batch)
+    return unique
@@ -0,0 +1,47 @@
+"""
+Concurrent Unpaywall enrichment backed by a persistent DOI -> OA PDF cache.
+
+DOIs without an open-access copy are negative-cached with a shorter TTL so
+they are re-checked occasionally. Lookups go through the shared provider
+limiter; failures (including an open breaker) are not cached. Cache reads
+and writes run in a worker thread, off the event loop.
+"""
+
+import asyncio
+from typing import List, Optional
+
+from ..io.schemas import PaperBrief
+from ..core.disk_cache import DiskCache
+from ..core.rate_limiter import provider_limits
+from ..retrieval.unpaywall_client import enrich_unpaywall
+from ..config.constants import (
+    SOURCE_UNPAYWALL, UNPAYWALL_CONCURRENCY, OA_CACHE_TTL_SECONDS, OA_NEGATIVE_TTL_SECONDS, OA_CACHE_MAX_ENTRIES,
+)
+
+oa_cache = DiskCache("unpaywall_oa", max_entries=OA_CACHE_MAX_ENTRIES)
+
+
+async def lookup_oa_pdf(doi: str, sem: asyncio.Semaphore) -> Optional[str]:
+    key = doi.strip().lower()
+    found, oa_pdf = await asyncio.to_thread(oa_cache.get, key)
+    if found:
+        return oa_pdf
+    async with sem:
+        try:
+            async with provider_limits.guard(SOURCE_UNPAYWALL):
+                e = await enrich_unpaywall(doi) or {}
+        except Exception:
+            return None
+    oa_pdf = e.get("oa_pdf") or None
+    await asyncio.to_thread(oa_cache.set, key, oa_pdf, OA_CACHE_TTL_SECONDS if oa_pdf else OA_NEGATIVE_TTL_SECONDS)
+    return oa_pdf
+
+
+async def enrich_papers(papers: List[PaperBrief], concurrency: int = UNPAYWALL_CONCURRENCY) -> List[PaperBrief]:
+    sem = asyncio.Semaphore(concurrency)
+    with_doi = [p for p in papers if p.doi]
+    found = await asyncio.gather(*(lookup_oa_pdf(p.doi, sem) for p in with_doi))
+    for p, oa_pdf in zip(with_doi, found):
+        if oa_pdf:
+            p.url = p.url or oa_pdf
+    return papers
@@ -0,0 +1,106 @@
+"""
+Persistent cache of provider search results with stale-while-revalidate.
+
+Entries are keyed by (provider, normalized query, year filters, page) and
+stored in a DiskCache that survives restarts and is LRU-bounded by entry
+count. A fresh entry is served as-is; a stale one is served immediately
+while one background task per key re-runs the search and rewrites it; past
+the stale window it is gone and the next call waits for the provider.
+Concurrent misses on one key share a single provider search. A search whose
+caller gives up (deadline, enough results) still finishes and fills the
+cache, since the request was already sent. Failed searches are never cached,
+and empty pages only for a short negative TTL.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from ..core.disk_cache import DiskCache
+from ..core.utils import normalize_query
+from ..config.settings import settings
+from ..config.constants import QUERY_CACHE_FRESH_SECONDS, QUERY_CACHE_STALE_SECONDS, QUERY_CACHE_MAX_ENTRIES, QUERY_CACHE_EMPTY_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+Fetch = Callable[[], Awaitable[List[dict]]]
+
+
+def query_key(provider: str, query: str, year_from: Optional[int], year_to: Optional[int], offset: int, limit: int) -> str:
+    raw = json.dumps([provider, normalize_query(query), year_from, year_to, offset, limit])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class QueryCache:
+    def __init__(self, fresh: float, stale: float, max_entries: int, *, path=None, empty_ttl: float = QUERY_CACHE_EMPTY_TTL_SECONDS):
+        self.fresh = fresh
+        self.stale = stale
+        self.empty_ttl = empty_ttl
+        self.disk = DiskCache("provider_queries", path=path, max_entries=max_entries)
+        self._refreshing: Set[str] = set()
+        self._fetching: Dict[str, asyncio.Task] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def _store(self, key: str, fetch: Fetch) -> List[dict]:
+        t0 = time.perf_counter()
+        papers = await fetch()
+        entry = {"papers": papers or [], "fetched_at": time.time(), "latency": time.perf_counter() - t0}
+        self.disk.set(key, entry, self.fresh + self.stale if entry["papers"] else min(self.empty_ttl, self.fresh))
+        return entry["papers"]
+
+    async def _revalidate(self, key: str, fetch: Fetch) -> None:
+        try:
+            await self._store(key, fetch)
+        except Exception:
+            # keep serving the stale entry; the next stale hit tries again
+            logger.debug("background refresh failed for %s", key, exc_info=True)
+        finally:
+            self._refreshing.discard(key)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._finished)
+        return task
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            # surfaced to the caller if it was still waiting; otherwise nobody needs it
+            logger.debug("provider search failed: %r", task.exception())
+
+    async def get_or_fetch(self, key: str, fetch: Fetch) -> List[dict]:
+        found, entry = self.disk.get(key)
+        if not found:
+            # single flight: callers missing on a key already being fetched wait for that search
+            task = self._fetching.get(key)
+            if task is None:
+                task = self._fetching[key] = self._spawn(self._store(key, fetch))
+                task.add_done_callback(lambda _: self._fetching.pop(key, None))
+            return await asyncio.shield(task)
+        self.disk.stats.saved_seconds += entry["latency"]
+        if time.time() - entry["fetched_at"] > self.fresh:
+            self.disk.stats.stale_hits += 1
+            if key not in self._refreshing:
+                self._refreshing.add(key)
+                self._spawn(self._revalidate(key, fetch))
+        return entry["papers"]
+
+    async def drain(self) -> None:
+        """Waits for in-flight background searches and refreshes (shutdown, tests, benchmarks)."""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+query_cache = QueryCache(QUERY_CACHE_FRESH_SECONDS, QUERY_CACHE_STALE_SECONDS, QUERY_CACHE_MAX_ENTRIES, empty_ttl=QUERY_CACHE_EMPTY_TTL_SECONDS)
+
+
+async def cached_search(
+    provider: str, query: str, year_from: Optional[int], year_to: Optional[int], offset: int, limit: int, fetch: Fetch,
+) -> List[dict]:
+    if not settings.QUERY_CACHE_ENABLED:
+        return await fetch()
+    return await query_cache.get_or_fetch(query_key(provider, query, year_from, year_to, offset, limit), fetch)
@@ -0,0 +1,172 @@
+"""
+Local full-text index over project sources and uploaded documents.
+
+A SQLite FTS5 sidecar (cache/search_index.sqlite3) holds one row per Source
+(title; venue, authors and DOI as body) and per Document (filename; extracted
+text as body). Rows are added as sources are stored and documents extracted;
+`rebuild` backfills from the database. Queries are ranked with BM25, title
+matches weighted up, and return highlighted snippets.
+"""
+
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import select
+
+from ..core.disk_cache import CACHE_DIR
+from ..db import models
+
+KIND_SOURCE = "source"
+KIND_DOCUMENT = "document"
+_KIND_BIT = {KIND_SOURCE: 0, KIND_DOCUMENT: 1}
+
+# bm25 weights per column (kind, ref_id, project_id, user_id, scope, title, body), used as the FTS5 rank
+_RANK = "bm25(0, 0, 0, 0, 0, 5.0, 1.0)"
+
+
+class IndexEntry(NamedTuple):
+    kind: str
+    ref_id: int
+    project_id: int
+    user_id: int
+    title: str
+    body: str
+
+
+class SearchHit(NamedTuple):
+    kind: str
+    id: int
+    project_id: int
+    title: str
+    snippet: str
+    score: float
+
+
+def _rowid(kind: str, ref_id: int) -> int:
+    # sources and documents share the table; the low bit tells them apart
+    return ref_id * 2 + _KIND_BIT[kind]
+
+
+def _scope(user_id: int, project_id: int) -> str:
+    return f"u{user_id} p{project_id}"
+
+
+def match_expression(query: str, user_id: int, project_id: int | None = None) -> Optional[str]:
+    """User text -> FTS5 query: every word must match, the last one as a prefix.
+
+    The owner (and project) are matched as tokens of the `scope` column, so
+    FTS5 intersects posting lists instead of ranking every user's matches
+    and filtering afterwards.
+    """
+    words = re.findall(r"\w+", query)
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words[:-1]] + [f'"{words[-1]}"*']
+    scope = f"u{user_id}" if project_id is None else f'"{_scope(user_id, project_id)}"'
+    return f"scope : {scope} AND {{title body}} : ({' '.join(terms)})"
+
+
+class SearchIndex:
+    def __init__(self, path: Path | None = None):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path or CACHE_DIR / "search_index.sqlite3"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS entries USING fts5("
+            " kind UNINDEXED, ref_id UNINDEXED, project_id UNINDEXED, user_id UNINDEXED, scope, title, body,"
+            " tokenize = 'porter unicode61')"
+        )
+        self._conn.execute("INSERT INTO entries (entries, rank) VALUES ('rank', ?)", (_RANK,))
+        self._conn.commit()
+
+    def add_many(self, entries: Iterable[IndexEntry]) -> int:
+        """Inserts or replaces entries in one transaction; returns how many were written."""
+        rows = list({
+            _rowid(e.kind, e.ref_id): (_rowid(e.kind, e.ref_id), *e[:4], _scope(e.user_id, e.project_id), *e[4:])
+            for e in entries
+        }.values())
+        with self._lock:
+            self._conn.executemany("DELETE FROM entries WHERE rowid = ?", ((r[0],) for r in rows))
+            self._conn.executemany(
+                "INSERT INTO entries (rowid, kind, ref_id, project_id, user_id, scope, title, body)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def add(self, entry: IndexEntry) -> None:
+        self.add_many([entry])
+
+    def remove(self, kind: str, ref_id: int) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE rowid = ?", (_rowid(kind, ref_id),))
+            self._conn.commit()
+
+    def search(
+        self,
+        query: str,
+        user_id: int,
+        project_id: int | None = None,
+        kind: str | None = None,
+        limit: int = 20,
+    ) -> List[SearchHit]:
+        expr = match_expression(query, user_id, project_id)
+        if not expr:
+            return []
+        sql = (
+            "SELECT kind, ref_id, project_id, title, snippet(entries, 6, '<mark>', '</mark>', ' … ', 16), rank"
+            " FROM entries WHERE entries MATCH ?"
+        )
+        args: list = [expr]
+        if kind:
+            sql += " AND kind = ?"
+            args.append(kind)
+        sql += " ORDER BY rank LIMIT ?"
+        args.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        # snippets come from the body (the title is returned whole);
+        # bm25 rank is lower-is-better, so flip it to make larger scores rank higher
+        return [SearchHit(k, int(i), int(p), t, s, round(-score, 4)) for k, i, p, t, s, score in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM entries").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+
+search_index = SearchIndex()
+
+
+# -------------------- entries from models --------------------
+
+def source_entry(src: models.Source, user_id: int) -> IndexEntry:
+    body = " ".join(x for x in (src.venue, src.first_author, src.year, src.doi) if x)
+    return IndexEntry(KIND_SOURCE, src.id, src.project_id, user_id, src.title, body)
+
+
+def document_entry(doc: models.Document) -> IndexEntry:
+    return IndexEntry(KIND_DOCUMENT, doc.id, doc.project_id, doc.user_id, doc.filename, doc.text_content or "")
+
+
+def rebuild(db, batch: int = 1000) -> int:
+    """Re-indexes every source and extracted document (blocking)."""
+    search_index.clear()
+    total = 0
+    sources = db.execute(
+        select(models.Source, models.Project.user_id).join(models.Project, models.Source.project_id == models.Project.id)
+    ).yield_per(batch)
+    for chunk in sources.partitions(batch):
+        total += search_index.add_many(source_entry(src, uid) for src, uid in chunk)
+    docs = db.scalars(select(models.Document).where(models.Document.text_content.is_not(None))).yield_per(batch)
+    for chunk in docs.partitions(batch):
+        total += search_index.add_many(document_entry(d) for d in chunk)
+    return total
@@ -1,42 +1,115 @@
-import httpx
 import os
+import re
+import shutil
+import asyncio
+import tempfile
+import wave
+from pathlib import Path
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 from ..config.settings import settings
-from ..core.llm_utils import llm_chat
+from ..config.constants import SOURCE_OPENAI, TRANSCRIBE_SEGMENT_SECONDS, TRANSCRIBE_OVERLAP_SECONDS, TRANSCRIBE_CONCURRENCY, TRANSCRIBE_MAX_SEGMENT_BYTES
+from ..core.llm_utils import openai_client
+from ..core.rate_limiter import provider_limits
 import google.generativeai as genai
 
 llm = "Chatgpt"  # or "Gemini"
 
 OPENAI_API_BASE = "https://api.openai.com/v1/audio/transcriptions"
 
-def transcribe_audio(file: UploadFile) -> str:
+# -------------------- Segmenting long recordings --------------------
+
+def _split_wav(path: str, segment_s: int, overlap_s: int, max_bytes: int = TRANSCRIBE_MAX_SEGMENT_BYTES) -> list[str]:
     """
-    Transcribes uploaded audio using either OpenAI Whisper or Gemini 1.5-Pro.
-    Works with the same switch variable `llm`.
+    Cuts a WAV file into overlapping temp segments; returns [path] when it is short enough.
+    Segments are at most `segment_s` long and small enough to fit in `max_bytes`.
     """
-    if llm.lower() == "gemini":
-        try:
-            genai.configure(api_key=os.getenv("GEMINI_API_KEY", ""))
-            model = genai.GenerativeModel("gemini-1.5-pro")
-            # Convert UploadFile to local temporary file for Gemini input
-            tmp_path = f"/tmp/{file.filename}"
-            with open(tmp_path, "wb") as tmp:
-                tmp.write(file.file.read())
-            # Gemini multimodal prompt
-            resp = model.generate_content(["Transcribe this research-related audio:", genai.upload_file(tmp_path)])
-            return resp.text.strip() if resp and resp.text else "[No output from Gemini]"
-        except Exception as e:
-            return f"[Gemini transcription failed: {str(e)}]"
-
-    # ---------- Default: Whisper (OpenAI) ----------
+    with wave.open(path, "rb") as w:
+        params = w.getparams()
+        rate, total = w.getframerate(), w.getnframes()
+        frame_bytes = w.getnchannels() * w.getsampwidth()
+        seg_frames = min(segment_s * rate, (max_bytes - 1024) // frame_bytes)  # room for the header
+        step = max(seg_frames - overlap_s * rate, seg_frames // 2)
+        if total <= seg_frames:
+            return [path]
+        segments = []
+        for start in range(0, total, step):
+            w.setpos(start)
+            fd, seg = tempfile.mkstemp(suffix=".wav")
+            os.close(fd)
+            with wave.open(seg, "wb") as out:
+                out.setparams(params)
+                out.writeframes(w.readframes(seg_frames))
+            segments.append(seg)
+            if start + seg_frames >= total:
+                break
+    return segments
+
+def _words(text: str) -> list[str]:
+    return [re.sub(r"\W", "", w).lower() for w in text.split()]
+
+def _stitch(parts: list[str], max_overlap_words: int = 40) -> str:
+    """Joins segment transcripts, dropping words repeated in the overlap between neighbours."""
+    out = parts[0] if parts else ""
+    for nxt in parts[1:]:
+        tail, head = _words(out)[-max_overlap_words:], _words(nxt)
+        k = next((k for k in range(min(len(tail), len(head)), 0, -1) if tail[-k:] == head[:k]), 0)
+        out = f"{out} {' '.join(nxt.split()[k:])}".strip()
+    return out
+
+# -------------------- Backends --------------------
+
+async def _whisper(path: str, filename: str, content_type: str | None) -> str:
+    data = await asyncio.to_thread(Path(path).read_bytes)
+    async with provider_limits.guard(SOURCE_OPENAI), openai_client() as client:
+        files = {"file": (filename, data, content_type or "application/octet-stream")}
+        form = {"model": "whisper-1", "temperature": "0"}
+        headers = {"Authorization": f"Bearer {settings.OPENAI_API_KEY}"}
+        resp = await client.post(OPENAI_API_BASE, headers=headers, files=files, data=form)
+        resp.raise_for_status()
+        return resp.json().get("text", "").strip()
+
+def _gemini_blocking(path: str) -> str:
+    genai.configure(api_key=os.getenv("GEMINI_API_KEY", ""))
+    model = genai.GenerativeModel("gemini-1.5-pro")
+    resp = model.generate_content(["Transcribe this research-related audio:", genai.upload_file(path)])
+    return resp.text.strip() if resp and resp.text else "[No output from Gemini]"
+
+async def _transcribe_segment(path: str, filename: str, content_type: str | None, sem: asyncio.Semaphore) -> str:
+    async with sem:
+        if llm.lower() == "gemini":
+            return await asyncio.to_thread(_gemini_blocking, path)
+        return await _whisper(path, filename, content_type)
+
+# -------------------- Public API --------------------
+
+async def transcribe_path(path: str, filename: str, content_type: str | None = None) -> str:
+    """
+    Transcribes a stored recording with either OpenAI Whisper or Gemini 1.5-Pro.
+    Long WAV recordings are split into overlapping segments that are transcribed
+    concurrently and stitched back together.
+    """
+    segments = [path]
     try:
-        with httpx.Client(timeout=60.0) as client:
-            files = {"file": (file.filename, file.file, file.content_type)}
-            data = {"model": "whisper-1", "temperature": "0"}
-            headers = {"Authorization": f"Bearer {settings.OPENAI_API_KEY}"}
-            resp = client.post(OPENAI_API_BASE, headers=headers, files=files, data=data)
-            resp.raise_for_status()
-            result = resp.json()
-            return result.get("text", "").strip()
+        if Path(path).suffix.lower() == ".wav":
+            segments = await asyncio.to_thread(_split_wav, path, TRANSCRIBE_SEGMENT_SECONDS, TRANSCRIBE_OVERLAP_SECONDS)
+        sem = asyncio.Semaphore(TRANSCRIBE_CONCURRENCY)
+        parts = await asyncio.gather(*(_transcribe_segment(s, filename, content_type, sem) for s in segments))
+        return _stitch(parts)
     except Exception as e:
-        return f"[Transcription failed: {str(e)}]"
+        backend = "Gemini transcription" if llm.lower() == "gemini" else "Transcription"
+        return f"[{backend} failed: {str(e)}]"
+    finally:
+        for s in segments:
+            if s != path:
+                Path(s).unlink(missing_ok=True)
+
+async def transcribe_audio(file: UploadFile) -> str:
+    """Spools the upload to a temp file (off the event loop), transcribes it, then removes it."""
+    fd, tmp = tempfile.mkstemp(suffix=Path(file.filename or "").suffix.lower())
+    try:
+        with os.fdopen(fd, "wb") as out:
+            await run_in_threadpool(shutil.copyfileobj, file.file, out)
+        return await transcribe_path(tmp, file.filename or "audio", file.content_type)
+    finally:
+        Path(tmp).unlink(missing_ok=True)
@@ -0,0 +1,74 @@
+"""
+Micro-benchmark: per-request authentication overhead of get_current_user.
+
+Compares the previous path (decode JWT + load the user row on every request)
+with the principal cache, and with trusted signed claims on a cold cache.
+The database is a throwaway SQLite file, so a real deployment's network
+round trip would only widen the gap.
+
+Run from backend/:  python benchmarks/bench_auth.py
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+_db = Path(tempfile.mkdtemp()) / "bench_auth.sqlite3"
+for k, v in {"DATABASE_URL": f"sqlite:///{_db}", "JWT_SECRET": "bench-secret-" + "x" * 32, "OPENAI_API_KEY": "bench"}.items():
+    os.environ.setdefault(k, v)
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.config.settings import settings
+from app.core import security
+from app.db import models
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+
+CALLS = 5000
+
+
+def measure(label, creds, setup):
+    samples = []
+    for _ in range(CALLS):
+        setup()
+        t0 = time.perf_counter()
+        security.get_current_user(creds)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    samples.sort()
+    print(f"{label:<28} mean={statistics.mean(samples):7.1f} us  p50={samples[len(samples) // 2]:7.1f} us  p99={samples[int(len(samples) * 0.99)]:7.1f} us")
+
+
+def main():
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        user = models.User(email="bench@example.com", name="Bench", role="scientist", password_hash="x")
+        db.add(user)
+        db.commit()
+        claims = {"sub": str(user.id), "role": user.role, "email": user.email, "name": user.name}
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=security.create_access_token(claims))
+    cache = security.principal_cache
+
+    def db_every_time():
+        settings.AUTH_TRUST_TOKEN_CLAIMS = False
+        cache._entries.clear()
+
+    def cached():
+        settings.AUTH_TRUST_TOKEN_CLAIMS = False
+
+    def claims_cold():
+        settings.AUTH_TRUST_TOKEN_CLAIMS = True
+        cache._entries.clear()
+
+    print(f"{CALLS} calls per mode, database: {settings.DATABASE_URL}")
+    measure("decode + DB lookup (before)", creds, db_every_time)
+    measure("principal cache hit", creds, cached)
+    measure("signed claims, cold cache", creds, claims_cold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Concurrency benchmark: sync endpoints wrapping asyncio.run vs. native async endpoints.
+
+Both routes call the real methodology feature with llm_chat replaced by a
+fixed-latency stub. The sync route mirrors the previous shape (a threadpool
+worker plus a fresh event loop per request), so it is capped by the
+threadpool size; the async route only waits on the event loop.
+
+Run from backend/:  python benchmarks/bench_concurrency.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for k, v in {"DATABASE_URL": "sqlite://", "JWT_SECRET": "bench", "OPENAI_API_KEY": "bench"}.items():
+    os.environ.setdefault(k, v)
+
+import httpx
+from fastapi import FastAPI
+from app.features import methodology_builder
+from app.io.schemas import MethodologyRequest, MethodologyResponse
+
+LLM_LATENCY = 0.5
+LEVELS = [50, 200, 500]
+
+
+async def fake_llm_chat(prompt, system="", **kwargs):
+    await asyncio.sleep(LLM_LATENCY)
+    return "stub rationale"
+
+methodology_builder.llm_chat = fake_llm_chat
+
+app = FastAPI()
+
+
+@app.post("/sync", response_model=MethodologyResponse)
+def sync_route(payload: MethodologyRequest):
+    return asyncio.run(methodology_builder._build(payload.concept, payload.datasets, payload.baselines, payload.constraints))
+
+
+@app.post("/async", response_model=MethodologyResponse)
+async def async_route(payload: MethodologyRequest):
+    return await methodology_builder.build_methodology(payload, None, None)
+
+
+async def fire(client: httpx.AsyncClient, path: str, n: int) -> float:
+    t0 = time.perf_counter()
+    rs = await asyncio.gather(*(client.post(path, json={"concept": f"c{i}"}) for i in range(n)))
+    assert all(r.status_code == 200 for r in rs)
+    return time.perf_counter() - t0
+
+
+async def main():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        print(f"stub LLM latency {LLM_LATENCY * 1000:.0f} ms")
+        for n in LEVELS:
+            for path in ("/sync", "/async"):
+                elapsed = await fire(client, path, n)
+                print(f"{path:<7} {n:4d} concurrent  wall={elapsed:6.2f}s  throughput={n / elapsed:7.1f} req/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
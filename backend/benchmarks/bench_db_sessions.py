@@ -0,0 +1,97 @@
+"""
+Benchmark: eager sync `get_db` vs. the lazy async `get_db`.
+
+Two routes share the dependency: an LLM-style async route that never
+touches the database (stubbed 20 ms await) and a sync route that runs one
+query. The previous dependency (sync generator, Session per request) costs
+two threadpool hops per request even when the session goes unused; the
+lazy one creates nothing until first use. Reports throughput, sessions and
+pool checkouts per request at several concurrency levels.
+
+Run from backend/:  python benchmarks/bench_db_sessions.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Generator
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+_db = Path(tempfile.mkdtemp()) / "bench_sessions.sqlite3"
+for k, v in {"DATABASE_URL": f"sqlite:///{_db}", "JWT_SECRET": "bench", "OPENAI_API_KEY": "bench"}.items():
+    os.environ.setdefault(k, v)
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.base import Base
+from app.db.session import POOL_STATS, SessionLocal, engine, get_db
+
+LEVELS = [10, 100, 400]
+LLM_LATENCY = 0.02
+
+
+def eager_get_db() -> Generator[Session, None, None]:
+    # the previous dependency
+    db = SessionLocal()
+    POOL_STATS["sessions"] += 1
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def make_app(dep) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/llm")
+    async def llm_route(db: Session = Depends(dep)):
+        await asyncio.sleep(LLM_LATENCY)
+        return {}
+
+    @app.get("/projects")
+    def projects_route(db: Session = Depends(dep)):
+        return [p.id for p in db.scalars(select(models.Project).where(models.Project.user_id == 1).limit(20))]
+
+    return app
+
+
+async def fire(client, method, path, n):
+    before = dict(POOL_STATS)
+    t0 = time.perf_counter()
+    rs = await asyncio.gather(*(client.request(method, path) for _ in range(n)))
+    elapsed = time.perf_counter() - t0
+    assert all(r.status_code == 200 for r in rs)
+    sessions = (POOL_STATS["sessions"] - before["sessions"]) / n
+    checkouts = (POOL_STATS["checkouts"] - before["checkouts"]) / n
+    return n / elapsed, sessions, checkouts
+
+
+async def main():
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        user = models.User(email="b@example.com", name="B", role="scientist", password_hash="x")
+        db.add(user)
+        db.flush()
+        db.add_all(models.Project(user_id=user.id, title=f"p{i}", domain="d", aim="a") for i in range(50))
+        db.commit()
+
+    for label, dep in (("eager", eager_get_db), ("lazy", get_db)):
+        transport = httpx.ASGITransport(app=make_app(dep))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            await fire(client, "GET", "/projects", 50)   # warm-up
+            for method, path in (("POST", "/llm"), ("GET", "/projects")):
+                for n in LEVELS:
+                    rps, sessions, checkouts = await fire(client, method, path, n)
+                    print(f"{label:<6} {path:<10} {n:4d} concurrent  {rps:7.1f} req/s  "
+                          f"sessions/req={sessions:.2f}  checkouts/req={checkouts:.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
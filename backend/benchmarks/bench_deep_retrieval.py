@@ -0,0 +1,93 @@
+"""
+Benchmark: deep retrieval (hundreds of papers) sequential vs. concurrent paging.
+
+Three stub providers serve overlapping result sets page by page with
+injected latency, behind the real per-provider rate limits from
+config/constants.py (Semantic Scholar at 1 request/s). Compares paging the
+providers one after another with `federated_stream`, which pages them
+concurrently and de-duplicates as pages land: time to the first results,
+time to the full sweep, unique papers and requests made.
+
+Run from backend/:  python benchmarks/bench_deep_retrieval.py
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+# the query cache is measured by bench_query_cache.py; here every page must reach the stubs
+for k, v in {"DATABASE_URL": "sqlite://", "JWT_SECRET": "bench", "OPENAI_API_KEY": "bench", "QUERY_CACHE_ENABLED": "false"}.items():
+    os.environ.setdefault(k, v)
+
+from app.retrieval.dedup import Deduplicator
+from app.retrieval.federated import Provider, federated_stream
+from app.config.constants import DEEP_PAGE_SIZES, SOURCE_SEMANTIC_SCHOLAR, SOURCE_OPENALEX, SOURCE_CROSSREF
+
+TARGET = 600
+PER_SOURCE = 400
+# provider -> (papers it knows, median page latency in seconds); ids overlap across providers
+CORPUS = {SOURCE_SEMANTIC_SCHOLAR: (range(0, 450), 0.6), SOURCE_OPENALEX: (range(150, 800), 0.4), SOURCE_CROSSREF: (range(300, 700), 0.8)}
+
+requests = 0
+
+
+def make_stub(name: str):
+    ids, median = CORPUS[name]
+
+    async def search(query, limit, year_from, year_to, offset=0):
+        global requests
+        requests += 1
+        await asyncio.sleep(random.lognormvariate(0, 0.3) * median)
+        page = ids[offset:offset + limit]
+        return [{"title": f"Study {i} of deep retrieval", "first_author": f"Author{i}", "year": "2023",
+                 "doi": f"10.1/{i}", "provider": name} for i in page]
+    return search
+
+
+PROVIDERS = [Provider(n, make_stub(n), timeout=10, page_size=DEEP_PAGE_SIZES[n]) for n in CORPUS]
+
+
+async def sequential():
+    # one provider, one page at a time, each page through the same limiter as the real path
+    from app.retrieval.federated import _query
+    dd, first = Deduplicator(), None
+    t0 = time.perf_counter()
+    for p in PROVIDERS:
+        offset = 0
+        while offset < PER_SOURCE and len(dd) < TARGET:
+            page = await _query(p, "q", p.page_size, None, None, offset)
+            for r in page[:PER_SOURCE - offset]:
+                dd.add(r)
+            first = first or time.perf_counter() - t0
+            offset += len(page)
+            if len(page) < p.page_size:
+                break
+    return first, time.perf_counter() - t0, len(dd)
+
+
+async def concurrent():
+    n, first = 0, None
+    t0 = time.perf_counter()
+    async for batch in federated_stream("q", TARGET, PROVIDERS, per_source=PER_SOURCE, deadline=120):
+        n += len(batch)
+        first = first or time.perf_counter() - t0
+    return first, time.perf_counter() - t0, n
+
+
+async def main():
+    global requests
+    random.seed(3)
+    print(f"target={TARGET} unique papers, per-source cap={PER_SOURCE}, page sizes={DEEP_PAGE_SIZES}")
+    for label, fn in (("sequential", sequential), ("concurrent", concurrent)):
+        requests = 0
+        await asyncio.sleep(2)  # let the provider buckets refill between runs
+        first, total, n = await fn()
+        print(f"{label:<11} first results {first:5.2f}s  full sweep {total:5.2f}s  unique={n}  requests={requests}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
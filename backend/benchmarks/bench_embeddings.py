@@ -0,0 +1,94 @@
+"""
+Benchmark: local embedding index recall and latency at 10k, 100k and 1M vectors.
+
+Synthetic clustered unit vectors (the shape hashed title embeddings take)
+are stored int8-quantised in a temp VectorIndex. For each size it reports
+recall@10 of the int8 brute-force search against exact float32 cosine, and
+p50/p99 latency of an unfiltered scan and of a per-user scan (as "related
+papers" runs). Also reports hashing-vectorizer throughput on titles.
+Override sizes with BENCH_SIZES=10000,100000.
+
+Run from backend/:  python benchmarks/bench_embeddings.py
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for k, v in {"DATABASE_URL": "sqlite://", "JWT_SECRET": "bench", "OPENAI_API_KEY": "bench"}.items():
+    os.environ.setdefault(k, v)
+
+from app.config.constants import EMBEDDING_DIM
+from app.retrieval.embeddings import KIND_SOURCE, VectorIndex, VectorKey, embed
+
+SIZES = [int(x) for x in os.environ.get("BENCH_SIZES", "10000,100000,1000000").split(",")]
+CHUNK = 100_000
+CENTROIDS = 2_000
+USERS = 1_000
+QUERIES = 50
+K = 10
+
+_centroids = np.random.default_rng(0).standard_normal((CENTROIDS, EMBEDDING_DIM)).astype(np.float32)
+
+
+def chunk_vectors(i: int, n: int) -> np.ndarray:
+    # regenerated from its seed for the exact pass instead of holding 1M float32 rows
+    rng = np.random.default_rng(1000 + i)
+    v = _centroids[rng.integers(0, CENTROIDS, n)] + 1.5 * rng.standard_normal((n, EMBEDDING_DIM)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def pct(samples, q):
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(q * len(s)))] * 1000
+
+
+def bench_size(n: int) -> None:
+    index = VectorIndex(Path(tempfile.mkdtemp()))
+    chunks = [(i, min(CHUNK, n - i * CHUNK)) for i in range((n + CHUNK - 1) // CHUNK)]
+    t0 = time.perf_counter()
+    for i, size in chunks:
+        start = i * CHUNK
+        keys = [VectorKey(KIND_SOURCE, start + j, 0, (start + j) % USERS) for j in range(size)]
+        index.add(keys, chunk_vectors(i, size), replace=False)
+    build = time.perf_counter() - t0
+
+    rng = np.random.default_rng(7)
+    queries = chunk_vectors(0, QUERIES) + 0.3 * rng.standard_normal((QUERIES, EMBEDDING_DIM)).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    exact = np.concatenate([chunk_vectors(i, size) @ queries.T for i, size in chunks])
+    truth = [set(np.argpartition(-exact[:, q], K)[:K].tolist()) for q in range(QUERIES)]
+
+    recall, full, per_user = 0.0, [], []
+    for q in range(QUERIES):
+        t = time.perf_counter()
+        hits = index.search(queries[q], None, k=K)
+        full.append(time.perf_counter() - t)
+        recall += len(truth[q] & {h.id for h in hits}) / K
+        t = time.perf_counter()
+        index.search(queries[q], random.randrange(USERS), k=K)
+        per_user.append(time.perf_counter() - t)
+    print(f"{n:>9,} vectors  build {build:6.1f}s  recall@{K} {recall / QUERIES:.3f}  "
+          f"scan p50 {pct(full, .5):7.1f} ms p99 {pct(full, .99):7.1f} ms  "
+          f"per-user p50 {pct(per_user, .5):6.1f} ms p99 {pct(per_user, .99):6.1f} ms")
+
+
+def main():
+    rnd = random.Random(5)
+    vocab = [f"term{i}" for i in range(5000)]
+    titles = [" ".join(rnd.choices(vocab, k=12)) for _ in range(10_000)]
+    t0 = time.perf_counter()
+    embed(titles)
+    print(f"hashing vectorizer: {len(titles) / (time.perf_counter() - t0):,.0f} titles/s ({EMBEDDING_DIM} dims)")
+    for n in SIZES:
+        bench_size(n)
+
+
+if __name__ == "__main__":
+    main()
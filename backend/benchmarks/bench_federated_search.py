@@ -0,0 +1,82 @@
+"""
+Benchmark: sequential provider retrieval vs. concurrent federated search.
+
+Providers are stubbed with injected latency (lognormal around a median per
+provider) so the numbers only reflect orchestration, not the network.
+
+Run from backend/:  python benchmarks/bench_federated_search.py
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+# every run repeats one query; with the result cache on, only the first would reach the stubs
+os.environ.setdefault("QUERY_CACHE_ENABLED", "false")
+
+from app.io.schemas import PaperBrief
+from app.core.rate_limiter import provider_limits
+from app.retrieval.federated import Provider, federated_search
+
+RUNS = 40
+N_RESULTS = 20
+# providers often return fewer hits than asked for; this forces every provider to be visited
+STUB_PAGE = 8
+
+# provider name -> median latency in seconds
+LATENCIES = {"semantic_scholar": 0.35, "openalex": 0.25, "crossref": 0.45}
+
+
+def make_stub(name: str, median: float):
+    async def search(query, limit, year_from, year_to):
+        await asyncio.sleep(random.lognormvariate(0, 0.35) * median)
+        return [
+            {"title": f"{name} paper {i}", "first_author": "Doe", "year": "2024", "provider": name, "doi": f"10.1/{name}.{i}"}
+            for i in range(min(limit, STUB_PAGE))
+        ]
+    return search
+
+
+async def sequential(query, n_results, providers):
+    # mirrors the previous _search_all: one provider after another
+    results = []
+    for p in providers:
+        if len(results) >= n_results:
+            break
+        raw = await p.search(query, min(n_results - len(results), 20), None, None)
+        results.extend(PaperBrief(**r) for r in raw)
+    return results[:n_results]
+
+
+def pct(samples, q):
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(round(q * (len(s) - 1))))]
+
+
+async def measure(label, fn):
+    samples = []
+    for _ in range(RUNS):
+        t0 = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    print(f"{label:<12} p50={pct(samples, 0.50):7.1f} ms  p95={pct(samples, 0.95):7.1f} ms  mean={statistics.mean(samples):7.1f} ms")
+
+
+async def main():
+    random.seed(7)
+    providers = [Provider(name, make_stub(name, lat)) for name, lat in LATENCIES.items()]
+    # measure orchestration only; provider rate limits are covered by bench_rate_limiter.py
+    for name in LATENCIES:
+        provider_limits.set_limit(name, 1e6, 1000)
+    print(f"{RUNS} runs, n_results={N_RESULTS}, stub page={STUB_PAGE}, injected medians={LATENCIES}")
+    await measure("sequential", lambda: sequential("graph neural networks", N_RESULTS, providers))
+    await measure("federated", lambda: federated_search("graph neural networks", N_RESULTS, providers, limit=N_RESULTS))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
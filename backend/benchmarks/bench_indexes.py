@@ -0,0 +1,103 @@
+"""
+Benchmark: hot foreign-key lookups with and without the composite indexes.
+
+Seeds a SQLite file with ROWS projects, documents, jobs and sources
+(default 1M each, override with BENCH_ROWS), then runs the app's real
+access patterns with the indexes declared in app/db/models.py dropped and
+recreated. Prints each query plan and the mean latency over random keys.
+
+Run from backend/:  python benchmarks/bench_indexes.py
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+_db = Path(tempfile.mkdtemp()) / "bench_indexes.sqlite3"
+for k, v in {"DATABASE_URL": f"sqlite:///{_db}", "JWT_SECRET": "bench", "OPENAI_API_KEY": "bench"}.items():
+    os.environ.setdefault(k, v)
+
+from sqlalchemy import create_engine
+
+# importing Base through the models module registers every table on its metadata
+from app.db.models import Base
+
+ROWS = int(os.environ.get("BENCH_ROWS", 1_000_000))
+USERS = ROWS // 100
+PROJECTS = ROWS // 10
+LOOKUPS = 200
+TABLES = ["projects", "documents", "drafts", "sources", "citations", "jobs"]
+
+# name -> (sql, key generator)
+QUERIES = {
+    "list_projects": ("SELECT id, title FROM projects WHERE user_id = ? ORDER BY id LIMIT 50", lambda: random.randrange(1, USERS)),
+    "project documents": ("SELECT id, filename FROM documents WHERE project_id = ? ORDER BY id LIMIT 50", lambda: random.randrange(1, PROJECTS)),
+    "source by DOI": ("SELECT id FROM sources WHERE project_id = ? AND doi = ?", lambda: (p := random.randrange(1, PROJECTS), f"10.1/{p}.3")),
+    "user jobs": ("SELECT id, status FROM jobs WHERE user_id = ? ORDER BY id DESC LIMIT 50", lambda: random.randrange(1, USERS)),
+    "abandoned jobs": ("SELECT id FROM jobs WHERE status IN ('queued', 'running') AND updated_at < ?", lambda: ("2000-01-01",)),
+}
+
+
+def seed(conn):
+    rnd = random.Random(1)
+    conn.executemany("INSERT INTO users (id, email, name, role, password_hash) VALUES (?, ?, 'u', 'scientist', 'x')",
+                     ((i, f"u{i}@example.com") for i in range(1, USERS + 1)))
+    conn.executemany("INSERT INTO projects (user_id, title, domain, aim) VALUES (?, 'p', 'd', 'a')",
+                     ((rnd.randrange(1, USERS),) for _ in range(ROWS)))
+    conn.executemany("INSERT INTO documents (project_id, user_id, filename, path, mime) VALUES (?, 1, 'f.pdf', 'x', 'application/pdf')",
+                     ((rnd.randrange(1, PROJECTS),) for _ in range(ROWS)))
+    conn.executemany("INSERT INTO sources (project_id, title, first_author, year, venue, doi, url, provider) VALUES (?, 't', 'a', '2024', 'v', ?, '', 'openalex')",
+                     ((p := rnd.randrange(1, PROJECTS), f"10.1/{p}.{i % 10}") for i in range(ROWS)))
+    conn.executemany("INSERT INTO jobs (user_id, type, status, message, params) VALUES (?, 'survey', ?, '', '')",
+                     ((rnd.randrange(1, USERS), "running" if rnd.random() < 0.0005 else "succeeded") for _ in range(ROWS)))
+    conn.commit()
+
+
+def run(conn, label):
+    print(f"--- {label}")
+    for name, (sql, key) in QUERIES.items():
+        args = key()
+        args = args if isinstance(args, tuple) else (args,)
+        plan = "; ".join(r[3] for r in conn.execute(f"EXPLAIN QUERY PLAN {sql}", args))
+        t0 = time.perf_counter()
+        for _ in range(LOOKUPS):
+            args = key()
+            conn.execute(sql, args if isinstance(args, tuple) else (args,)).fetchall()
+        ms = (time.perf_counter() - t0) * 1000 / LOOKUPS
+        print(f"{name:<18} {ms:9.3f} ms  {plan}")
+
+
+def main():
+    engine = create_engine(os.environ["DATABASE_URL"])
+    Base.metadata.create_all(engine)
+    indexes = [ix for t in TABLES for ix in Base.metadata.tables[t].indexes]
+    for ix in indexes:
+        ix.drop(engine)
+    engine.dispose()
+
+    conn = sqlite3.connect(_db)
+    t0 = time.perf_counter()
+    seed(conn)
+    print(f"seeded {ROWS:,} rows per table in {time.perf_counter() - t0:.0f}s ({_db})")
+    conn.execute("ANALYZE")
+    run(conn, "without indexes")
+
+    conn.close()
+    engine = create_engine(os.environ["DATABASE_URL"])
+    t0 = time.perf_counter()
+    for ix in indexes:
+        ix.create(engine)
+    engine.dispose()
+    print(f"built {len(indexes)} indexes in {time.perf_counter() - t0:.0f}s")
+    conn = sqlite3.connect(_db)
+    conn.execute("ANALYZE")
+    run(conn, "with indexes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Load test: per-call httpx.AsyncClient vs. the pooled app-scoped LLM transport.
+
+A local stub of the OpenAI chat-completions endpoint counts how many TCP
+connections it accepts, so connection reuse is visible next to latency.
+Plain-HTTP stubs negotiate HTTP/1.1; HTTP/2 only applies over TLS.
+
+Run from backend/:  python benchmarks/bench_llm_transport.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for k, v in {"DATABASE_URL": "sqlite://", "JWT_SECRET": "bench", "OPENAI_API_KEY": "bench"}.items():
+    os.environ.setdefault(k, v)
+
+import httpx
+from app.core import llm_utils
+
+REQUESTS = 400
+CONCURRENCY = 20
+BODY = json.dumps({"choices": [{"message": {"content": "ok"}}]}).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        StubHandler.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+async def unpooled_chat(prompt: str) -> str:
+    # the previous llm_chat shape: a fresh client (and TCP handshake) per call
+    async with httpx.AsyncClient(timeout=60.0) as client:
+        r = await client.post(f"{llm_utils.OPENAI_API_BASE}/chat/completions", json={"messages": [prompt]})
+        r.raise_for_status()
+        return r.json()["choices"][0]["message"]["content"]
+
+
+async def run(label: str, call):
+    StubHandler.connections = 0
+    sem = asyncio.Semaphore(CONCURRENCY)
+    latencies = []
+
+    async def one(i):
+        async with sem:
+            t0 = time.perf_counter()
+            await call(f"prompt {i}")
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(REQUESTS)))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    print(f"{label:<8} {REQUESTS / elapsed:8.0f} req/s  p50={latencies[len(latencies) // 2]:6.2f} ms  "
+          f"p95={latencies[int(len(latencies) * 0.95)]:6.2f} ms  connections={StubHandler.connections}")
+
+
+async def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    llm_utils.OPENAI_API_BASE = f"http://127.0.0.1:{server.server_port}"
+    llm_utils.llm_choice = "Chatgpt"
+
+    print(f"{REQUESTS} requests, concurrency {CONCURRENCY}")
+    await run("per-call", unpooled_chat)
+    await llm_utils.start_llm_transport()
+    try:
+        await run("pooled", lambda p: llm_utils.llm_chat(p, use_cache=False))
+    finally:
+        await llm_utils.close_llm_transport()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
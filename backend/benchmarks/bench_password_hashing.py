@@ -0,0 +1,89 @@
+"""
+Benchmark: inline bcrypt in sync endpoints vs. the dedicated hashing pool.
+
+A burst of logins runs alongside cheap sync requests (the kind every other
+endpoint and dependency makes). Inline, each bcrypt verify holds one of the
+shared threadpool's workers; offloaded, logins wait on their own bounded pool
+and the shared threadpool stays free. Reports p50/p99 for both kinds.
+
+Run from backend/:  python benchmarks/bench_password_hashing.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for k, v in {"DATABASE_URL": "sqlite://", "JWT_SECRET": "bench", "OPENAI_API_KEY": "bench", "BCRYPT_ROUNDS": "10"}.items():
+    os.environ.setdefault(k, v)
+
+import httpx
+from fastapi import FastAPI
+
+from app.config.settings import settings
+from app.core.security import pwd_context, verify_and_update_password
+
+LOGINS = 120
+PINGS = 400
+PING_WORK = 0.002   # a short blocking DB call
+
+HASH = pwd_context.hash("correct horse")
+app = FastAPI()
+
+
+@app.post("/login/inline")
+def login_inline():
+    assert pwd_context.verify("correct horse", HASH)
+    return {}
+
+
+@app.post("/login/offloaded")
+async def login_offloaded():
+    ok, _ = await verify_and_update_password("correct horse", HASH)
+    assert ok
+    return {}
+
+
+@app.get("/ping")
+def ping():
+    time.sleep(PING_WORK)
+    return {}
+
+
+def pct(samples, q):
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(q * len(s)))] * 1000
+
+
+async def timed(client, method, path, out):
+    t0 = time.perf_counter()
+    r = await client.request(method, path)
+    assert r.status_code == 200
+    out.append(time.perf_counter() - t0)
+
+
+async def burst(client, login_path):
+    logins, pings = [], []
+    t0 = time.perf_counter()
+    await asyncio.gather(
+        *(timed(client, "POST", login_path, logins) for _ in range(LOGINS)),
+        *(timed(client, "GET", "/ping", pings) for _ in range(PINGS)),
+    )
+    wall = time.perf_counter() - t0
+    print(f"{login_path:<17} wall={wall:5.2f}s  login p50={pct(logins, .5):7.1f} p99={pct(logins, .99):7.1f} ms"
+          f"  ping p50={pct(pings, .5):7.1f} p99={pct(pings, .99):7.1f} ms")
+
+
+async def main():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        print(f"{LOGINS} logins + {PINGS} sync pings, bcrypt rounds={settings.BCRYPT_ROUNDS}, "
+              f"hash pool={settings.PASSWORD_HASH_WORKERS}, cpus={os.cpu_count()}")
+        for path in ("/login/inline", "/login/offloaded"):
+            await burst(client, path)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+"""
+Benchmark: prompt construction on large documents, token budgets vs character slicing.
+
+Builds synthetic papers of growing size (title, abstract, numbered sections,
+a long reference list) with one marked key sentence at the start of the
+abstract, introduction, method, results and conclusion. For each size,
+reports the time to estimate tokens and to fit the text to the persona
+budget, against the old `text[:15000]` slice, and which key sentences and
+section headings each prompt keeps. When tiktoken and its o200k encoding
+are available locally the estimator is compared with the real count.
+
+Run from backend/:  python benchmarks/bench_prompt_budget.py
+"""
+
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for k, v in {"DATABASE_URL": "sqlite://", "JWT_SECRET": "bench", "OPENAI_API_KEY": "bench"}.items():
+    os.environ.setdefault(k, v)
+
+from app.core.prompt_budget import budget_for, estimate_tokens, fit_to_budget
+
+MODEL = "gpt-4o"
+SIZES = [50_000, 250_000, 1_000_000, 4_000_000]
+RUNS = 5
+SECTIONS = ["Introduction", "Related Work", "Method", "Experiments", "Results", "Discussion", "Conclusion"]
+KEYED = {"Abstract", "Introduction", "Method", "Results", "Conclusion"}
+
+rnd = random.Random(5)
+VOCAB = ["".join(rnd.choice("bcdfgklmnprstv") + rnd.choice("aeiou") for _ in range(rnd.randint(1, 4))) for _ in range(4000)]
+WEIGHTS = [1 / (i + 1) ** 0.9 for i in range(len(VOCAB))]
+CUM = [0.0]
+for w in WEIGHTS:
+    CUM.append(CUM[-1] + w)
+CUM = CUM[1:]
+
+
+def sentence() -> str:
+    words = rnd.choices(VOCAB, cum_weights=CUM, k=rnd.randint(8, 24))
+    if rnd.random() < 0.2:
+        words.insert(rnd.randrange(len(words)), f"{rnd.randint(1, 999)}.{rnd.randint(0, 99)}%")
+    return " ".join(words).capitalize() + "."
+
+
+def paragraph(n: int = 6) -> str:
+    # PDF-style: hard-wrapped lines inside a paragraph
+    text = " ".join(sentence() for _ in range(n))
+    return "\n".join(text[i:i + 90] for i in range(0, len(text), 90))
+
+
+def paper(n_chars: int) -> str:
+    per_section = max(1, int(n_chars * 0.9) // (len(SECTIONS) * 700))
+    parts = ["Synthetic Study of Things\nA. Author, B. Author\n", "Abstract\n" + f"KEY:Abstract {sentence()} " + paragraph(4)]
+    for i, name in enumerate(SECTIONS, 1):
+        lead = f"KEY:{name} " if name in KEYED else ""
+        body = [lead + paragraph()] + [paragraph() for _ in range(per_section - 1)]
+        parts.append(f"{i} {name}\n" + "\n\n".join(body))
+    refs = [f"[{j}] {rnd.choice('ABCDEFG')}. Author, {sentence()} Venue {rnd.randint(1990, 2024)}." for j in range(n_chars // 2000)]
+    parts.append("References\n" + "\n".join(refs))
+    return "\n\n".join(parts)
+
+
+def timed(fn, runs: int = RUNS):
+    samples, out = [], None
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        out = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return out, statistics.median(samples)
+
+
+def kept(prompt: str) -> tuple[int, int, bool]:
+    keys = sum(f"KEY:{k}" in prompt for k in KEYED)
+    headings = sum(f"{i} {name}\n" in prompt + "\n" for i, name in enumerate(SECTIONS, 1))
+    return keys, headings, prompt.rstrip().endswith((".", "…]"))
+
+
+def tiktoken_check(text: str) -> None:
+    try:
+        import tiktoken
+        enc = tiktoken.get_encoding("o200k_base")
+    except Exception:
+        print("estimator vs o200k_base: skipped (tiktoken or its encoding not available)")
+        return
+    sample = text[:200_000]
+    real, est = len(enc.encode(sample)), estimate_tokens(sample, MODEL)
+    print(f"estimator vs o200k_base on 200k chars: {est} estimated, {real} real ({(est - real) / real:+.1%})")
+
+
+def main():
+    budget = budget_for("persona", MODEL)
+    print(f"model {MODEL}, persona budget {budget} tokens, {len(KEYED)} key sentences, {len(SECTIONS)} headings\n")
+    print(f"{'chars':>10} {'tokens':>9} {'estimate ms':>12} {'fit ms':>8} {'slice ms':>9}"
+          f" {'slice keys/heads/clean':>23} {'fit keys/heads/clean':>21} {'fit tokens':>11}")
+    for n in SIZES:
+        text = paper(n)
+        tokens, est_ms = timed(lambda: estimate_tokens(text, MODEL))
+        fitted, fit_ms = timed(lambda: fit_to_budget(text, "persona", MODEL, focus="methods"))
+        sliced, slice_ms = timed(lambda: text[:15000])
+        sk, sh, sc = kept(sliced)
+        fk, fh, fc = kept(fitted)
+        print(f"{len(text):>10} {tokens:>9} {est_ms:>12.1f} {fit_ms:>8.1f} {slice_ms:>9.3f}"
+              f" {f'{sk}/{sh}/{sc}':>23} {f'{fk}/{fh}/{fc}':>21} {estimate_tokens(fitted, MODEL):>11}")
+    print()
+    tiktoken_check(paper(250_000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: survey retrieval with a cold, warm and stale provider query cache.
+
+Three stub providers answer with injected latency (lognormal around a
+median) behind relaxed rate limits. A survey-sized federated search is run
+with a cold cache, repeated warm (the same topic with different casing and
+spacing), then with every entry stale: served immediately while the
+background refreshes run. Reports retrieval latency and provider calls.
+
+Run from backend/:  python benchmarks/bench_query_cache.py
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for k, v in {"DATABASE_URL": "sqlite://", "JWT_SECRET": "bench", "OPENAI_API_KEY": "bench"}.items():
+    os.environ.setdefault(k, v)
+
+import app.retrieval.query_cache as qc
+from app.core.rate_limiter import provider_limits
+from app.retrieval.federated import Provider, federated_search
+from app.config.constants import QUERY_CACHE_FRESH_SECONDS, QUERY_CACHE_STALE_SECONDS, QUERY_CACHE_MAX_ENTRIES
+
+RUNS = 20
+N_RESULTS = 40
+LATENCIES = {"semantic_scholar": 0.6, "openalex": 0.35, "crossref": 0.5}
+calls = 0
+
+
+def make_stub(name: str, median: float):
+    async def search(query, limit, year_from, year_to, offset=0):
+        global calls
+        calls += 1
+        await asyncio.sleep(random.lognormvariate(0, 0.35) * median)
+        return [{"title": f"{name} paper {offset + i}", "first_author": "Doe", "year": "2024", "provider": name,
+                 "doi": f"10.1/{name}.{offset + i}"} for i in range(limit)]
+    return search
+
+
+async def run(label, providers, topics):
+    global calls
+    calls, samples = 0, []
+    for topic in topics:
+        t0 = time.perf_counter()
+        await federated_search(topic, N_RESULTS, providers, limit=20, per_source=40)
+        samples.append((time.perf_counter() - t0) * 1000)
+    print(f"{label:<22} p50={statistics.median(samples):8.2f} ms  max={max(samples):8.2f} ms  provider calls={calls}")
+
+
+async def main():
+    random.seed(5)
+    qc.query_cache = qc.QueryCache(QUERY_CACHE_FRESH_SECONDS, QUERY_CACHE_STALE_SECONDS, QUERY_CACHE_MAX_ENTRIES,
+                                   path=Path(tempfile.mkdtemp()) / "bench_queries.sqlite3")
+    providers = [Provider(name, make_stub(name, lat)) for name, lat in LATENCIES.items()]
+    for name in LATENCIES:
+        provider_limits.set_limit(name, 1e6, 1000)
+    topics = [f"graph neural networks topic {i}" for i in range(RUNS)]
+
+    await run("cold", providers, topics)
+    await run("warm (re-spelled)", providers, [f"  Graph Neural   NETWORKS topic {i} " for i in range(RUNS)])
+    qc.query_cache.fresh = 0  # every entry is now past its freshness window
+    await run("stale (revalidating)", providers, topics)
+    t0 = time.perf_counter()
+    await qc.query_cache.drain()
+    print(f"background refreshes finished {time.perf_counter() - t0:.2f}s later; stats: {qc.query_cache.disk.stats.as_dict()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
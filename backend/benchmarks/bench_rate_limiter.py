@@ -0,0 +1,94 @@
+"""
+Benchmark: naive retries vs. the shared token bucket + circuit breaker.
+
+A stub provider enforces a quota (token bucket) and, like the real scholarly
+APIs, answers over-quota calls with 429 + Retry-After and keeps rejecting
+until the penalty expires; every call made during the penalty extends it.
+Concurrent workers hammer it for a fixed time, either retrying on their own
+or going through `provider_limits`.
+
+Run from backend/:  python benchmarks/bench_rate_limiter.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for k, v in {"DATABASE_URL": "sqlite://", "JWT_SECRET": "bench", "OPENAI_API_KEY": "bench"}.items():
+    os.environ.setdefault(k, v)
+
+import httpx
+
+from app.core.rate_limiter import CircuitOpenError, TokenBucket, provider_limits
+
+QUOTA_RPS = 10.0
+PENALTY_SECONDS = 1.0
+LATENCY = 0.02
+WORKERS = 20
+DURATION = 6.0
+NAIVE_BACKOFF = 0.05
+
+
+class StubProvider:
+    def __init__(self):
+        self.quota = TokenBucket(QUOTA_RPS, int(QUOTA_RPS))
+        self.blocked_until = 0.0
+        self.ok = 0
+        self.throttled = 0
+
+    async def call(self):
+        await asyncio.sleep(LATENCY)
+        now = time.monotonic()
+        if now < self.blocked_until or self.quota.reserve() > 0:
+            if self.quota.tokens < 0:
+                self.quota.tokens += 1   # rejected calls do not consume quota
+            self.blocked_until = now + PENALTY_SECONDS
+            self.throttled += 1
+            request = httpx.Request("GET", "https://api.example.org/search")
+            response = httpx.Response(429, headers={"Retry-After": str(PENALTY_SECONDS)}, request=request)
+            raise httpx.HTTPStatusError("429 Too Many Requests", request=request, response=response)
+        self.ok += 1
+
+
+async def naive_worker(provider, stop_at):
+    while time.monotonic() < stop_at:
+        try:
+            await provider.call()
+        except httpx.HTTPStatusError:
+            await asyncio.sleep(NAIVE_BACKOFF)
+
+
+async def limited_worker(provider, stop_at):
+    while time.monotonic() < stop_at:
+        try:
+            async with provider_limits.guard("stub"):
+                await provider.call()
+        except CircuitOpenError:
+            await asyncio.sleep(NAIVE_BACKOFF)
+        except httpx.HTTPStatusError:
+            pass
+
+
+async def run(label, worker):
+    provider = StubProvider()
+    t0 = time.monotonic()
+    stop_at = t0 + DURATION
+    await asyncio.gather(*(worker(provider, stop_at) for _ in range(WORKERS)))
+    elapsed = time.monotonic() - t0
+    print(f"{label:<9} ok/s={provider.ok / elapsed:6.1f}  successes={provider.ok:4d}  429s={provider.throttled:5d}  elapsed={elapsed:.1f}s")
+
+
+async def main():
+    # stay just under the provider's quota, as the real limits in constants do
+    provider_limits.set_limit("stub", QUOTA_RPS * 0.9, int(QUOTA_RPS))
+    print(f"{WORKERS} workers for {DURATION:.0f}s against a {QUOTA_RPS:.0f} req/s quota with {PENALTY_SECONDS:.0f}s penalty")
+    await run("naive", naive_worker)
+    await run("limited", limited_worker)
+    print("limiter state:", provider_limits.snapshot()["stub"])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
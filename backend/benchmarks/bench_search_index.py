@@ -0,0 +1,88 @@
+"""
+Benchmark: local full-text index build throughput and query latency.
+
+Indexes N synthetic documents (default 100k, override with BENCH_DOCS)
+whose words follow a Zipf-like distribution over a fixed vocabulary, in
+batches as `rebuild` does, then times single-term, two-term and prefix
+queries scoped to one user, as the /search endpoint issues them.
+
+Run from backend/:  python benchmarks/bench_search_index.py
+"""
+
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for k, v in {"DATABASE_URL": "sqlite://", "JWT_SECRET": "bench", "OPENAI_API_KEY": "bench"}.items():
+    os.environ.setdefault(k, v)
+
+from app.retrieval.search_index import KIND_DOCUMENT, KIND_SOURCE, IndexEntry, SearchIndex
+
+DOCS = int(os.environ.get("BENCH_DOCS", 100_000))
+USERS = 200
+BODY_WORDS = 400
+BATCH = 1000
+QUERIES = 300
+
+rnd = random.Random(3)
+VOCAB = [f"{rnd.choice('bcdfghklmnprstvz')}{rnd.choice('aeiou')}{rnd.choice('bcdfghklmnprstvz')}{rnd.choice('aeiou')}{i}" for i in range(50_000)]
+CUM_WEIGHTS = list(itertools.accumulate(1 / (i + 1) for i in range(len(VOCAB))))
+
+
+def words(n):
+    return " ".join(rnd.choices(VOCAB, cum_weights=CUM_WEIGHTS, k=n))
+
+
+def entries():
+    for i in range(1, DOCS + 1):
+        kind = KIND_SOURCE if i % 4 else KIND_DOCUMENT
+        body = words(12 if kind == KIND_SOURCE else BODY_WORDS)
+        yield IndexEntry(kind, i, i % 5000, i % USERS, words(8), body)
+
+
+def pct(samples, q):
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(q * len(s)))] * 1000
+
+
+def main():
+    index = SearchIndex(Path(tempfile.mkdtemp()) / "bench_search.sqlite3")
+    t0 = time.perf_counter()
+    batch = []
+    for e in entries():
+        batch.append(e)
+        if len(batch) == BATCH:
+            index.add_many(batch)
+            batch = []
+    index.add_many(batch)
+    elapsed = time.perf_counter() - t0
+    print(f"indexed {index.count():,} entries in {elapsed:.1f}s ({DOCS / elapsed:,.0f} docs/s, "
+          f"~{BODY_WORDS} words per document entry)")
+
+    t0 = time.perf_counter()
+    index.add(IndexEntry(KIND_DOCUMENT, DOCS + 1, 1, 1, "incremental", words(BODY_WORDS)))
+    print(f"single incremental insert: {(time.perf_counter() - t0) * 1000:.2f} ms")
+
+    shapes = {
+        "one common term": lambda: rnd.choice(VOCAB[:200]),
+        "one rare term": lambda: rnd.choice(VOCAB[5000:]),
+        "two terms": lambda: f"{rnd.choice(VOCAB[:500])} {rnd.choice(VOCAB[:500])}",
+        "prefix": lambda: rnd.choice(VOCAB[:2000])[:3],
+    }
+    for name, make in shapes.items():
+        samples, hits = [], 0
+        for _ in range(QUERIES):
+            q, user = make(), rnd.randrange(USERS)
+            t = time.perf_counter()
+            hits += len(index.search(q, user, limit=20))
+            samples.append(time.perf_counter() - t)
+        print(f"{name:<16} p50={pct(samples, .5):7.2f} ms  p99={pct(samples, .99):7.2f} ms  avg hits={hits / QUERIES:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""job params and results
+
+Revision ID: 5b1e9c2f7a40
+Revises: 3eef721c7bb6
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e9c2f7a40'
+down_revision: Union[str, Sequence[str], None] = '3eef721c7bb6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('params', sa.Text(), server_default='', nullable=False))
+    op.add_column('jobs', sa.Column('result', sa.Text(), nullable=True))
+    op.add_column('jobs', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('jobs', 'updated_at')
+    op.drop_column('jobs', 'result')
+    op.drop_column('jobs', 'params')
@@ -0,0 +1,32 @@
+"""document text layer
+
+Revision ID: 8d3f61a0c2e7
+Revises: 5b1e9c2f7a40
+Create Date: 2026-10-18 10:47:05.902316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f61a0c2e7'
+down_revision: Union[str, Sequence[str], None] = '5b1e9c2f7a40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('text_content', sa.Text(), nullable=True))
+    op.add_column('documents', sa.Column('page_offsets', sa.Text(), nullable=True))
+    op.add_column('documents', sa.Column('extracted_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents', 'extracted_at')
+    op.drop_column('documents', 'page_offsets')
+    op.drop_column('documents', 'text_content')
@@ -0,0 +1,32 @@
+"""document content hash and size
+
+Revision ID: c47a9e15b3d8
+Revises: 8d3f61a0c2e7
+Create Date: 2026-10-18 11:58:22.640197
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47a9e15b3d8'
+down_revision: Union[str, Sequence[str], None] = '8d3f61a0c2e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('sha256', sa.String(length=64), nullable=True))
+    op.add_column('documents', sa.Column('size_bytes', sa.BigInteger(), nullable=True))
+    op.create_index(op.f('ix_documents_sha256'), 'documents', ['sha256'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_documents_sha256'), table_name='documents')
+    op.drop_column('documents', 'size_bytes')
+    op.drop_column('documents', 'sha256')
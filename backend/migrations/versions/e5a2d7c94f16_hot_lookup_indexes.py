@@ -0,0 +1,40 @@
+"""indexes for hot foreign-key lookups
+
+Revision ID: e5a2d7c94f16
+Revises: c47a9e15b3d8
+Create Date: 2026-10-18 14:06:51.318402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a2d7c94f16'
+down_revision: Union[str, Sequence[str], None] = 'c47a9e15b3d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_projects_user_id_id', 'projects', ['user_id', 'id'], unique=False)
+    op.create_index('ix_documents_project_id_id', 'documents', ['project_id', 'id'], unique=False)
+    op.create_index('ix_drafts_project_id_id', 'drafts', ['project_id', 'id'], unique=False)
+    op.create_index('ix_sources_project_id_doi', 'sources', ['project_id', 'doi'], unique=False)
+    op.create_index('ix_citations_draft_id', 'citations', ['draft_id'], unique=False)
+    op.create_index('ix_jobs_user_id_id', 'jobs', ['user_id', 'id'], unique=False)
+    op.create_index('ix_jobs_status', 'jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_status', table_name='jobs')
+    op.drop_index('ix_jobs_user_id_id', table_name='jobs')
+    op.drop_index('ix_citations_draft_id', table_name='citations')
+    op.drop_index('ix_sources_project_id_doi', table_name='sources')
+    op.drop_index('ix_drafts_project_id_id', table_name='drafts')
+    op.drop_index('ix_documents_project_id_id', table_name='documents')
+    op.drop_index('ix_projects_user_id_id', table_name='projects')
@@ -0,0 +1,30 @@
+"""index for claiming jobs with an expired lease
+
+Revision ID: f1b6c3d8e924
+Revises: e5a2d7c94f16
+Create Date: 2026-10-18 21:02:17.540913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b6c3d8e924'
+down_revision: Union[str, Sequence[str], None] = 'e5a2d7c94f16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_jobs_status_updated_at', 'jobs', ['status', 'updated_at'], unique=False)
+    op.drop_index('ix_jobs_status', table_name='jobs')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_jobs_status', 'jobs', ['status'], unique=False)
+    op.drop_index('ix_jobs_status_updated_at', table_name='jobs')
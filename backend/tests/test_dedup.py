@@ -0,0 +1,80 @@
+"""
+Cross-provider de-duplication: DOI matches, MinHash title matches, and what must stay apart.
+
+Run from backend/:  python -m pytest tests
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for k, v in {"DATABASE_URL": "sqlite://", "JWT_SECRET": "test", "OPENAI_API_KEY": "test"}.items():
+    os.environ.setdefault(k, v)
+
+from app.io.schemas import PaperBrief
+from app.retrieval.dedup import Deduplicator, canonical_title, dedupe, normalize_doi
+
+TITLE = "Attention Is All You Need: Transformers for Sequence Transduction"
+
+
+def paper(title=TITLE, author="Ashish Vaswani", year="2017", doi=None, provider="semantic_scholar", **extra):
+    return PaperBrief(title=title, first_author=author, year=year, doi=doi, provider=provider, **extra)
+
+
+def test_normalization():
+    assert normalize_doi("https://doi.org/10.1000/ABC.") == "10.1000/abc"
+    assert normalize_doi("doi: 10.1000/x") == "10.1000/x"
+    assert normalize_doi("arXiv:1706.03762") is None
+    assert canonical_title("Café—Über  Models!") == "cafe uber models"
+
+
+def test_doi_match_merges_and_fills_gaps():
+    d = Deduplicator()
+    assert d.add(paper(doi="10.5555/3295222.3295349"))
+    assert not d.add(paper(title="Completely different wording", doi="https://doi.org/10.5555/3295222.3295349",
+                           venue="NeurIPS", url="https://example.org/p.pdf", provider="openalex"))
+    [merged] = d.papers()
+    assert merged.title == TITLE
+    assert merged.venue == "NeurIPS" and merged.url == "https://example.org/p.pdf"
+    assert merged.doi == "10.5555/3295222.3295349"
+    assert merged.provider == "semantic_scholar,openalex"
+    assert d.merged == 1
+
+
+def test_near_duplicate_titles_merge_without_doi():
+    variants = [
+        paper(),
+        paper(title=TITLE.upper(), author="A. Vaswani", provider="crossref"),
+        paper(title="Attention is all you need - transformers for sequence transduction.", provider="openalex"),
+    ]
+    [merged] = dedupe(variants)
+    # the all-caps Crossref title never replaces a properly cased one
+    assert merged.title == TITLE
+    assert merged.provider == "semantic_scholar,crossref,openalex"
+
+
+def test_title_match_adopts_a_later_doi():
+    d = Deduplicator()
+    d.add(paper())
+    d.add(paper(doi="10.1/aiayn", provider="openalex"))
+    # a third record matching only by that DOI still lands on the same paper
+    assert not d.add(paper(title="Unrelated", author="Someone Else", doi="10.1/AIAYN", provider="crossref"))
+    assert len(d) == 1 and d.papers()[0].doi == "10.1/aiayn"
+
+
+def test_similar_titles_that_are_different_works_stay_apart():
+    kept = dedupe([
+        paper(doi="10.1/a"),
+        paper(doi="10.1/b"),                              # different DOIs
+        paper(year="2009", provider="openalex"),          # years too far apart
+        paper(author="Jane Doe", provider="crossref"),    # no shared author token
+        paper(title="Graph Neural Networks for Molecule Property Prediction"),
+    ])
+    assert len(kept) == 5
+
+
+def test_many_distinct_papers_are_all_kept():
+    papers = [paper(title=f"Study {i} of protein folding dynamics in model organism {i * 7}", author=f"Author{i}")
+              for i in range(300)]
+    assert len(dedupe(papers)) == 300
@@ -0,0 +1,119 @@
+"""
+Background jobs: lease-expiry claims across runners, lease renewal, cancel.
+
+Run from backend/:  python -m pytest tests
+"""
+
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for k, v in {"DATABASE_URL": "sqlite://", "JWT_SECRET": "test", "OPENAI_API_KEY": "test"}.items():
+    os.environ.setdefault(k, v)
+
+from pydantic import BaseModel
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import jobs
+from app.core.jobs import JobRunner
+from app.config.constants import JOB_LEASE_SECONDS
+from app.db import models
+from app.db.base import Base
+
+
+class Params(BaseModel):
+    n: int
+
+
+@pytest.fixture
+def Session(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.sqlite3'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    monkeypatch.setattr(jobs, "SessionLocal", factory)
+    with factory() as db:
+        db.add(models.User(id=1, email="a@example.org", name="a", password_hash="x"))
+        db.commit()
+    yield factory
+    engine.dispose()
+
+
+def _runner(ran: list, delay: float = 0.05) -> JobRunner:
+    async def handler(params, db, user):
+        ran.append(params.n)
+        await asyncio.sleep(delay)
+        return {"n": params.n}
+
+    runner = JobRunner({"default": 8})
+    runner.register("work", Params, handler)
+    return runner
+
+
+def _add_jobs(Session, status: str, age: float, count: int, job_type: str = "work") -> list:
+    updated = datetime.now(timezone.utc) - timedelta(seconds=age)
+    with Session() as db:
+        rows = [
+            models.Job(user_id=1, type=job_type, status=status, message="", params=json.dumps({"n": i}), updated_at=updated)
+            for i in range(count)
+        ]
+        db.add_all(rows)
+        db.commit()
+        return [r.id for r in rows]
+
+
+def _statuses(Session) -> dict:
+    with Session() as db:
+        return {j.id: j.status for j in db.query(models.Job)}
+
+
+def test_abandoned_jobs_are_claimed_once_across_runners(Session):
+    abandoned = _add_jobs(Session, "running", JOB_LEASE_SECONDS * 2, 6)
+    live = _add_jobs(Session, "running", 0, 2)
+    ran_a, ran_b = [], []
+    a, b = _runner(ran_a), _runner(ran_b)
+
+    async def run():
+        await asyncio.gather(a.recover(), b.recover())
+        await asyncio.gather(*a._tasks.values(), *b._tasks.values())
+
+    asyncio.run(run())
+    assert sorted(ran_a + ran_b) == list(range(6))
+    statuses = _statuses(Session)
+    assert all(statuses[i] == "succeeded" for i in abandoned)
+    # jobs whose lease is still fresh belong to a live worker and are left alone
+    assert all(statuses[i] == "running" for i in live)
+
+
+def test_unreplayable_jobs_fail(Session):
+    [job_id] = _add_jobs(Session, "queued", JOB_LEASE_SECONDS * 2, 1, job_type="retired")
+    asyncio.run(_runner([]).recover())
+    assert _statuses(Session)[job_id] == "failed"
+
+
+def test_renewed_lease_is_not_claimed(Session):
+    [job_id] = _add_jobs(Session, "running", JOB_LEASE_SECONDS * 2, 1)
+    ran = []
+    owner = _runner(ran)
+    owner._renew([job_id])
+    asyncio.run(_runner(ran).recover())
+    assert ran == [] and _statuses(Session)[job_id] == "running"
+
+
+def test_cancel_returns_after_the_row_is_updated(Session):
+    runner = _runner([], delay=10)
+
+    async def run():
+        job = await runner.submit("work", 1, Params(n=1))
+        await asyncio.sleep(0.05)
+        assert await runner.cancel(job.id)
+        return job.id
+
+    job_id = asyncio.run(run())
+    assert _statuses(Session)[job_id] == "cancelled"
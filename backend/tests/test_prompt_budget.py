@@ -0,0 +1,66 @@
+"""
+Prompt budgets on non-Latin and unspaced input: pieces stay within budget and nothing is dropped.
+
+Run from backend/:  python -m pytest tests
+"""
+
+import os
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for k, v in {"DATABASE_URL": "sqlite://", "JWT_SECRET": "test", "OPENAI_API_KEY": "test"}.items():
+    os.environ.setdefault(k, v)
+
+from app.core.prompt_budget import OMITTED, _TokenCounts, estimate_tokens, fit_to_budget, split_to_budget, truncate_tokens
+
+MODEL = "gpt-4o"
+
+_rnd = random.Random(3)
+ZH = "".join(
+    "".join(_rnd.choice("研究助手是一个很好的工具我们提出了新的方法结果表明") for _ in range(30)) + "。"
+    for _ in range(400)
+)
+
+
+def test_prefix_sum_matches_estimate():
+    for text in ["a  b\n\n c", "café au lait 12345", ZH[:100] + " abc", "x" * 50, "see https://example.org/" + "a1" * 300]:
+        assert _TokenCounts(text, MODEL).total == estimate_tokens(text, MODEL)
+
+
+def test_spans_inside_a_run_are_counted():
+    counts = _TokenCounts(ZH, MODEL)
+    half = len(ZH) // 2
+    assert counts(0, half) + counts(half, len(ZH)) == counts.total
+    assert counts(half, half + 100) > 0
+
+
+def test_cjk_split_stays_within_budget():
+    pieces = split_to_budget(ZH, 2000, MODEL)
+    assert len(pieces) > 1
+    assert all(estimate_tokens(p, MODEL) <= 2000 for p in pieces)
+    assert sum(map(len, pieces)) == len(ZH)
+    # splits land on CJK sentence ends
+    assert all(p.endswith("。") for p in pieces)
+
+
+def test_unspaced_run_is_hard_cut_within_budget():
+    text = "see " + "x" * 20000 + " end."
+    pieces = split_to_budget(text, 500, MODEL)
+    assert all(estimate_tokens(p, MODEL) <= 500 for p in pieces)
+    assert sum(map(len, pieces)) >= len(text) - len(pieces)
+
+    b64 = "".join(_rnd.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/") for _ in range(30000))
+    assert all(estimate_tokens(p, MODEL) <= 300 for p in split_to_budget(b64, 300, MODEL))
+
+
+def test_truncate_unspaced():
+    head = truncate_tokens(ZH.replace("。", ""), 100, MODEL)
+    assert 0 < estimate_tokens(head, MODEL) <= 100
+
+
+def test_fit_keeps_cjk_document():
+    out = fit_to_budget(ZH, budget=2000, model=MODEL)
+    assert 1500 < estimate_tokens(out, MODEL) <= 2000
+    assert out.replace(OMITTED, "").strip()
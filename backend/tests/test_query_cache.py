@@ -0,0 +1,80 @@
+"""
+Provider query cache: where it lives, single-flight misses, short-lived empty pages.
+
+Run from backend/:  python -m pytest tests
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for k, v in {"DATABASE_URL": "sqlite://", "JWT_SECRET": "test", "OPENAI_API_KEY": "test"}.items():
+    os.environ.setdefault(k, v)
+
+from app.core.disk_cache import CACHE_DIR
+from app.retrieval.query_cache import QueryCache, query_cache
+
+
+def _db_file(cache: QueryCache) -> Path:
+    return Path(cache.disk._conn.execute("PRAGMA database_list").fetchone()[2])
+
+
+def test_module_cache_lives_under_cache_dir():
+    assert _db_file(query_cache).parent == CACHE_DIR.resolve()
+    assert query_cache.empty_ttl < query_cache.fresh
+
+
+def test_concurrent_misses_share_one_search(tmp_path):
+    cache = QueryCache(60, 60, 100, path=tmp_path / "q.sqlite3")
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return [{"title": "t"}]
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_fetch("k", fetch) for _ in range(10)))
+
+    results = asyncio.run(run())
+    assert calls == 1
+    assert all(r == [{"title": "t"}] for r in results)
+    assert not cache._fetching
+
+
+def test_failed_search_reaches_every_waiter_and_is_not_cached(tmp_path):
+    cache = QueryCache(60, 60, 100, path=tmp_path / "q.sqlite3")
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("provider down")
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_fetch("k", fetch) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(run()))
+    assert cache.disk.get("k") == (False, None)
+
+
+def test_empty_page_expires_after_negative_ttl(tmp_path):
+    cache = QueryCache(60, 60, 100, path=tmp_path / "q.sqlite3", empty_ttl=0.05)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return []
+
+    async def run():
+        await cache.get_or_fetch("k", fetch)
+        await cache.get_or_fetch("k", fetch)
+        assert calls == 1
+        time.sleep(0.1)
+        await cache.get_or_fetch("k", fetch)
+
+    asyncio.run(run())
+    assert calls == 2
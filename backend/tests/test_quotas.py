@@ -0,0 +1,93 @@
+"""
+Sliding-window quotas: window rollover, Retry-After, and headers on self-built responses.
+
+Run from backend/:  python -m pytest tests
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for k, v in {"DATABASE_URL": "sqlite://", "JWT_SECRET": "test", "OPENAI_API_KEY": "test"}.items():
+    os.environ.setdefault(k, v)
+
+from fastapi import Depends, FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.config.settings import settings
+from app.core import quotas, security
+from app.core.quotas import MemoryCounters, QuotaLimiter, RateLimitHeadersMiddleware, SQLiteCounters
+from app.core.sse import sse_response
+
+# 3 requests per 10 s window
+TABLE = {"default": {"llm": (3, 10)}}
+
+
+class User:
+    id = 1
+    role = "researcher"
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def limiter(request, tmp_path):
+    counters = MemoryCounters() if request.param == "memory" else SQLiteCounters(tmp_path / "quotas.sqlite3")
+    return QuotaLimiter(counters, TABLE, {})
+
+
+def test_window_fills_then_rolls_over(limiter):
+    assert [limiter.check(User, "llm", now=t).allowed for t in (1, 2, 3)] == [True, True, True]
+    denied = limiter.check(User, "llm", now=4)
+    assert not denied.allowed and denied.retry_after == 6 and denied.reset == 6
+
+    # just past the rollover the full previous window still weighs in ...
+    early = limiter.check(User, "llm", now=10.5)
+    assert not early.allowed
+    # ... until its share has decayed enough, which is what Retry-After promised
+    assert limiter.check(User, "llm", now=10.5 + early.retry_after).allowed
+
+
+def test_old_windows_stop_counting(limiter):
+    for t in (1, 2, 3):
+        limiter.check(User, "llm", now=t)
+    fresh = limiter.check(User, "llm", now=25)
+    assert fresh.allowed and fresh.remaining == 2
+
+
+def test_user_and_role_scopes_both_bound():
+    limiter = QuotaLimiter(MemoryCounters(), {"default": {"llm": (5, 10)}}, {"default": {"llm": (2, 10)}})
+    other = type("Other", (), {"id": 2, "role": "researcher"})
+    assert limiter.check(User, "llm", now=1).allowed
+    assert limiter.check(other, "llm", now=1).allowed
+    # the shared role pool is spent although each user has budget left
+    assert not limiter.check(User, "llm", now=2).allowed
+
+
+def test_headers_reach_responses_built_by_the_endpoint(monkeypatch):
+    monkeypatch.setattr(settings, "QUOTA_ENABLED", True)
+    monkeypatch.setattr(quotas, "quota_limiter", QuotaLimiter(MemoryCounters(), TABLE, {}))
+    app = FastAPI()
+    app.add_middleware(RateLimitHeadersMiddleware)
+    app.dependency_overrides[security.get_current_user] = lambda: User()
+
+    @app.post("/submit")
+    def submit(user=Depends(quotas.require_quota("llm"))):
+        return JSONResponse(status_code=202, content={})
+
+    @app.get("/stream")
+    async def stream(user=Depends(quotas.require_quota("llm"))):
+        async def items():
+            yield "hi"
+        return sse_response("test", items())
+
+    client = TestClient(app)
+    accepted = client.post("/submit")
+    assert accepted.status_code == 202 and accepted.headers["x-ratelimit-remaining"] == "2"
+    streamed = client.get("/stream")
+    assert streamed.headers["x-ratelimit-limit"] == "3" and streamed.headers["x-ratelimit-remaining"] == "1"
+    client.get("/stream")
+    rejected = client.post("/submit")
+    assert rejected.status_code == 429 and "retry-after" in rejected.headers
@@ -0,0 +1,118 @@
+"""
+Provider rate limiting: bucket refunds on cancel and fail-fast, half-open breaker probes.
+
+Run from backend/:  python -m pytest tests
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for k, v in {"DATABASE_URL": "sqlite://", "JWT_SECRET": "test", "OPENAI_API_KEY": "test"}.items():
+    os.environ.setdefault(k, v)
+
+from app.core.rate_limiter import (
+    CircuitBreaker, CircuitOpenError, ProviderLimiter, RateLimitWaitError, TokenBucket,
+)
+
+
+def test_cancelled_waits_leave_no_debt():
+    # 10 tokens/s, burst 1: every extra caller queues 0.1 s behind the previous one
+    bucket = TokenBucket(10, 1)
+
+    async def run():
+        bucket.reserve()
+        waiters = [asyncio.create_task(bucket.acquire()) for _ in range(30)]
+        await asyncio.sleep(0.01)
+        for w in waiters:
+            w.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+
+    asyncio.run(run())
+    # without refunds the next caller would wait ~3 s for the abandoned reservations
+    assert bucket.reserve() < 0.2
+
+
+def test_wait_past_deadline_fails_fast_and_refunds():
+    bucket = TokenBucket(1, 1)
+    bucket.reserve()
+
+    async def run():
+        t0 = time.monotonic()
+        with pytest.raises(RateLimitWaitError):
+            await bucket.acquire(max_wait=0.1)
+        return time.monotonic() - t0
+
+    assert asyncio.run(run()) < 0.05
+    assert bucket.tokens > -1
+
+
+def test_fail_fast_frees_the_half_open_probe():
+    limiter = ProviderLimiter({"p": (1, 1)})
+    breaker = limiter.breaker("p")
+    breaker.record_failure(retry_after=0)  # open, but already due for a probe
+    limiter.bucket("p").reserve()
+
+    async def run():
+        with pytest.raises(RateLimitWaitError):
+            await limiter.acquire("p", max_wait=0.01)
+
+    asyncio.run(run())
+    assert limiter.counters["p"]["wait_exceeded"] == 1
+    assert not breaker.probe_in_flight
+
+
+def test_breaker_opens_after_threshold_and_probes_once():
+    breaker = CircuitBreaker(threshold=2, base_cooldown=0.05, max_cooldown=1)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == breaker.OPEN and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()        # the single half-open probe
+    assert not breaker.allow()    # everyone else waits for its outcome
+    breaker.record_failure()      # a failed probe re-opens with a doubled cool-down
+    assert breaker.state == breaker.OPEN and breaker.open_until - time.monotonic() > 0.05
+
+    time.sleep(0.11)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == breaker.CLOSED and breaker.allow()
+
+
+def test_guard_reports_outcomes_and_releases_cancelled_probe():
+    limiter = ProviderLimiter({"p": (100, 10)})
+
+    async def failing():
+        async with limiter.guard("p"):
+            raise RuntimeError("boom")
+
+    async def run():
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                await failing()
+        with pytest.raises(CircuitOpenError):
+            async with limiter.guard("p"):
+                pass
+
+        breaker = limiter.breaker("p")
+        breaker.open_until = 0.0
+        task = asyncio.create_task(hang())
+        await asyncio.sleep(0.01)
+        assert breaker.probe_in_flight
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert not breaker.probe_in_flight
+
+    async def hang():
+        async with limiter.guard("p"):
+            await asyncio.sleep(10)
+
+    asyncio.run(run())
+    assert limiter.counters["p"]["failures"] == 3 and limiter.counters["p"]["rejected"] == 1
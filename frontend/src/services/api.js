@@ -47,7 +47,19 @@ export const authAPI = {
 // Project APIs
 export const projectAPI = {
   create: (data) => api.post('/projects', data),
-  getAll: () => api.get('/projects'),
+  // follows X-Next-Cursor so every page of projects is returned
+  getAll: async () => {
+    const data = [];
+    let cursor;
+    do {
+      const response = await api.get('/projects', {
+        params: { fields: 'id,title,domain,aim', limit: 200, ...(cursor && { cursor }) },
+      });
+      data.push(...response.data);
+      cursor = response.headers['x-next-cursor'];
+    } while (cursor);
+    return { data };
+  },
   getById: (id) => api.get(`/projects/${id}`),
   delete: (id) => api.delete(`/projects/${id}`),
 };